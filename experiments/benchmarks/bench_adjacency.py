@@ -0,0 +1,68 @@
+"""
+Filtered traversal time (-[name]-> from a hub node) with the node adjacency
+index against the previous scan of every attached edge, which materialized
+each edge and checked its architype.
+
+python bench_adjacency.py --degrees 1000 10000 --names 10
+"""
+import argparse
+import time
+
+from jaseci.jsorc.memory import MemoryHook
+from jaseci.prim.architype import Architype
+from jaseci.prim.edge import Edge
+from jaseci.prim.node import Node
+
+
+def legacy_edge_to(location, name):
+    """run_edge_to as it was before the adjacency index"""
+    ret = []
+    for i in location.outbound_edges() + location.bidirected_edges():
+        if not i.get_architype().is_instance(name):
+            continue
+        ret.append(i)
+    return ret
+
+
+def indexed_edge_to(location, name):
+    return location.adjacent_edges(["out", "bi"], name)
+
+
+def build_hub(degree, names):
+    h = MemoryHook()
+    hub = Node(m_id=0, h=h)
+    for n in range(degree):
+        edge = Edge(m_id=0, h=h, kind="edge", name=f"e{n % names}")
+        hub.attach_outbound(Node(m_id=0, h=h), [edge])
+    return hub
+
+
+def bench(hub, names, reps, func):
+    start = time.perf_counter()
+    for r in range(reps):
+        found = func(hub, f"e{r % names}")
+    return (time.perf_counter() - start) / reps, len(found)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--degrees", type=int, nargs="+", default=[1000, 10000])
+    parser.add_argument("--names", type=int, default=10)
+    parser.add_argument("--reps", type=int, default=20)
+    args = parser.parse_args()
+
+    # architypes by edge name, standing in for a registered sentinel's
+    archs = {}
+    Edge.get_architype = lambda self: archs.setdefault(
+        self.name, Architype(m_id=0, h=self._h, name=self.name, kind="edge")
+    )
+    print(f"{'degree':>8} {'found':>6} {'legacy':>10} {'indexed':>10} {'speedup':>9}")
+    for degree in args.degrees:
+        hub = build_hub(degree, args.names)
+        old, found = bench(hub, args.names, args.reps, legacy_edge_to)
+        new, found = bench(hub, args.names, args.reps, indexed_edge_to)
+        print(f"{degree:>8} {found:>6} {old:>9.5f}s {new:>9.5f}s x{old / new:>7.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""
+Compares the json and msgpack codecs used by hooks to write objects to
+redis and the db, reports encode/decode time and payload size.
+
+python bench_codec.py --nodes 1000 --dim 768
+"""
+import argparse
+import random
+import time
+
+from jaseci.jsorc.memory import MemoryHook
+from jaseci.prim.node import Node
+
+
+def build_nodes(hook, count, dim):
+    nodes = [Node(m_id=0, h=hook) for i in range(count)]
+    for i, nd in enumerate(nodes):
+        nd.context = {
+            "name": f"node {i}",
+            "embedding": [random.random() for j in range(dim)],
+            "tags": ["a", "b", "c"],
+        }
+        for j in random.sample(nodes, min(count, 8)):
+            nd.edge_ids.append(j.jid)
+    return nodes
+
+
+def bench(hook, nodes, codec, repeat):
+    start = time.perf_counter()
+    for r in range(repeat):
+        blobs = [i.dumps(codec=codec) for i in nodes]
+    enc = (time.perf_counter() - start) / repeat
+
+    target = Node(m_id=0, h=hook, auto_save=False)
+    start = time.perf_counter()
+    for r in range(repeat):
+        for b in blobs:
+            target.json_load(b)
+    dec = (time.perf_counter() - start) / repeat
+
+    size = sum(len(b) for b in blobs)
+    return enc, dec, size
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--nodes", type=int, default=1000)
+    parser.add_argument("--dim", type=int, default=768)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    hook = MemoryHook()
+    nodes = build_nodes(hook, args.nodes, args.dim)
+    results = {c: bench(hook, nodes, c, args.repeat) for c in ["json", "msgpack"]}
+
+    print(f"{args.nodes} nodes, {args.dim} floats per node")
+    print(f"{'codec':<10}{'encode s':>12}{'decode s':>12}{'bytes':>14}")
+    for codec, (enc, dec, size) in results.items():
+        print(f"{codec:<10}{enc:>12.4f}{dec:>12.4f}{size:>14}")
+    base = results["json"]
+    new = results["msgpack"]
+    print(
+        f"msgpack vs json: encode x{base[0] / new[0]:.2f}, "
+        f"decode x{base[1] / new[1]:.2f}, size {new[2] / base[2]:.0%}"
+    )
+
+
+if __name__ == "__main__":
+    main()
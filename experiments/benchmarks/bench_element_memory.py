@@ -0,0 +1,55 @@
+"""
+Bytes per Node and Edge with slotted IdLists sharing empty companions
+against the previous IdList (legacy_id_list.py, kept verbatim), which had an
+instance dict and allocated its index, slots, cache and heal containers for
+every list, even empty ones.
+
+python bench_element_memory.py --count 20000
+"""
+import argparse
+import gc
+import tracemalloc
+
+import jaseci.prim.node as node_mod
+import jaseci.prim.obj_mixins as mixins_mod
+from jaseci.jsorc.memory import MemoryHook
+from jaseci.prim.edge import Edge
+from jaseci.prim.node import Node
+from jaseci.utils.id_list import IdList
+from legacy_id_list import IdList as LegacyIdList
+
+
+def bytes_per(cls, count):
+    h = MemoryHook()
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    objs = [cls(m_id=0, h=h, auto_save=False) for i in range(count)]
+    used = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    del objs
+    return used / count
+
+
+def measure(count, id_list_cls):
+    node_mod.IdList = mixins_mod.IdList = id_list_cls
+    try:
+        return [bytes_per(Node, count), bytes_per(Edge, count)]
+    finally:
+        node_mod.IdList = mixins_mod.IdList = IdList
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--count", type=int, default=20000)
+    args = parser.parse_args()
+
+    legacy = measure(args.count, LegacyIdList)
+    current = measure(args.count, IdList)
+    print(f"{'type':>6} {'legacy':>12} {'slotted':>12} {'saved':>7}")
+    for name, old, new in zip(["node", "edge"], legacy, current):
+        print(f"{name:>6} {old:>7.0f} B/obj {new:>7.0f} B/obj {1 - new / old:>6.0%}")
+
+
+if __name__ == "__main__":
+    main()
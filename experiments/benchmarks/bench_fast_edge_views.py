@@ -0,0 +1,62 @@
+"""
+Time and peak allocation of listing a hub node's attached nodes when its
+fast edges are not built yet (e.g. node just loaded), with fast edge views
+against the previous path that built an Edge object for every fast edge.
+
+python bench_fast_edge_views.py --degrees 1000 10000
+"""
+import argparse
+import time
+import tracemalloc
+
+from jaseci.jsorc.memory import MemoryHook
+from jaseci.prim.node import Node
+
+
+def legacy_attached_nodes(node):
+    """attached_nodes as it was before fast edge views"""
+    return [e.opposing_node(node) for e in node.smart_edges]
+
+
+def viewed_attached_nodes(node):
+    return node.attached_nodes()
+
+
+def bench(hub, reps, func):
+    elapsed = 0
+    tracemalloc.start()
+    for r in range(reps):
+        hub.clear_fast_edge_ids()
+        start = time.perf_counter()
+        func(hub)
+        elapsed += time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return elapsed / reps, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--degrees", type=int, nargs="+", default=[1000, 10000])
+    parser.add_argument("--reps", type=int, default=5)
+    args = parser.parse_args()
+
+    print(
+        f"{'degree':>8} {'legacy':>10} {'views':>10} {'speedup':>9} "
+        f"{'legacy peak':>12} {'views peak':>11}"
+    )
+    for degree in args.degrees:
+        h = MemoryHook()
+        hub = Node(m_id=0, h=h)
+        for n in range(degree):
+            hub.attach_outbound(Node(m_id=0, h=h))
+        new, new_peak = bench(hub, args.reps, viewed_attached_nodes)
+        old, old_peak = bench(hub, args.reps, legacy_attached_nodes)
+        print(
+            f"{degree:>8} {old:>9.4f}s {new:>9.4f}s x{old / new:>7.1f} "
+            f"{old_peak / 2**20:>10.1f}MB {new_peak / 2**20:>9.1f}MB"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""
+Graph ingestion throughput in nodes and edges per second: graph_bulk_load's
+loader, which writes fast edges straight into fast_edges and saves
+everything once, against building the graph the way net.unpack did, saving
+each node and edge as it is made and connecting edges one at a time. Both
+include the hook commit.
+
+python bench_graph_bulk_load.py --sizes 10000 50000
+"""
+import argparse
+import random
+import time
+
+from jaseci.jsorc.jsorc import JsOrc
+from jaseci.prim.edge import Edge
+from jaseci.prim.graph import Graph
+from jaseci.prim.node import Node
+from jaseci.utils.graph_loader import bulk_load
+
+
+def packed_graph(size, fanout):
+    """Columns of size nodes, each linked to root or a random earlier node"""
+    edges = [[None, 0]]
+    for i in range(1, size):
+        edges += [[random.randrange(i), i] for j in range(fanout)]
+    return {
+        "nodes": {"name": ["node"] * size, "ctx": [{"idx": i} for i in range(size)]},
+        "edges": {
+            "name": ["generic"] * len(edges),
+            "ctx": [{} for i in edges],
+            "connect": edges,
+            "bi_dir": [False] * len(edges),
+        },
+    }
+
+
+def legacy_load(gph, packed):
+    nodes = []
+    for name, ctx in zip(packed["nodes"]["name"], packed["nodes"]["ctx"]):
+        node = Node(m_id=gph._m_id, h=gph._h, kind="node", name=name)
+        node.context = ctx
+        node.save()
+        nodes.append(node)
+    edges = packed["edges"]
+    for name, ctx, connect in zip(edges["name"], edges["ctx"], edges["connect"]):
+        edge = Edge(m_id=gph._m_id, h=gph._h, kind="edge", name=name)
+        edge.context = ctx
+        source = gph if connect[0] is None else nodes[connect[0]]
+        edge.connect(source, nodes[connect[1]])
+        edge.save()
+
+
+def bench(func, mast, packed):
+    gph = Graph(m_id=mast._m_id, h=mast._h)
+    start = time.perf_counter()
+    func(gph, packed)
+    mast._h.commit()
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 50000])
+    parser.add_argument("--fanout", type=int, default=2)
+    args = parser.parse_args()
+
+    mast = JsOrc.master()
+    print(
+        f"{'nodes':>8} {'edges':>8} {'legacy':>10} {'bulk':>10} "
+        f"{'legacy n/s':>11} {'bulk n/s':>10} {'bulk e/s':>10} {'speedup':>9}"
+    )
+    for size in args.sizes:
+        packed = packed_graph(size, args.fanout)
+        edges = len(packed["edges"]["name"])
+        old = bench(legacy_load, mast, packed)
+        new = bench(bulk_load, mast, packed)
+        print(
+            f"{size:>8} {edges:>8} {old:>9.3f}s {new:>9.3f}s {size / old:>11.0f} "
+            f"{size / new:>10.0f} {edges / new:>10.0f} x{old / new:>7.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+"""
+Graph export time and peak memory: DOT with id -> index dicts against the
+previous list.index lookups per node and edge, and graph_get streamed as
+NDJSON against building the full list of serialized objects first. Runs on
+a graph held in memory and again on one read back through a fresh sqlite
+backed hook, where the stream also evicts what it loads once exported.
+
+python bench_graph_export.py --sizes 1000 5000
+"""
+import argparse
+import json
+import os
+import tempfile
+import time
+import tracemalloc
+
+from jaseci.jsorc.jsorc import JsOrc
+from jaseci.jsorc.sqlite import SqliteHook
+from jaseci.prim.graph import Graph
+from jaseci.prim.node import Node
+
+
+def legacy_dot(gph):
+    """traversing_dot_str as it was, indexing nodes and edges with lists"""
+    nodes, edges = gph.get_all_architypes()
+    dstr = f"strict digraph {gph.name} {{\n"
+    for n in nodes.values():
+        dstr += f"    {n.dot_str(list(nodes.keys()))}"
+    for e in edges.values():
+        dstr += f"    {e.dot_str(list(nodes.keys()), list(edges.keys()))}"
+    return dstr + "}"
+
+
+def legacy_items(gph, out):
+    nodes, edges = gph.get_all_architypes()
+    items = [i.serialize() for i in nodes.values()]
+    items += [i.serialize() for i in edges.values()]
+    out.write(json.dumps(items))
+
+
+def streamed_items(gph, out):
+    for i in gph.iter_architypes(stream=True):
+        out.write(json.dumps(i.serialize()) + "\n")
+
+
+class Sink:
+    def write(self, data):
+        pass
+
+
+def bench(func, *args):
+    tracemalloc.start()
+    start = time.perf_counter()
+    func(*args)
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return elapsed, peak
+
+
+def build_graph(size, mast=None):
+    # serializing objects looks up their master
+    mast = mast or JsOrc.master()
+    gph = Graph(m_id=mast._m_id, h=mast._h)
+    parents = [gph]
+    for n in range(size - 1):
+        nd = Node(m_id=mast._m_id, h=mast._h)
+        parents[n // 4].attach_outbound(nd)
+        parents.append(nd)
+    return gph
+
+
+def store_graph(size, path):
+    """Builds and commits a graph (and its master) to a sqlite store"""
+    hook = SqliteHook(path)
+    gph = build_graph(size, JsOrc.master(h=hook))
+    hook.commit()
+    return gph._m_id, gph.jid
+
+
+def reloaded(path, m_id, jid):
+    """Root of a stored graph read through a fresh hook, nothing cached yet"""
+    return SqliteHook(path).get_obj(m_id, jid)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 5000])
+    args = parser.parse_args()
+
+    print(
+        f"{'nodes':>7} {'export':>13} {'legacy':>10} {'current':>10} {'speedup':>9} "
+        f"{'legacy peak':>12} {'current peak':>13}"
+    )
+    tmp = tempfile.TemporaryDirectory()
+    for size in args.sizes:
+        gph = build_graph(size)
+        path = os.path.join(tmp.name, f"graph{size}.db")
+        ids = store_graph(size, path)
+        runs = [
+            ("dot", (legacy_dot, gph), (gph.traversing_dot_str,)),
+            ("ndjson", (legacy_items, gph, Sink()), (streamed_items, gph, Sink())),
+            (
+                "dot store",
+                (legacy_dot, reloaded(path, *ids)),
+                (reloaded(path, *ids).traversing_dot_str,),
+            ),
+            (
+                "ndjson store",
+                (legacy_items, reloaded(path, *ids), Sink()),
+                (streamed_items, reloaded(path, *ids), Sink()),
+            ),
+        ]
+        for name, old_args, new_args in runs:
+            old, old_peak = bench(*old_args)
+            new, new_peak = bench(*new_args)
+            print(
+                f"{size:>7} {name:>13} {old:>9.3f}s {new:>9.3f}s x{old / new:>7.1f} "
+                f"{old_peak / 2**20:>10.1f}MB {new_peak / 2**20:>11.1f}MB"
+            )
+    tmp.cleanup()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""
+Add, contains and remove time of IdList with its id index against the
+previous list-only IdList, whose duplicate checks, membership tests (e.g.
+access checks) and removals scanned the whole list.
+
+python bench_id_list.py --sizes 10000 50000 100000
+"""
+import argparse
+import random
+import time
+import uuid
+
+from jaseci.jsorc.memory import MemoryHook
+from jaseci.prim.node import Node
+from jaseci.utils.id_list import IdList
+
+
+class LegacyIdList(list):
+    """Membership as it was before the id index, a scan of the list"""
+
+    def __init__(self, parent_obj, auto_save=True, in_list=None):
+        self.parent_obj = parent_obj
+        if in_list:
+            self.extend(in_list)
+
+
+def add_all(ids, cls, parent):
+    lst = cls(parent, auto_save=False)
+    for i in ids:
+        # add_obj's duplicate check
+        if i not in lst:
+            lst.append(i)
+    return lst
+
+
+def bench(ids, probes, cls, parent):
+    start = time.perf_counter()
+    lst = add_all(ids, cls, parent)
+    add = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for i in probes:
+        i in lst
+    contains = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for i in probes:
+        lst.remove(i)
+    remove = time.perf_counter() - start
+    return add, contains, remove
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 100000])
+    parser.add_argument("--probes", type=int, default=1000)
+    args = parser.parse_args()
+
+    parent = Node(m_id=0, h=MemoryHook())
+    print(f"{'size':>8} {'op':>9} {'legacy':>10} {'indexed':>10} {'speedup':>9}")
+    for size in args.sizes:
+        ids = [uuid.uuid4().urn for i in range(size)]
+        probes = random.sample(ids, min(args.probes, size))
+        legacy = bench(ids, probes, LegacyIdList, parent)
+        current = bench(ids, probes, IdList, parent)
+        for op, old, new in zip(["add", "contains", "remove"], legacy, current):
+            print(f"{size:>8} {op:>9} {old:>9.4f}s {new:>9.4f}s x{old / new:>7.1f}")
+
+
+if __name__ == "__main__":
+    main()
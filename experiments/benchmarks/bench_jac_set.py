@@ -0,0 +1,84 @@
+"""
+Build, membership and set algebra time of JacSet with its jid index against
+the previous list-only JacSet, whose dedup on add and membership tests (e.g.
+visibility pruning and set union/difference of frontiers) scanned the list.
+
+python bench_jac_set.py --sizes 1000 10000
+"""
+import argparse
+import random
+import time
+
+from jaseci.jsorc.memory import MemoryHook
+from jaseci.prim.node import Node
+from jaseci.jac.jac_set import JacSet
+
+
+class LegacyJacSet(list):
+    """JacSet as it was before the jid index, membership scans the list"""
+
+    def __init__(self, in_list=None):
+        if in_list:
+            for i in in_list:
+                if i not in self:
+                    self.append(i)
+
+    def add_obj(self, item):
+        if item not in self:
+            self.append(item)
+
+    def __add__(self, other):
+        ret = type(self)()
+        for i in self:
+            ret.add_obj(i)
+        for i in other:
+            if i not in ret:
+                ret.add_obj(i)
+        return ret
+
+    def __sub__(self, other):
+        ret = type(self)()
+        for i in self:
+            if i not in other:
+                ret.add_obj(i)
+        return ret
+
+
+def bench(left, right, probes, cls):
+    start = time.perf_counter()
+    lset, rset = cls(in_list=left), cls(in_list=right)
+    build = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for i in probes:
+        i in lset
+    contains = time.perf_counter() - start
+
+    start = time.perf_counter()
+    lset + rset
+    lset - rset
+    algebra = time.perf_counter() - start
+    return build, contains, algebra
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000])
+    parser.add_argument("--probes", type=int, default=1000)
+    args = parser.parse_args()
+
+    h = MemoryHook()
+    print(f"{'size':>8} {'op':>9} {'legacy':>10} {'indexed':>10} {'speedup':>9}")
+    for size in args.sizes:
+        nodes = [Node(m_id=0, h=h, auto_save=False) for i in range(size * 3 // 2)]
+        # two frontiers of size that overlap by half
+        left, right = nodes[:size], nodes[size // 2 :]
+        probes = random.sample(nodes, min(args.probes, len(nodes)))
+        legacy = bench(left, right, probes, LegacyJacSet)
+        current = bench(left, right, probes, JacSet)
+        for op, old, new in zip(["build", "contains", "algebra"], legacy, current):
+            print(f"{size:>8} {op:>9} {old:>9.4f}s {new:>9.4f}s x{old / new:>7.1f}")
+
+
+if __name__ == "__main__":
+    main()
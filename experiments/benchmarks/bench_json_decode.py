@@ -0,0 +1,89 @@
+"""
+Decoding time of deeply nested node contexts with JaseciJsonDecoder against
+the previous decoder, which re-walked every nested value from each
+object_hook call and fetched every __mem_id__ on its own.
+
+python bench_json_decode.py --depth 8 --width 4 --refs 50
+"""
+import argparse
+import json
+import time
+from json import JSONDecoder
+
+from jaseci.jsorc.memory import MemoryHook
+from jaseci.prim.node import Node
+from jaseci.utils.json_handler import JaseciJsonDecoder, JaseciJsonEncoder
+
+
+class LegacyJsonDecoder(JSONDecoder):
+    """Decoder as it was before references were batched"""
+
+    def __init__(self, *args, hook=None, **kwargs):
+        self.hook = hook
+        self.fetches = 0
+        JSONDecoder.__init__(self, object_hook=self.object_hook, *args, **kwargs)
+
+    def object_hook(self, obj):
+        if "__mem_id__" in obj:
+            return self.convert(obj["__mem_id__"])
+        for k in obj:
+            self.transform(obj, k)
+        return obj
+
+    def transform(self, obj, key):
+        if isinstance(obj[key], dict):
+            if "__mem_id__" in obj[key]:
+                obj[key] = self.convert(obj[key]["__mem_id__"])
+            else:
+                for k in obj[key]:
+                    self.transform(obj[key], k)
+        elif isinstance(obj[key], (list, tuple)):
+            for idx, k in enumerate(obj[key]):
+                self.transform(obj[key], idx)
+
+    def convert(self, urn):
+        return self.hook.get_obj_from_store(urn)
+
+
+def nested(depth, width, refs, counter):
+    if depth == 0:
+        counter[0] += 1
+        return refs[counter[0] % len(refs)] if counter[0] % 3 == 0 else counter[0]
+    return {
+        f"k{i}": [nested(depth - 1, width, refs, counter)]
+        if i % 2
+        else nested(depth - 1, width, refs, counter)
+        for i in range(width)
+    }
+
+
+def bench(blob, cls, hook, repeat):
+    start = time.perf_counter()
+    for r in range(repeat):
+        json.loads(blob, cls=cls, hook=hook)
+    return (time.perf_counter() - start) / repeat
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--depth", type=int, default=8)
+    parser.add_argument("--width", type=int, default=4)
+    parser.add_argument("--refs", type=int, default=50)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    hook = MemoryHook()
+    refs = [Node(m_id=0, h=hook) for i in range(args.refs)]
+    context = nested(args.depth, args.width, refs, [0])
+    blob = json.dumps({"context": context}, cls=JaseciJsonEncoder)
+
+    legacy = bench(blob, LegacyJsonDecoder, hook, args.repeat)
+    current = bench(blob, JaseciJsonDecoder, hook, args.repeat)
+    print(f"depth {args.depth}, width {args.width}, {len(blob)} bytes")
+    print(f"legacy decoder  {legacy:.4f}s")
+    print(f"current decoder {current:.4f}s")
+    print(f"speedup x{legacy / current:.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+"""
+net.pack / net.unpack time of a subgraph: jid keyed dicts, fast edge views
+and deferred saves against the previous pack, which gathered edges into a
+list-backed set with a scan per edge and loaded both end nodes of each, and
+the previous unpack, which saved and connected every element one at a time.
+Also compares json size and encode time of the row and columnar layouts.
+
+python bench_net_pack.py --sizes 5000 20000
+python bench_net_pack.py --sizes 100000 --no-legacy
+"""
+import argparse
+import json
+import time
+
+from jaseci.extens.act_lib import net
+from jaseci.jac.jac_set import JacSet
+from jaseci.jsorc.jsorc import JsOrc
+from jaseci.prim.edge import Edge
+from jaseci.prim.graph import Graph
+from jaseci.prim.node import Node
+from jaseci.utils.graph_loader import GraphLoader
+from jaseci.utils.utils import master_from_meta
+
+
+def legacy_pack(item_set):
+    graph_dict = {"nodes": [], "edges": []}
+    idx_map = {}
+    edge_set = []
+    for i in item_set.obj_list():
+        if isinstance(i, Node):
+            idx_map[i.jid] = len(graph_dict["nodes"])
+            graph_dict["nodes"].append({"name": i.name, "ctx": i.context})
+            for j in i.attached_edges():
+                if j not in edge_set:
+                    edge_set.append(j)
+    for i in edge_set:
+        fnd = i.from_node()
+        tnd = i.to_node()
+        if fnd.jid in idx_map.keys() and tnd.jid in idx_map.keys():
+            graph_dict["edges"].append(
+                {
+                    "name": i.name,
+                    "ctx": i.context,
+                    "connect": [idx_map[fnd.jid], idx_map[tnd.jid]],
+                    "bi_dir": i.is_bidirected(),
+                }
+            )
+    return graph_dict
+
+
+def legacy_unpack(graph_dict, meta):
+    mast = master_from_meta(meta)
+    item_set = JacSet()
+    node_list = []
+    for i in graph_dict["nodes"]:
+        node_list.append(Node(m_id=mast._m_id, h=mast._h, kind="node", name=i["name"]))
+        node_list[-1].context = i["ctx"]
+        item_set.add_obj(node_list[-1])
+        node_list[-1].save()
+    for i in graph_dict["edges"]:
+        this_edge = Edge(m_id=mast._m_id, h=mast._h, kind="edge", name=i["name"])
+        this_edge.connect(
+            node_list[i["connect"][0]], node_list[i["connect"][1]], i["bi_dir"]
+        )
+        item_set.add_obj(this_edge)
+        this_edge.save()
+    return item_set
+
+
+def build_subgraph(mast, size):
+    """Tree of size nodes under a fresh root, four children per node"""
+    gph = Graph(m_id=mast._m_id, h=mast._h)
+    loader = GraphLoader(mast._m_id, mast._h, gph)
+    loader.load(
+        [(n, "node", {"idx": n}) for n in range(size)],
+        [("generic", {}, None, 0)]
+        + [("generic", {}, n // 4, n) for n in range(1, size)],
+    )
+    loader.save()
+    mast._h.commit()
+    return JacSet(in_list=list(loader.nodes.values()))
+
+
+def timed(func, *args):
+    start = time.perf_counter()
+    ret = func(*args)
+    return ret, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[5000, 20000])
+    parser.add_argument("--no-legacy", action="store_true")
+    args = parser.parse_args()
+
+    mast = JsOrc.master()
+    meta = {"h": mast._h, "m_id": mast._m_id}
+    print(f"{'nodes':>7} {'op':>15} {'legacy':>10} {'current':>10} {'speedup':>9}")
+    for size in args.sizes:
+        rows, pack = timed(net.pack, build_subgraph(mast, size))
+        cols, pack_cols = timed(net.pack, build_subgraph(mast, size), False, True)
+        unpack = timed(net.unpack, rows, meta)[1]
+        unpack_cols = timed(net.unpack, cols, meta)[1]
+        rows_json, dump = timed(json.dumps, rows)
+        cols_json, dump_cols = timed(json.dumps, cols)
+        if args.no_legacy:
+            old_pack = old_unpack = float("nan")
+        else:
+            old_pack = timed(legacy_pack, build_subgraph(mast, size))[1]
+            old_unpack = timed(legacy_unpack, rows, meta)[1]
+        runs = [
+            ("pack", old_pack, pack),
+            ("pack columnar", old_pack, pack_cols),
+            ("unpack", old_unpack, unpack),
+            ("unpack columnar", old_unpack, unpack_cols),
+            ("json rows", dump, dump),
+            ("json columnar", dump, dump_cols),
+        ]
+        for op, old, new in runs:
+            print(f"{size:>7} {op:>15} {old:>9.3f}s {new:>9.3f}s x{old / new:>7.1f}")
+        print(
+            f"{size:>7} {'json bytes':>15} {len(rows_json):>10} {len(cols_json):>10} "
+            f"x{len(rows_json) / len(cols_json):>7.1f}"
+        )
+        mast._h.commit()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,337 @@
+# IdList as it was before it was slotted, kept verbatim as the baseline of
+# bench_element_memory.py: jaseci_core/jaseci/utils/id_list.py at commit
+# 4dd53c0, only these comment lines were added.
+"""
+ID list class for Jaseci
+
+Generalized functions for managing '_ids' convention for lists of Jaseci
+objects
+
+parent_obj is the instance that the list belongs to
+"""
+import bisect
+
+from jaseci.utils.utils import logger
+
+
+class IdList(list):
+    """
+    ID list class for tracking lists of objects in Jaseci
+
+    ingest_list is a list of hex strings to convert to UUID and append.
+
+    Keeps a companion index of id -> count next to the list so membership
+    checks are O(1), and the slot each id was appended at so removals find
+    its position with a bisect over the slots dropped since, instead of
+    comparing against every id before it. Every list mutation goes through
+    the overrides below to keep both in sync. Neither is pickled or copied,
+    they are rebuilt from the list when loaded
+    """
+
+    # None while list items are restored ahead of state (unpickling)
+    id_index = None
+    id_slots = None
+    list_name = None
+    # removals to fall back to a scan for before rebuilding stale slots
+    STALE_REMOVES = 4
+
+    def __init__(self, parent_obj, auto_save=True, in_list=None):
+        self.parent_obj = parent_obj
+        self.cached_objects = []
+        self.heal_list = []
+        self.auto_save = auto_save
+        self.list_name = None
+        self.index_rebuild()
+        self.slots_rebuild()
+        if in_list:
+            self.extend(in_list)
+
+    def cache_reset(self):
+        self.cached_objects = []
+
+    # ------------------- INDEX ------------------- #
+
+    def index_rebuild(self):
+        self.id_index = {}
+        for i in self:
+            self.id_index[i] = self.id_index.get(i, 0) + 1
+        self.slots_stale()
+
+    def slots_rebuild(self):
+        """Slots of ids are their positions again"""
+        self.id_slots = {}
+        for pos, i in enumerate(self):
+            self.id_slots.setdefault(i, pos)
+        self.next_slot = len(self)
+        self.dropped_slots = []
+        self.stale_removes = 0
+
+    def slots_stale(self):
+        """Positions were shuffled, slots are rebuilt when removals need them"""
+        self.id_slots = None
+        self.stale_removes = 0
+
+    def index_add(self, item):
+        if self.id_index is None:
+            return
+        count = self.id_index.get(item, 0)
+        self.id_index[item] = count + 1
+        if self.id_slots is not None:
+            if not count:
+                self.id_slots[item] = self.next_slot
+            self.next_slot += 1
+
+    def index_drop(self, item):
+        if self.id_index is None:
+            return
+        count = self.id_index[item] - 1
+        if count:
+            self.id_index[item] = count
+        else:
+            del self.id_index[item]
+
+    def slot_drop(self, item):
+        """Marks the slot of item (its only copy) as dropped"""
+        slot = self.id_slots.pop(item)
+        bisect.insort(self.dropped_slots, slot)
+        if len(self.dropped_slots) > len(self):
+            self.slots_rebuild()
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        for i in ["id_index", "id_slots", "next_slot", "dropped_slots"]:
+            state.pop(i, None)
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.index_rebuild()
+
+    def __contains__(self, item):
+        if self.id_index is None:
+            return list.__contains__(self, item)
+        return item in self.id_index
+
+    def count(self, item):
+        if self.id_index is None:
+            return list.count(self, item)
+        return self.id_index.get(item, 0)
+
+    def append(self, item):
+        list.append(self, item)
+        self.index_add(item)
+
+    def extend(self, items):
+        items = list(items)
+        list.extend(self, items)
+        for i in items:
+            self.index_add(i)
+
+    def __iadd__(self, items):
+        self.extend(items)
+        return self
+
+    def insert(self, pos, item):
+        list.insert(self, pos, item)
+        self.index_add(item)
+        self.slots_stale()
+
+    def __imul__(self, times):
+        list.__imul__(self, times)
+        self.index_rebuild()
+        return self
+
+    def sort(self, *args, **kwargs):
+        list.sort(self, *args, **kwargs)
+        self.slots_stale()
+
+    def reverse(self):
+        list.reverse(self)
+        self.slots_stale()
+
+    def remove(self, item):
+        if item not in self:
+            raise ValueError(f"{item} not in IdList")
+        if self.id_slots is None and self.id_index is not None:
+            self.stale_removes += 1
+            if self.stale_removes > self.STALE_REMOVES:
+                self.slots_rebuild()
+        if self.id_slots is not None and item in self.id_slots:
+            slot = self.id_slots[item]
+            list.__delitem__(self, slot - bisect.bisect_left(self.dropped_slots, slot))
+            self.slot_drop(item)
+        else:
+            list.remove(self, item)
+            if self.id_slots is not None:
+                self.slots_stale()
+        self.index_drop(item)
+
+    def pop(self, pos=-1):
+        item = list.pop(self, pos)
+        if self.id_slots is not None:
+            if self.count(item) == 1 and item in self.id_slots:
+                self.slot_drop(item)
+            else:
+                self.slots_stale()
+        self.index_drop(item)
+        return item
+
+    def clear(self):
+        list.clear(self)
+        if self.id_index is not None:
+            self.index_rebuild()
+            self.slots_rebuild()
+
+    def __setitem__(self, pos, value):
+        if isinstance(pos, slice):
+            list.__setitem__(self, pos, value)
+            self.index_rebuild()
+        else:
+            self.slots_stale()
+            self.index_drop(list.__getitem__(self, pos))
+            list.__setitem__(self, pos, value)
+            self.index_add(value)
+
+    def __delitem__(self, pos):
+        if isinstance(pos, slice):
+            list.__delitem__(self, pos)
+            self.index_rebuild()
+        else:
+            self.pop(pos)
+
+    def add_obj(self, obj, push_front=False, allow_dups=False, silent=False):
+        """Adds a obj obj to Jaseci object"""
+        self.parent_obj.check_hooks_match(obj)
+        if not allow_dups and obj.jid in self:
+            if not silent:
+                logger.warning(str(f"{obj} is already in {self.parent_obj}'s list"))
+        else:
+            self.cache_reset()
+            if push_front:
+                self.insert(0, obj.jid)
+            else:
+                self.append(obj.jid)
+            if not obj.j_parent:
+                obj.j_parent = self.parent_obj.jid
+                self.save(obj)
+            self.save()
+
+    def add_obj_list(self, obj_list, push_front=False, allow_dups=False, silent=False):
+        self.cache_reset()
+        if push_front:
+            obj_list.reverse()
+        for i in obj_list:
+            self.add_obj(i, push_front=push_front, allow_dups=allow_dups, silent=silent)
+
+    def remove_obj(self, obj):
+        """Remove a Jaseci obj from list"""
+        self.cache_reset()
+        self.remove(obj.jid)
+        self.save()
+
+    def heal(self):
+        for i in self.heal_list:
+            self.remove(i)
+        if len(self.heal_list) and hasattr(self.parent_obj, "save"):
+            self.save()
+        self.heal_list = []
+
+    def destroy_obj(self, obj):
+        """Completely destroys a Jaseci obj obj by it's name"""
+        self.remove_obj(obj)
+        obj.destroy()
+
+    def obj_for_id_not_exist_error(self, item_id):
+        self.heal_list.append(item_id)
+        if self.list_name is None:
+            self.list_name = "id_list"
+            for k, v in self.parent_obj.__dict__.items():
+                if v is self:
+                    self.list_name = k
+        return f"{item_id} not found in {self.list_name} of {self.parent_obj}!"
+
+    def get_obj_by_name(self, name, kind=None, silent=False):
+        """Returns a Jaseci obj obj by it's name"""
+        ret = None
+        for i in self:
+            obj = self.parent_obj._h.get_obj(self.parent_obj._m_id, i)
+            if not obj:
+                logger.critical(self.obj_for_id_not_exist_error(i))
+                continue
+            if obj.name == name:
+                if kind and obj.kind != kind:
+                    continue
+                ret = obj
+                break
+        if not ret and not silent:
+            logger.error(str(f"object for '{name}' not found in '{self.parent_obj}'!"))
+        self.heal()
+        return ret
+
+    def has_obj_by_name(self, name, kind=None):
+        """Returns whether a Jaseci obj exists by it's name"""
+        return self.get_obj_by_name(name, kind, silent=True) is not None
+
+    def remove_obj_by_name(self, name, kind=None):
+        """Remove a Jaseci obj by it's name"""
+        self.remove_obj(self.get_obj_by_name(name, kind))
+
+    def destroy_obj_by_name(self, name, kind=None):
+        """Destroy a Jaseci obj by it's name"""
+        self.destroy_obj(self.get_obj_by_name(name, kind))
+
+    def obj_list(self):
+        """Return list of objects from ids"""
+        if not len(self.cached_objects):
+            objs = self.parent_obj._h.get_obj_many(self.parent_obj._m_id, self)
+            for i, obj in zip(self, objs):
+                if not obj:
+                    logger.critical(self.obj_for_id_not_exist_error(i))
+                else:
+                    self.cached_objects.append(obj)
+        self.heal()
+        return self.cached_objects.copy()
+
+    def remove_all(self):
+        """Remove a Jaseci obj obj by it's name"""
+        for i in self.obj_list():
+            self.remove_obj(i)
+        if len(self):
+            logger.critical(
+                str(
+                    f"Remove all failed in id_list of {self.parent_obj} - "
+                    + f"still has {self}!"
+                )
+            )
+
+    def destroy_all(self):
+        """Remove a Jaseci obj obj by it's name"""
+        for i in self.obj_list():
+            self.destroy_obj(i)
+        if len(self):
+            logger.critical(
+                str(
+                    f"Destroy all failed in id_list of {self.parent_obj} - "
+                    + f"still has {self}!"
+                )
+            )
+
+    def first_obj(self):
+        """Get first object in list"""
+        if not self:
+            logger.error(str(f"List in '{self.parent_obj}' is empty!"))
+            return None
+        return self.parent_obj._h.get_obj(self.parent_obj._m_id, self[0])
+
+    def pop_first_obj(self):
+        """Get first object in list"""
+        ret = self.first_obj()
+        if ret:
+            self.remove_obj(ret)
+        return ret
+
+    def save(self, obj=None):
+        if self.auto_save:
+            self.parent_obj.save()
+        if obj:
+            obj.save()
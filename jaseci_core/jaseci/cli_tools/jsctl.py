@@ -7,6 +7,7 @@ import json
 import os
 import pickle
 import webbrowser
+from types import GeneratorType
 import click
 import requests
 from click_shell import shell
@@ -17,6 +18,7 @@ from jaseci.utils.utils import copy_func
 from .book_tools import Book, modifiedBook
 from jaseci.utils.utils import logger, perf_test_start, perf_test_stop, find_first_api
 from jaseci.jsorc.jsorc import JsOrc
+from jaseci.jsorc.sqlite import SqliteHook
 
 session = None
 
@@ -35,6 +37,55 @@ def reset_state():
 reset_state()
 
 
+def load_session(filename):
+    """
+    Reopens the session's sqlite store from the pickled connection metadata,
+    objects are then loaded from the store as they are used
+    """
+    global session
+    with open(filename, "rb") as f:
+        meta = pickle.load(f)
+    if "store" not in meta:
+        # older session files pickled the whole session
+        session = meta
+        return
+    hook = SqliteHook(meta["store"])
+    session = {
+        "filename": filename,
+        "user": [hook.get_obj(i, i, override=True) for i in meta["user"]],
+        "mem-only": False,
+        "connection": meta["connection"],
+    }
+    session["master"] = hook.get_obj(meta["master"], meta["master"], override=True)
+
+
+def save_session():
+    """
+    Commits changes of this command to the session's sqlite store and pickles
+    only the metadata needed to reopen it, so the cost does not grow with
+    the graph
+    """
+    if session["mem-only"]:
+        return
+    hook = session["master"]._h
+    if not isinstance(hook, SqliteHook):
+        # first save of a new (or older) session moves its objects over
+        mem_hook = hook
+        hook = SqliteHook(session["filename"] + ".db")
+        hook.adopt(mem_hook)
+    hook.commit()
+    with open(session["filename"], "wb") as f:
+        pickle.dump(
+            {
+                "store": hook.path,
+                "user": [i.jid for i in session["user"]],
+                "master": session["master"].jid,
+                "connection": session["connection"],
+            },
+            f,
+        )
+
+
 def is_connected():
     return bool(session["connection"]["url"])
 
@@ -61,10 +112,8 @@ def jsctl(filename, mem_only):
     """
     The Jaseci Command Line Interface
     """
-    global session
     if not mem_only and os.path.isfile(filename):
-        with open(filename, "rb") as f:
-            session = pickle.load(f)
+        load_session(filename)
     session["mem-only"] = mem_only
     session["filename"] = filename if not mem_only else None
 
@@ -74,7 +123,6 @@ def jac():
     """
     Jac tool for building, running, and disassembling Jac programs
     """
-    global session
     session["mem-only"] = True
 
 
@@ -130,6 +178,9 @@ def interface_api(api_name, is_public, is_cli_only, **kwargs):
         else:
             click.echo(f"Code file {kwargs['code']} not found!")
             return
+    if api_name == "graph_bulk_load" and os.path.isfile(kwargs.get("data") or ""):
+        with open(kwargs["data"], "r") as file:
+            kwargs["data"] = file.read()
     resolve_none_type(kwargs)
     if not is_cli_only and is_connected():
         out = remote_api_call(kwargs, api_name)
@@ -145,14 +196,14 @@ def interface_api(api_name, is_public, is_cli_only, **kwargs):
         out = out["report_custom"]
     if isinstance(out, dict) or isinstance(out, list):
         out = json.dumps(out, indent=2)
+    elif isinstance(out, GeneratorType):
+        out = "\n".join(json.dumps(i) for i in out)
     click.echo(out)
     if "output" in kwargs and kwargs["output"]:
         with open(kwargs["output"], "w") as f:
             f.write(out)
         click.echo(f'[saved to {kwargs["output"]}]')
-    if not session["mem-only"]:
-        with open(session["filename"], "wb") as f:
-            pickle.dump(session, f)
+    save_session()
 
 
 def extract_api_tree():
@@ -267,9 +318,7 @@ def login(url, username, password):
         click.echo(f"Token: {r['token']}\nLogin successful!")
     else:
         click.echo("Login failed!\n")
-    if not session["mem-only"]:
-        with open(session["filename"], "wb") as f:
-            pickle.dump(session, f)
+    save_session()
 
 
 @click.command(help="Launch Jaseci Studio")
@@ -313,9 +362,7 @@ def publogin(url):
         click.echo("Login successful!")
     else:
         click.echo("Login failed!\n")
-    if not session["mem-only"]:
-        with open(session["filename"], "wb") as f:
-            pickle.dump(session, f)
+    save_session()
 
 
 @click.command(help="Command to log out of live Jaseci server")
@@ -357,6 +404,8 @@ def clear():
 
 @click.command(help="Reset jsctl (clears state)")
 def reset():
+    if isinstance(session["master"]._h, SqliteHook):
+        session["master"]._h.clear_store()
     reset_state()
     click.echo("Jaseci State Cleared!")
 
@@ -4,6 +4,7 @@ from jaseci.cli_tools import jsctl
 from click.testing import CliRunner
 import json
 import os
+import tempfile
 
 from jaseci.jsorc.jsorc import JsOrc
 from jaseci.extens.svc.redis_svc import RedisService
@@ -105,6 +106,19 @@ class JsctlTest(TestCaseHelper, TestCase):
         self.assertIn('"n0" -> "n', r)
         self.assertIn('id="', r)
 
+    def test_jsctl_graph_bulk_load_file(self):
+        self.call(
+            f"sentinel register {os.path.dirname(__file__)}/zsb.jac -name zsb -set_active true"
+        )
+        self.call("walker run init")
+        lines = self.call("graph get -mode ndjson")
+        with tempfile.NamedTemporaryFile("w", suffix=".ndjson", delete=False) as f:
+            f.write(lines)
+        r = self.call_cast(f"graph bulk load {f.name}")
+        os.remove(f.name)
+        self.assertEqual((r["nodes"], r["edges"]), (1, 1))
+        self.assertEqual(len(self.call_cast("graph get")), 5)
+
     def test_jsctl_aliases(self):
         """Tests that alias mapping api works"""
         self.call(
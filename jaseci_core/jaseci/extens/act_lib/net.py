@@ -11,7 +11,7 @@ from jaseci.jsorc.live_actions import jaseci_action
 from jaseci.utils.utils import master_from_meta
 from jaseci.jac.jac_set import JacSet
 from jaseci.prim.node import Node
-from jaseci.prim.edge import Edge
+from jaseci.utils.graph_loader import GraphLoader, packed_rows
 import uuid
 
 
@@ -77,7 +77,7 @@ def min(item_set: JacSet):
 
 
 @jaseci_action()
-def pack(item_set: JacSet, destroy: bool = False):
+def pack(item_set: JacSet, destroy: bool = False, columnar: bool = False):
     """
     Convert a subgraph to a generalized dictionary format
 
@@ -97,32 +97,50 @@ def pack(item_set: JacSet, destroy: bool = False):
     dictionary if it contects two nodes within this input list.
     :param destroy: A flag indicating whether the original graph nodes covered by pack
     operation should be destroyed.
+    :param columnar: A flag to pack nodes and edges as parallel lists (names,
+    contexts, edge index pairs and bidirected flags) instead of a dictionary per
+    element, which is smaller and cheaper to serialize for large subgraphs.
     :returns: A generic and portable dictionary representation of the subgraph
     """
-    graph_dict = {"nodes": [], "edges": []}
-    idx_map = {}
-    edge_set = JacSet()
-    for i in item_set.obj_list():
-        if isinstance(i, Node):
-            node_pack = {"name": i.name, "ctx": i.context}
-            idx_map[i.jid] = len(graph_dict["nodes"])
-            graph_dict["nodes"].append(node_pack)
-            for j in i.attached_edges():
-                edge_set.add_obj(j)
-    for i in edge_set:
-        fnd = i.from_node()
-        tnd = i.to_node()
-        if fnd.jid in idx_map.keys() and tnd.jid in idx_map.keys():
-            edge_pack = {
-                "name": i.name,
-                "ctx": i.context,
-                "connect": [idx_map[fnd.jid], idx_map[tnd.jid]],
-                "bi_dir": i.is_bidirected(),
-            }
-            graph_dict["edges"].append(edge_pack)
+    nodes = [i for i in item_set.obj_list() if isinstance(i, Node)]
+    idx_map = {i.jid: n for n, i in enumerate(nodes)}
+    edges = {}
+    for i in nodes:
+        for j in i.attached_edge_views():
+            if j.from_node_id in idx_map and j.to_node_id in idx_map:
+                edges.setdefault(j.jid or id(j), j)
+    edges = list(edges.values())
+    if columnar:
+        graph_dict = {
+            "nodes": {
+                "name": [i.name for i in nodes],
+                "ctx": [i.context for i in nodes],
+            },
+            "edges": {
+                "name": [i.name for i in edges],
+                "ctx": [i.context for i in edges],
+                "connect": [
+                    [idx_map[i.from_node_id], idx_map[i.to_node_id]] for i in edges
+                ],
+                "bi_dir": [i.is_bidirected() for i in edges],
+            },
+        }
+    else:
+        graph_dict = {
+            "nodes": [{"name": i.name, "ctx": i.context} for i in nodes],
+            "edges": [
+                {
+                    "name": i.name,
+                    "ctx": i.context,
+                    "connect": [idx_map[i.from_node_id], idx_map[i.to_node_id]],
+                    "bi_dir": i.is_bidirected(),
+                }
+                for i in edges
+            ],
+        }
     if destroy:
-        for i in item_set.obj_list():
-            if isinstance(i, Node) and i.name != "root":
+        for i in nodes:
+            if i.name != "root":
                 i.destroy()
     return graph_dict
 
@@ -133,10 +151,11 @@ def unpack(graph_dict: dict, meta):
     Convert a packed dictionary to Jac graph elements
 
     This action takes a dictionary in the format produced by the packed action
-    to instantiate a set of nodes and edges corresponding to the subgraph represented
-    by the pack action. The original contexts that were pack will also be created.
-    Important Note: When using this unpack action, the unpacked collections of elements
-    returned must be connected to a source graph to avoid memory leaks.
+    (either of its layouts) to instantiate a set of nodes and edges corresponding
+    to the subgraph represented by the pack action. The original contexts that were
+    pack will also be created. Important Note: When using this unpack action, the
+    unpacked collections of elements returned must be connected to a source graph
+    to avoid memory leaks.
 
     :param graph_dict: A dictionary in the format produced by the pack action.
     :returns: A list of the nodes and edges that were created corresponding to the
@@ -144,33 +163,10 @@ def unpack(graph_dict: dict, meta):
     leak.
     """
     mast = master_from_meta(meta)
-    item_set = JacSet()
-    node_list = []
-    for i in graph_dict["nodes"]:
-        node_list.append(
-            Node(
-                m_id=mast._m_id,
-                h=mast._h,
-                kind="node",
-                name=i["name"],
-            )
-        )
-        node_list[-1].context = i["ctx"]
-        item_set.add_obj(node_list[-1])
-        node_list[-1].save()
-    for i in graph_dict["edges"]:
-        this_edge = Edge(
-            m_id=mast._m_id,
-            h=mast._h,
-            kind="edge",
-            name=i["name"],
-        )
-        this_edge.connect(
-            node_list[i["connect"][0]], node_list[i["connect"][1]], i["bi_dir"]
-        )
-        item_set.add_obj(this_edge)
-        this_edge.save()
-    return item_set
+    loader = GraphLoader(mast._m_id, mast._h)
+    loader.load(*packed_rows(graph_dict))
+    loader.save()
+    return JacSet(in_list=list(loader.nodes.values()) + loader.edge_objs())
 
 
 @jaseci_action()
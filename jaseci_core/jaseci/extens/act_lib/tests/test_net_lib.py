@@ -41,6 +41,15 @@ class NetLibTest(CoreTest):
         ret = self.call(self.mast, ["walker_run", {"name": "pack_unpack_terse"}])
         self.assertEqual(ret["report"][0], 16)
 
+    def test_pack_unpack_columnar(self):
+        self.call(
+            self.mast,
+            ["sentinel_register", {"code": self.load_jac("net_pack.jac")}],
+        )
+        ret = self.call(self.mast, ["walker_run", {"name": "pack_unpack_columnar"}])
+        self.assertEqual(ret["report"][0], [[0, 1], [1, 2], [2, 3], [3, 4]])
+        self.assertEqual(ret["report"][1], 16)
+
     def test_pack_and_destroy(self):
         self.call(
             self.mast,
@@ -5,6 +5,7 @@ from jaseci.extens.api.interface import Interface
 from jaseci.utils.id_list import IdList
 from jaseci.prim.graph import Graph
 from jaseci.prim.node import Node
+from jaseci.utils.graph_loader import bulk_load, ndjson_item
 import uuid
 
 
@@ -38,10 +39,16 @@ class GraphApi:
     ):
         """
         Return the content of the graph with mode
-        Valid modes: {default, dot, }
+        Valid modes: {default, dot, ndjson, }
+        ndjson yields each object as it is reached, served as a stream of
+        newline delimited json objects
         """
         if mode == "dot":
             return nd.traversing_dot_str(detailed, depth)
+        if mode == "ndjson":
+            return (
+                ndjson_item(i, detailed) for i in nd.iter_architypes(depth, stream=True)
+            )
 
         nodes, edges = nd.get_all_architypes(depth)
         items = []
@@ -51,6 +58,20 @@ class GraphApi:
             items.append(i.serialize(detailed=detailed))
         return items
 
+    @Interface.private_api(cli_args=["data"])
+    def graph_bulk_load(self, data: str, nd: Node = None):
+        """
+        Loads a whole graph into the graph of nd in one call
+        data is a packed graph (net.pack's rows or columns, edges with no
+        end connect to nd) or serialized objects as ndjson (as graph_get's
+        ndjson mode makes them, its graph object is nd). Objects are built
+        with deferred saves and committed together
+        """
+        try:
+            return bulk_load(nd, data)
+        except (ValueError, KeyError, IndexError) as e:
+            return {"success": False, "response": f"Invalid graph data: {e}"}
+
     @Interface.private_api()
     def graph_list(self, detailed: bool = False):
         """
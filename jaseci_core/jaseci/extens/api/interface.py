@@ -2,6 +2,7 @@
 General master interface engine for client interfaces as mixin
 """
 from inspect import signature, getdoc
+from types import GeneratorType
 from jaseci.utils.utils import logger, is_jsonable, is_true, exc_stack_as_str_list
 from jaseci.prim.element import Element
 from jaseci.prim.walker import Walker
@@ -194,7 +195,8 @@ class Interface:
             return self.interface_error(
                 f"Internal Exception: {e}", stack=exc_stack_as_str_list()
             )
-        if not is_jsonable(ret):
+        # generators are streamed, each item is serialized as it is sent
+        if not isinstance(ret, GeneratorType) and not is_jsonable(ret):
             return self.interface_error(f"Non-JSON API ret {type(ret)}: {ret}")
         return ret
 
@@ -245,7 +247,8 @@ class Interface:
             return self.interface_error(
                 f"Internal Exception: {e}", stack=exc_stack_as_str_list()
             )
-        if not is_jsonable(ret):
+        # generators are streamed, each item is serialized as it is sent
+        if not isinstance(ret, GeneratorType) and not is_jsonable(ret):
             return self.interface_error(
                 str(f"API returns non json object {type(ret)}: {ret}")
             )
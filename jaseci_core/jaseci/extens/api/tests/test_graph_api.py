@@ -1,3 +1,5 @@
+import json
+
 from jaseci.utils.test_core import CoreTest
 
 
@@ -22,6 +24,88 @@ class GraphApiTest(CoreTest):
         ret = self.call(self.mast, ["graph_get", {"depth": 1}])
         self.assertEqual(len(ret), 1)
 
+    def test_graph_get_ndjson_streams_same_objects(self):
+        self.call(
+            self.mast,
+            ["sentinel_register", {"code": self.load_jac("fam.jac")}],
+        )
+        self.call(self.mast, ["walker_run", {"name": "create_fam"}])
+        items = self.call(self.mast, ["graph_get", {}])
+        streamed = list(self.call(self.mast, ["graph_get", {"mode": "ndjson"}]))
+        self.assertEqual(
+            sorted(i["jid"] for i in streamed), sorted(i["jid"] for i in items)
+        )
+        # fast edges are serialized from views, as their Edges would be
+        by_jid = {i["jid"]: i for i in items}
+        for i in streamed:
+            # edges also carry their direction for graph_bulk_load
+            self.assertEqual(
+                dict(i, j_timestamp=None, bidirected=None),
+                dict(by_jid[i["jid"]], j_timestamp=None, bidirected=None),
+            )
+        dot = self.call(self.mast, ["graph_get", {"mode": "dot"}])
+        self.assertEqual(len(dot.split("\n")), len(items) + 2)
+        self.assertIn('"n0" -> "n1"', dot)
+
+    def test_graph_bulk_load_ndjson_and_columns(self):
+        self.call(
+            self.mast,
+            ["sentinel_register", {"code": self.load_jac("fam.jac")}],
+        )
+        self.call(self.mast, ["walker_run", {"name": "create_fam"}])
+        lines = "\n".join(
+            json.dumps(i)
+            for i in self.call(self.mast, ["graph_get", {"mode": "ndjson"}])
+        )
+        ret = self.call(self.mast, ["graph_bulk_load", {"data": lines}])
+        self.assertEqual((ret["nodes"], ret["edges"]), (3, 5))
+        self.assertEqual(len(self.call(self.mast, ["graph_get", {}])), 17)
+        # a second man hangs off root
+        ret = self.call(self.mast, ["graph_node_view", {"node_type": "man"}])
+        self.assertEqual(len(ret), 3)
+
+        packed = {
+            "nodes": {"name": ["man", "woman"], "ctx": [{}, {"name": "x"}]},
+            "edges": {
+                "name": ["generic", "married"],
+                "connect": [[None, 0], [0, 1]],
+                "bi_dir": [False, True],
+            },
+        }
+        ret = self.call(self.mast, ["graph_bulk_load", {"data": packed}])
+        self.assertEqual((ret["nodes"], ret["edges"]), (2, 2))
+        self.assertEqual(len(self.call(self.mast, ["graph_get", {}])), 21)
+        packed["edges"]["connect"][1][1] = "urn:uuid:missing"
+        ret = self.call(self.mast, ["graph_bulk_load", {"data": packed}])
+        self.assertFalse(ret["success"])
+        self.assertEqual(len(self.call(self.mast, ["graph_get", {}])), 21)
+
+    def test_graph_bulk_load_ndjson_keeps_bidirected(self):
+        packed = {
+            "nodes": {"name": ["man", "woman"], "ctx": [{}, {}]},
+            "edges": {
+                "name": ["generic", "married"],
+                "connect": [[None, 0], [0, 1]],
+                "bi_dir": [False, True],
+            },
+        }
+        self.call(self.mast, ["graph_create", {}])
+        self.call(self.mast, ["graph_bulk_load", {"data": packed}])
+        exported = list(self.call(self.mast, ["graph_get", {"mode": "ndjson"}]))
+        self.assertEqual(
+            [i["bidirected"] for i in exported if i.get("name") == "married"], [True]
+        )
+        lines = "\n".join(json.dumps(i) for i in exported)
+        self.call(self.mast, ["graph_bulk_load", {"data": lines}])
+        married = [
+            i
+            for i in self.call(
+                self.mast, ["graph_get", {"mode": "edge", "detailed": True}]
+            )
+            if i["name"] == "married"
+        ]
+        self.assertEqual([i["bidirected"] for i in married], [True, True])
+
     def test_graph_node_view(self):
         self.call(
             self.mast,
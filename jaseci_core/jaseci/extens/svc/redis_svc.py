@@ -1,5 +1,9 @@
 from jaseci.jsorc.jsorc import JsOrc
 from redis import Redis
+from redis.exceptions import WatchError
+
+# suffix of keys holding the j_version of the object stored under the key
+VERSION_SUFFIX = ":jv"
 
 
 @JsOrc.service(
@@ -13,6 +17,8 @@ class RedisService(JsOrc.CommonService):
     def run(self):
         self.app = Redis(**self.config, decode_responses=True)
         self.app.ping()
+        # binary payloads (msgpack) can not go through the decoding client
+        self.bin_app = Redis(**self.config)
 
     ###################################################
     #                     COMMONS                     #
@@ -21,15 +27,84 @@ class RedisService(JsOrc.CommonService):
     def get(self, name):
         return self.app.get(name)
 
+    def mget(self, names):
+        return self.app.mget(names)
+
+    def get_bytes(self, name):
+        return self.bin_app.get(name)
+
+    def mget_bytes(self, names):
+        return self.bin_app.mget(names)
+
     def set(self, name, val):
         self.app.set(name, val)
 
+    def mset(self, mapping, batch_size=0):
+        items = list(mapping.items())
+        batch_size = batch_size or len(items)
+        for i in range(0, len(items), batch_size):
+            self.app.mset(dict(items[i : i + batch_size]))
+
+    def mset_if_version(self, mapping, versions, batch_size=0, retries=3):
+        """
+        Sets keys of mapping only where the stored version still matches,
+        versions maps each key to (expected, new). A missing version key
+        always matches. Each batch is one WATCH / MULTI transaction, retried
+        up to retries times if a version changes in between, keys of a batch
+        still contended after that are left unset. Returns key -> stored
+        version of the keys left unset
+        """
+        keys = list(mapping.keys())
+        batch_size = batch_size or len(keys)
+        conflicts = {}
+        for i in range(0, len(keys), batch_size):
+            batch = keys[i : i + batch_size]
+            vkeys = [k + VERSION_SUFFIX for k in batch]
+            for attempt in range(retries + 1):
+                with self.app.pipeline() as pipe:
+                    try:
+                        pipe.watch(*vkeys)
+                        stored = {}
+                        for k, v in zip(batch, pipe.mget(vkeys)):
+                            if v is not None and int(v) != versions[k][0]:
+                                stored[k] = int(v)
+                        pipe.multi()
+                        ok = [k for k in batch if k not in stored]
+                        if ok:
+                            pipe.mset({k: mapping[k] for k in ok})
+                            pipe.mset({k + VERSION_SUFFIX: versions[k][1] for k in ok})
+                        pipe.execute()
+                        conflicts.update(stored)
+                        break
+                    except WatchError:
+                        continue
+            else:
+                # versions kept changing, the caller resolves against the latest
+                for k, v in zip(batch, self.app.mget(vkeys)):
+                    conflicts[k] = int(v) if v is not None else None
+        return conflicts
+
+    def mget_versions(self, names):
+        """Stored versions of names, None where unknown"""
+        return [
+            int(v) if v is not None else None
+            for v in self.app.mget([i + VERSION_SUFFIX for i in names])
+        ]
+
     def exists(self, name):
         return self.app.exists(name)
 
     def delete(self, name):
         self.app.delete(name)
 
+    def delete_many(self, names, batch_size=0, versions=False):
+        names = list(names)
+        if versions:
+            names += [i + VERSION_SUFFIX for i in names]
+        batch_size = batch_size or len(names)
+        for i in range(0, len(names), batch_size):
+            self.app.delete(*names[i : i + batch_size])
+
     def hget(self, name, key):
         return self.app.hget(name, key)
 
@@ -58,3 +133,4 @@ class RedisService(JsOrc.CommonService):
     def on_delete(self):
         if self.is_running():
             self.app.close()
+            self.bin_app.close()
@@ -12,7 +12,7 @@ from jaseci.prim.node import Node
 from jaseci.prim.edge import Edge
 from jaseci.prim.action import Action
 from jaseci.jac.jac_set import JacSet
-from jaseci.jac.ir.jac_code import jac_ast_to_ir, jac_ir_to_ast
+from jaseci.jac.ir.jac_code import jac_ast_to_ir, jac_ir_to_ast_cached
 from jaseci.jac.machine.jac_scope import JacScope
 from jaseci.jac.jsci_vm.machine import VirtualMachine
 from jaseci.jac.machine.machine_state import TryException
@@ -1396,9 +1396,8 @@ class Interp(VirtualMachine):
         if not location:
             location = self.current_node
         result = JacSet()
-        for i in location.outbound_edges() + location.bidirected_edges():
-            if len(kid) > 2 and not i.get_architype().is_instance(kid[2].token_text()):
-                continue
+        name = kid[2].token_text() if len(kid) > 2 else None
+        for i in location.adjacent_edges(["out", "bi"], name):
             result.add_obj(i)
         if len(kid) > 2 and kid[3].name == "filter_ctx":
             result = self.run_filter_ctx(kid[3], result)
@@ -1416,9 +1415,8 @@ class Interp(VirtualMachine):
         if not location:
             location = self.current_node
         result = JacSet()
-        for i in location.inbound_edges() + location.bidirected_edges():
-            if len(kid) > 2 and not i.get_architype().is_instance(kid[2].token_text()):
-                continue
+        name = kid[2].token_text() if len(kid) > 2 else None
+        for i in location.adjacent_edges(["in", "bi"], name):
             result.add_obj(i)
         if len(kid) > 2 and kid[3].name == "filter_ctx":
             result = self.run_filter_ctx(kid[3], result)
@@ -1437,9 +1435,8 @@ class Interp(VirtualMachine):
         if not location:
             location = self.current_node
         result = JacSet()
-        for i in location.attached_edges():
-            if len(kid) > 2 and not i.get_architype().is_instance(kid[2].token_text()):
-                continue
+        name = kid[2].token_text() if len(kid) > 2 else None
+        for i in location.adjacent_edges(["out", "in", "bi"], name):
             result.add_obj(i)
         if len(kid) > 2 and kid[3].name == "filter_ctx":
             result = self.run_filter_ctx(kid[3], result)
@@ -1822,7 +1819,7 @@ class Interp(VirtualMachine):
         )
         m._jac_scope.inherit_agent_refs(self._jac_scope, nd)
         try:
-            m.run_code_block(jac_ir_to_ast(act_list.get_obj_by_name(name).value))
+            m.run_code_block(jac_ir_to_ast_cached(act_list.get_obj_by_name(name).value))
         except Exception as e:
             self.rt_error(f"Internal Exception: {e}", m._cur_jac_ast)
         self.inherit_runtime_state(m)
@@ -1833,7 +1830,7 @@ class Interp(VirtualMachine):
         if node_set is None:
             node_set = self.current_node.attached_nodes()
         for i in node_set:
-            if i not in self.ignore_node_ids.obj_list():
+            if i.jid not in self.ignore_node_ids:
                 ret.add_obj(i)
         return ret
 
@@ -8,7 +8,7 @@ from jaseci.prim.node import Node
 from jaseci.jac.interpreter.interp import Interp
 from jaseci.jac.jac_set import JacSet
 from jaseci.jac.machine.jac_scope import JacScope
-from jaseci.jac.ir.jac_code import jac_ir_to_ast
+from jaseci.jac.ir.jac_code import jac_ir_to_ast_cached
 from jaseci.utils.id_list import IdList
 
 
@@ -231,7 +231,7 @@ class WalkerInterp(Interp):
             ):
                 continue
             if i.preset_in_out:
-                self.run_preset_in_out(jac_ir_to_ast(i.preset_in_out), nd, i)
+                self.run_preset_in_out(jac_ir_to_ast_cached(i.preset_in_out), nd, i)
             else:
                 self.call_ability(nd=nd, name=i.name, act_list=act_list)
             if not i.preset_in_out:  # All preset in and outs get executed
@@ -7,6 +7,8 @@ from jaseci.jac.ir.ast_builder import JacAstBuilder
 from jaseci.jac.ir.passes.schedule import multi_pass_optimizer
 from jaseci.jac.ir.ast import Ast
 import hashlib
+import threading
+from collections import OrderedDict
 from pathlib import Path
 from os.path import dirname
 
@@ -67,6 +69,44 @@ def jac_ir_to_ast(ir: str):
     return ir_load["ir"]
 
 
+# ASTs decoded from IR strings keyed by the md5 of the IR, shared by every
+# object holding the same IR. ASTs are not mutated once compiled (spawned
+# architypes already share them). Least recently used ones are dropped once
+# the IR they were decoded from adds up to more than IR_AST_CACHE_BYTES
+IR_AST_CACHE = OrderedDict()
+IR_AST_CACHE_BYTES = 64 * 1024 * 1024
+ir_ast_cache_lock = threading.Lock()
+ir_ast_cache_size = 0
+
+
+def jac_ir_to_ast_cached(ir: str):
+    """Convert IR string to AST, decoding each distinct IR once per process"""
+    global ir_ast_cache_size
+    sig = hashlib.md5(ir.encode()).hexdigest()
+    with ir_ast_cache_lock:
+        hit = IR_AST_CACHE.get(sig)
+        if hit is not None:
+            IR_AST_CACHE.move_to_end(sig)
+            return hit[0]
+    jac_ast = jac_ir_to_ast(ir)
+    if jac_ast is None:
+        return None
+    with ir_ast_cache_lock:
+        if sig not in IR_AST_CACHE:
+            IR_AST_CACHE[sig] = (jac_ast, len(ir))
+            ir_ast_cache_size += len(ir)
+        while ir_ast_cache_size > IR_AST_CACHE_BYTES and len(IR_AST_CACHE) > 1:
+            ir_ast_cache_size -= IR_AST_CACHE.popitem(last=False)[1][1]
+    return jac_ast
+
+
+def clear_ir_ast_cache():
+    global ir_ast_cache_size
+    with ir_ast_cache_lock:
+        IR_AST_CACHE.clear()
+        ir_ast_cache_size = 0
+
+
 class JacCode:
     """Obj mixin to code pickling"""
 
@@ -82,7 +122,7 @@ class JacCode:
         JacCode.__init__(self)
 
     def refresh(self):
-        self._jac_ast = jac_ir_to_ast(self.code_ir) if self.code_ir else None
+        self._jac_ast = jac_ir_to_ast_cached(self.code_ir) if self.code_ir else None
         if self._jac_ast:
             self.is_active = True
         else:
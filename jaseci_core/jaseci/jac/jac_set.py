@@ -8,23 +8,137 @@ from jaseci.utils.utils import logger
 from jaseci.prim.element import Element
 
 
+def jid_of(item):
+    """Key of item in a set's index, None for items that aren't elements"""
+    return item.jid if isinstance(item, Element) else None
+
+
+def jids_of(items):
+    """Index of jids in items, for O(1) membership tests against them"""
+    if isinstance(items, JacSet) and items.jid_index is not None:
+        return items.jid_index
+    return {i.jid for i in items if isinstance(i, Element)}
+
+
+def is_member(item, jids, items):
+    """Whether item is in items, looking elements up in their jids index"""
+    jid = jid_of(item)
+    return item in items if jid is None else jid in jids
+
+
 class JacSet(list):
     """
     Jac set class for operations in Jac lang
     (keeps append ordering and no dups)
+
+    Keeps a companion index of jid -> count next to the list so membership
+    and the set algebra below are O(1) per element instead of scanning the
+    other set. Every list mutation goes through the overrides below to keep
+    it in sync, it is not pickled and is rebuilt from the list when loaded
     """
 
+    # None while list items are restored ahead of state (unpickling)
+    jid_index = None
+
     def __init__(self, in_list=None):
+        self.jid_index = {}
         if in_list:
             for i in in_list:
                 if i not in self:
                     self.append(i)
 
+    # ------------------- INDEX ------------------- #
+
+    def index_rebuild(self):
+        self.jid_index = {}
+        for i in self:
+            self.index_add(i)
+
+    def index_add(self, item):
+        jid = jid_of(item)
+        if self.jid_index is not None and jid is not None:
+            self.jid_index[jid] = self.jid_index.get(jid, 0) + 1
+
+    def index_drop(self, item):
+        jid = jid_of(item)
+        if self.jid_index is None or jid is None:
+            return
+        count = self.jid_index[jid] - 1
+        if count:
+            self.jid_index[jid] = count
+        else:
+            del self.jid_index[jid]
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state.pop("jid_index", None)
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.index_rebuild()
+
+    def __contains__(self, item):
+        jid = jid_of(item)
+        if self.jid_index is None or jid is None:
+            return list.__contains__(self, item)
+        return jid in self.jid_index
+
+    def extend(self, items):
+        items = list(items)
+        list.extend(self, items)
+        for i in items:
+            self.index_add(i)
+
+    def __iadd__(self, items):
+        self.extend(items)
+        return self
+
+    def insert(self, pos, item):
+        list.insert(self, pos, item)
+        self.index_add(item)
+
+    def __imul__(self, times):
+        list.__imul__(self, times)
+        self.index_rebuild()
+        return self
+
+    def remove(self, item):
+        jid = jid_of(item)
+        if jid is not None and jid in self.jid_index:
+            # first copy of the same element, as equality is by jid here
+            for pos, i in enumerate(self):
+                if jid_of(i) == jid:
+                    item = i
+                    break
+            list.__delitem__(self, pos)
+        else:
+            list.remove(self, item)
+        self.index_drop(item)
+
+    def pop(self, pos=-1):
+        item = list.pop(self, pos)
+        self.index_drop(item)
+        return item
+
+    def clear(self):
+        list.clear(self)
+        self.jid_index = {}
+
+    def __setitem__(self, pos, value):
+        list.__setitem__(self, pos, value)
+        self.index_rebuild()
+
+    def __delitem__(self, pos):
+        list.__delitem__(self, pos)
+        self.index_rebuild()
+
     def append(self, item):
         if not isinstance(item, Element) or not hasattr(item, "anchor_value"):
             logger.error(f"Invalid {type(item)} object {item} to be added to jac_set!")
         elif item not in self:
             list.append(self, item)
+            self.index_add(item)
 
     def add_obj(self, item: Element):
         if item not in self:
@@ -94,24 +208,27 @@ class JacSet(list):
     def __sub__(self, other):
         """Returns new set with operation applied"""
         ret = JacSet()
+        other_jids = jids_of(other)
         for i in self:
-            if i not in other:
+            if not is_member(i, other_jids, other):
                 ret.add_obj(i)
         return ret
 
     def __mul__(self, other):
         """Returns new set with operation applied, mul is intersection"""
         ret = JacSet()
+        other_jids = jids_of(other)
         for i in self:
-            if i in other:
+            if is_member(i, other_jids, other):
                 ret.add_obj(i)
         return ret
 
     def __truediv__(self, other):
         """Returns new set with operation applied, div is 'outersection'"""
         ret = JacSet()
+        other_jids = jids_of(other)
         for i in self:
-            if i not in other:
+            if not is_member(i, other_jids, other):
                 ret.add_obj(i)
         for i in other:
             if i not in self:
@@ -3,6 +3,7 @@ from jaseci.jac.machine.machine_state import MachineState
 from jaseci.jac.jsci_vm.inst_ptr import InstPtr, from_bytes
 from jaseci.jac.machine.jac_value import JacValue
 from jaseci.jac.jsci_vm.disasm import DisAsm
+from jaseci.jac.ir.ast import Ast
 
 
 class Stack(object):
@@ -185,4 +186,8 @@ class VirtualMachine(MachineState, Stack, InstPtr):
             else self._cur_jac_ast.loc[2]
         )
         self._ip += 2 + byte_len_l + byte_len_f
-        self._cur_jac_ast.loc = [line, 0, jacfile, {}]
+        # the loc is the machine's own, asts are shared across machines
+        debug_ast = Ast(jacfile)
+        debug_ast.name = self._cur_jac_ast.name
+        debug_ast.loc[0] = line
+        self._cur_jac_ast = debug_ast
@@ -174,11 +174,12 @@ class MachineState:
         Returns nodes jac_set from edge jac_set from current node
         """
         ret = JacSet()
+        edge_ids = set()
+        for j in node_set.obj_list():
+            edge_ids.update(j.smart_edge_list)
         for i in edge_set.obj_list():
-            for j in node_set.obj_list():
-                if i.jid in j.smart_edge_list:
-                    ret.add_obj(i)
-                    break
+            if i.jid in edge_ids:
+                ret.add_obj(i)
         return ret
 
     def check_builtin_action(self, func_name, jac_ast=None):
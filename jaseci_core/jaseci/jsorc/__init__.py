@@ -1,7 +1,11 @@
 from jaseci.jsorc.memory import MemoryHook
 from jaseci.jsorc.redis import RedisHook
+from jaseci.jsorc.sqlite import SqliteHook
+from jaseci.jsorc.log_store import LogStoreHook
 
 __all__ = [
     "MemoryHook",
     "RedisHook",
+    "SqliteHook",
+    "LogStoreHook",
 ]
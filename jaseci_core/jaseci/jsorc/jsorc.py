@@ -76,6 +76,15 @@ class JsOrc:
             if cls.db_check():
                 hook = cls.hook()
                 config = hook.get_or_create_glob("JSORC_CONFIG", config)
+                warmup_config = cls.settings("WARMUP_CONFIG", {})
+                if warmup_config.get("enabled", False):
+                    from jaseci.jsorc.warmup import warmup
+
+                    warmup(
+                        hook,
+                        sentinel_ids=warmup_config.get("sentinels"),
+                        glob_names=warmup_config.get("globals"),
+                    )
             cls._backoff_interval = max(5, config.get("backoff_interval", 10))
             cls._regeneration_queues = config.get("pre_loaded_services", [])
             cls.push_interval(1)
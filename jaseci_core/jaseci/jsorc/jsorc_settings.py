@@ -26,6 +26,49 @@ class JsOrcSettings:
         "pre_loaded_services": [],
     }
 
+    # preloads caches when jsorc starts (see jaseci.jsorc.warmup)
+    WARMUP_CONFIG = {
+        "enabled": os.environ.get("JSORC_WARMUP") == "true",
+        "sentinels": [
+            i for i in os.getenv("JSORC_WARMUP_SENTINELS", "").split(",") if i
+        ],
+        "globals": [i for i in os.getenv("JSORC_WARMUP_GLOBALS", "").split(",") if i],
+    }
+
+    ###############################################################################################################
+    # -------------------------------------------------- HOOK --------------------------------------------------- #
+    ###############################################################################################################
+
+    HOOK_CONFIG = {
+        "bulk_commit": True,
+        "bulk_batch_size": 1000,
+        "redis_batch_size": 1000,
+        "l1_max_objects": int(os.getenv("JSORC_L1_MAX_OBJECTS", 0)),
+        "l1_ttl": int(os.getenv("JSORC_L1_TTL", 0)),
+        "codec": os.getenv("JSORC_HOOK_CODEC", "json"),
+        "compress_threshold": int(os.getenv("JSORC_COMPRESS_THRESHOLD", 0)),
+        "compress_level": 6,
+        "negative_cache_ttl": int(os.getenv("JSORC_NEGATIVE_CACHE_TTL", 5)),
+        "prefetch_depth": int(os.getenv("JSORC_PREFETCH_DEPTH", 0)),
+        "prefetch_fanout": int(os.getenv("JSORC_PREFETCH_FANOUT", 64)),
+        "edge_index": os.environ.get("JSORC_EDGE_INDEX") == "true",
+        "l1_invalidation": os.environ.get("JSORC_L1_INVALIDATION") == "true",
+        "occ": os.environ.get("JSORC_OCC") == "true",
+        "conflict_strategy": os.getenv("JSORC_CONFLICT_STRATEGY", "merge"),
+        "occ_retries": 3,
+        "write_behind": os.environ.get("JSORC_WRITE_BEHIND") == "true",
+        "write_behind_max_pending": 10000,
+        "write_behind_batch_size": 500,
+        "write_behind_interval": 0.5,
+        "write_behind_put_timeout": 5.0,
+        "sqlite_path": os.getenv("JSORC_SQLITE_PATH", "jaseci.db"),
+        "log_path": os.getenv("JSORC_LOG_PATH", "jaseci_log"),
+        "log_segment_size": 64 * 1024 * 1024,
+        "log_compact_ratio": 0.5,
+        "log_compact_interval": 30.0,
+        "log_fsync": True,
+    }
+
     ###############################################################################################################
     # -------------------------------------------------- KUBE --------------------------------------------------- #
     ###############################################################################################################
@@ -0,0 +1,187 @@
+"""
+This module includes code related to hooking an append-only segment log
+(see jaseci.utils.segment_log) to the core engine, for edge and offline
+deployments without a db or redis.
+"""
+import os
+
+from jaseci.utils.segment_log import GLOB_PUT, segment_log
+from jaseci.utils.utils import logger
+from jaseci.jsorc.memory import MemoryHook
+from jaseci.jsorc.jsorc import JsOrc
+
+
+#################################################
+#                LOG STORE HOOK                 #
+#################################################
+
+
+# only replaces redis/orm hooks when a log directory is configured
+@JsOrc.repository(name="hook", priority=3 if os.getenv("JSORC_LOG_PATH") else -1)
+class LogStoreHook(MemoryHook):
+    """
+    Hooks a memory mapped append-only segment log for Jaseci objects and
+    globals to Jaseci's core engine, writes only land on commit. There is
+    no redis tier, the log is the only copy
+    """
+
+    def __init__(self, path: str = None):
+        self.db_touch_count = 0
+        self.db_skip_count = 0
+        self.db_bytes_saved = 0
+        super().__init__()
+        self.log = segment_log(
+            path or self.config.get("log_path", "jaseci_log"), self.config
+        )
+
+    ####################################################
+    #                DATASOURCE METHOD                 #
+    ####################################################
+
+    # --------------------- OBJ ---------------------- #
+
+    def get_obj_from_store(self, item_id):
+        obj = super().get_obj_from_store(item_id)
+        if obj is None and not self.is_obj_missing(item_id, "db"):
+            loaded_obj = self.log.get(item_id)
+            if loaded_obj is None:
+                logger.error(str(f"Object {item_id} does not exist in log store!"))
+                self.mark_obj_missing(item_id, "db")
+                return None
+            obj = self.load_obj_from_log(loaded_obj, item_id)
+            if obj is None:
+                self.mark_obj_missing(item_id, "db")
+                return None
+            self.prefetch_neighbors([obj])
+        return obj
+
+    def get_obj_from_store_many(self, item_ids):
+        objs = super().get_obj_from_store_many(item_ids)
+        new_objs = []
+        for i in item_ids:
+            if i in objs or self.is_obj_missing(i, "db"):
+                continue
+            # decoding an earlier item may have already pulled this one in
+            obj = super().get_obj_from_store(i)
+            if obj is None:
+                loaded_obj = self.log.get(i)
+                if loaded_obj is None:
+                    logger.error(f"Object {i} does not exist in log store!")
+                    self.mark_obj_missing(i, "db")
+                    continue
+                obj = self.load_obj_from_log(loaded_obj, i)
+                if obj is None:
+                    self.mark_obj_missing(i, "db")
+                    continue
+                new_objs.append(obj)
+            objs[i] = obj
+        self.prefetch_neighbors(new_objs)
+        return objs
+
+    def has_obj_in_store(self, item_id):
+        """
+        Checks for object existance in store
+        """
+        return super().has_obj_in_store(item_id) or self.log.has(item_id)
+
+    def has_backing_store(self):
+        return True
+
+    def destroy_obj_from_store(self, item):
+        super().destroy_obj_from_store(item)
+        self.log.delete(item.jid)
+
+    # --------------------- GLOB --------------------- #
+
+    def get_glob_from_store(self, name):
+        """
+        Get global config from externally hooked general store by name
+        """
+        glob = super().get_glob_from_store(name)
+        if glob is None:
+            glob = self.log.get(name, GLOB_PUT)
+            if glob is None:
+                logger.error(str(f"Global {name} does not exist in log store!"))
+                return None
+            self.db_touch_count += 1
+            glob = str(glob, "utf-8")
+            super().commit_glob_to_cache(name, glob)
+        return glob
+
+    def has_glob_in_store(self, name):
+        """
+        Checks for global config existance in store
+        """
+        return super().has_glob_in_store(name) or self.log.has(name, GLOB_PUT)
+
+    def list_glob_from_store(self):
+        """Get list of global config to externally hooked general store"""
+        return list(
+            dict.fromkeys(super().list_glob_from_store() + self.log.keys(GLOB_PUT))
+        )
+
+    def destroy_glob_from_store(self, name):
+        """Destroy global config to externally hooked general store"""
+        super().destroy_glob_from_store(name)
+        self.log.delete(name, GLOB_PUT)
+
+    ####################################################
+    #                      LOADER                      #
+    ####################################################
+
+    def load_obj_from_log(self, loaded_obj, item_id=None):
+        """
+        Build object from logged payload and add it to session cache, None if
+        the payload is corrupt
+        """
+        self.db_touch_count += 1
+        ret_obj, payload = self.build_obj(loaded_obj, item_id)
+        if ret_obj is None:
+            return None
+        self.mark_obj_clean(ret_obj, "db", payload)
+        self.commit_obj_to_cache(ret_obj)
+        return ret_obj
+
+    ####################################################
+    #                    COMMITTER                     #
+    ####################################################
+
+    def commit_obj_list(self, items):
+        """Appends changed objects to the log with a single sync"""
+        payloads = {}
+        for i in items:
+            if not i._persist:
+                continue
+            payload = self.dump_obj(i)
+            if self.is_obj_dirty(i, "db", payload):
+                payloads[i] = payload
+            else:
+                self.db_skip_count += 1
+        if not payloads:
+            return
+        # the log holds raw bytes, so compressed payloads stay binary
+        self.log.put_many(
+            {
+                i.jid: self.compress_payload(p, "db", text=False)
+                for i, p in payloads.items()
+            }
+        )
+        for i, payload in payloads.items():
+            self.mark_obj_clean(i, "db", payload)
+
+    def commit_glob(self, name, value):
+        self.commit_glob_to_cache(name, value)
+        self.log.put(name, value, GLOB_PUT)
+
+    def commit(self, skip_cache=False):
+        """Write through all saves to store"""
+        if not skip_cache:
+            self.commit_obj_list_to_cache(self.save_obj_list, all_caches=True)
+        self.commit_obj_list(list(self.save_obj_list))
+        self.save_obj_list = set()
+
+        for k, v in self.save_glob_dict.items():
+            self.commit_glob_to_cache(k, v)
+        if self.save_glob_dict:
+            self.log.put_many(self.save_glob_dict, GLOB_PUT)
+        self.save_glob_dict = {}
@@ -1,6 +1,19 @@
 from json import dumps, loads
+from time import time
 import sys
-from jaseci.utils.utils import find_class_and_import
+import zlib
+
+import jaseci as core_mod
+from jaseci.utils.compress_handler import (
+    compress_blob,
+    decompress_blob,
+    payload_size,
+)
+from jaseci.utils.id_list import IdList
+from jaseci.utils.json_handler import json_str_to_jsci_dict
+from jaseci.utils.msgpack_handler import is_msgpack_blob
+from jaseci.utils.utils import find_class_and_import, logger
+from jaseci.utils.mem_cache import MemCache
 from jaseci.jsorc.jsorc import JsOrc
 
 
@@ -16,7 +29,19 @@ class MemoryHook:
     def __init__(self):
         from jaseci.jsorc.live_actions import get_global_actions
 
-        self.mem = {"global": {}}
+        self.config = JsOrc.settings("HOOK_CONFIG", {})
+        self.mem = MemCache(
+            max_objs=self.config.get("l1_max_objects", 0),
+            ttl=self.config.get("l1_ttl", 0),
+            evictable=self.is_obj_evictable,
+            on_evict=self.on_obj_evict,
+        )
+        # ids recently found missing per store tier (red or db) -> expiry
+        self.missing_ids = {"red": {}, "db": {}}
+        # ids changed by other processes, filled by the l1 invalidation
+        # subscriber and applied on the next read ("*" drops everything)
+        self.invalidated_ids = set()
+        self._prefetching = False
         self._machine = None
         self.save_obj_list = set()
         self.save_glob_dict = {}
@@ -36,6 +61,21 @@ class MemoryHook:
         if override or (ret is not None and ret.check_read_access(caller_id)):
             return ret
 
+    def get_obj_many(self, caller_id, item_ids, override=False):
+        """
+        Get list of items by ids, fetching every missing item from the store
+        in a single batch per storage tier. Returned list is aligned with
+        item_ids and holds None for missing or inaccessible items
+        """
+        objs = self.get_obj_from_store_many(item_ids)
+        ret = []
+        for i in item_ids:
+            obj = objs.get(i)
+            if obj is not None and not (override or obj.check_read_access(caller_id)):
+                obj = None
+            ret.append(obj)
+        return ret
+
     def has_obj(self, item_id):
         """
         Checks for object existance
@@ -45,9 +85,9 @@ class MemoryHook:
     def save_obj(self, caller_id, item, all_caches=False):
         """Save item to session cache, then to store"""
         if item.check_write_access(caller_id):
-            self.commit_obj_to_cache(item, all_caches=all_caches)
             if item._persist:
                 self.save_obj_list.add(item)
+            self.commit_obj_to_cache(item, all_caches=all_caches)
 
     def destroy_obj(self, caller_id, item):
         """Destroy item from session cache then  store"""
@@ -115,21 +155,44 @@ class MemoryHook:
         """
         Get item from externally hooked general store by id
         """
-        if item_id in self.mem:
-            return self.mem[item_id]
+        if self.invalidated_ids:
+            self.apply_invalidations()
+        return self.mem.lookup(item_id)
 
-        return None
+    def get_obj_from_store_many(self, item_ids):
+        """
+        Get dict of items from externally hooked general store by ids
+        """
+        if self.invalidated_ids:
+            self.apply_invalidations()
+        objs = {}
+        for i in item_ids:
+            obj = self.mem.lookup(i)
+            if obj is not None:
+                objs[i] = obj
+        return objs
 
     def has_obj_in_store(self, item_id):
         """
         Checks for object existance in store
         """
+        if self.invalidated_ids:
+            self.apply_invalidations()
         return item_id in self.mem
 
+    def get_edge_ids_from_store(self, node_id, direction, name=None):
+        """
+        Ids of edges of node in direction (out, in or bi) optionally named
+        name, from the store's adjacency index. None if there is no index
+        """
+        return None
+
     def destroy_obj_from_store(self, item):
         """Destroy item to externally hooked general store"""
         if item in self.save_obj_list:
             self.save_obj_list.remove(item)
+        for i in self.missing_ids:
+            self.mark_obj_missing(item.jid, i)
 
     # --------------------- GLOB --------------------- #
 
@@ -163,8 +226,7 @@ class MemoryHook:
 
     def commit(self, skip_cache=False):
         if not skip_cache:
-            for i in self.save_obj_list:
-                self.commit_obj_to_cache(i)
+            self.commit_obj_list_to_cache(self.save_obj_list)
 
             self.save_obj_list = set()
 
@@ -173,6 +235,108 @@ class MemoryHook:
 
             self.save_glob_dict = {}
 
+    # ------------------ SERIALIZE ------------------- #
+
+    def dump_obj(self, item):
+        """Encodes object for external stores with the configured codec"""
+        return item.dumps(codec=self.config.get("codec", "json"))
+
+    # ------------------- COMPRESS ------------------- #
+
+    def compress_payload(self, payload, tier, text=None):
+        """
+        Compresses payloads over the configured threshold before they are
+        written to tier (red or db), counting the bytes saved per tier. Db
+        payloads are compressed to text unless text is given
+        """
+        threshold = self.config.get("compress_threshold", 0)
+        if not threshold:
+            return payload
+        size = payload_size(payload)
+        if size < threshold:
+            return payload
+        packed = compress_blob(
+            payload,
+            self.config.get("compress_level", 6),
+            text=(tier == "db") if text is None else text,
+        )
+        saved = size - payload_size(packed)
+        if saved <= 0:
+            return payload
+        setattr(
+            self, f"{tier}_bytes_saved", getattr(self, f"{tier}_bytes_saved", 0) + saved
+        )
+        return packed
+
+    # ------------------- PREFETCH ------------------- #
+
+    def prefetch_neighbors(self, objs):
+        """
+        Loads neighbors of objs freshly materialized from a store, level by
+        level up to prefetch_depth with one batched fetch per level, taking
+        at most prefetch_fanout neighbors of each object. Stored (non fast)
+        edges take a level of their own before their nodes are reached
+        """
+        depth = self.config.get("prefetch_depth", 0)
+        if not depth or self._prefetching:
+            return
+        fanout = self.config.get("prefetch_fanout", 64)
+        self._prefetching = True
+        try:
+            for i in range(depth):
+                ids = []
+                for obj in objs:
+                    ids.extend(obj.neighbor_ids()[:fanout])
+                ids = [j for j in dict.fromkeys(ids) if j not in self.mem]
+                if not ids:
+                    break
+                objs = list(self.get_obj_from_store_many(ids).values())
+        finally:
+            self._prefetching = False
+
+    # ---------------- NEGATIVE CACHE ---------------- #
+
+    def is_obj_missing(self, item_id, tier):
+        """Checks if item_id was recently found missing in tier (red or db)"""
+        expiry = self.missing_ids[tier].get(item_id)
+        if expiry is None:
+            return False
+        if expiry > time():
+            return True
+        del self.missing_ids[tier][item_id]
+        return False
+
+    def mark_obj_missing(self, item_id, tier):
+        """Remembers item_id is missing in tier for negative_cache_ttl secs"""
+        ttl = self.config.get("negative_cache_ttl", 0)
+        if ttl:
+            self.missing_ids[tier][item_id] = time() + ttl
+
+    def clear_obj_missing(self, item_id):
+        for i in self.missing_ids.values():
+            i.pop(item_id, None)
+
+    # ----------------- DIRTY CHECK ------------------ #
+
+    def is_obj_dirty(self, item, tier, payload):
+        """
+        Checks if payload differs from the one last written to tier
+        (red or db), unchanged objects can skip the write
+        """
+        return getattr(item, f"_{tier}_hash", None) != hash(payload)
+
+    def mark_obj_clean(self, item, tier, payload):
+        """Records payload as the last one written to tier (red or db)"""
+        setattr(item, f"_{tier}_hash", hash(payload))
+
+    def mark_obj_version(self, item, tier, version, payload=None):
+        """
+        Records version of item last read from or written to tier (red or db)
+        with the payload it had then, the base of field level merges
+        """
+        setattr(item, f"_{tier}_version", version)
+        setattr(item, f"_{tier}_base", payload)
+
     ###################################################
     #   CACHE CONTROL (SHOULD NOT OVERRIDEN ON ORM)   #
     ###################################################
@@ -191,20 +355,78 @@ class MemoryHook:
         return id is not None and id in self.mem
 
     def commit_obj_to_cache(self, item, all_caches=False):
-        self.mem[item.jid] = item
+        self.clear_obj_missing(item.jid)
+        self.mem.put(item.jid, item)
+
+    def commit_obj_list_to_cache(self, items, all_caches=False):
+        for i in items:
+            self.commit_obj_to_cache(i, all_caches=all_caches)
 
     def commit_all_cache_sync(self):
-        for i in self.save_obj_list:
-            self.commit_obj_to_cache(i, all_caches=True)
+        self.commit_obj_list_to_cache(self.save_obj_list, all_caches=True)
 
     def decommit_obj_from_cache(self, item):
-        self.mem.pop(item.jid)
+        self.mem.pop(item.jid, None)
+
+    # ------------------- EVICTION ------------------- #
+
+    def has_backing_store(self):
+        """Whether objects dropped from session cache can be reloaded"""
+        return False
+
+    def is_obj_evictable(self, item):
+        """
+        Objects pending save or only living in session cache are pinned
+        """
+        return (
+            self.has_backing_store()
+            and item._persist
+            and item not in self.save_obj_list
+        )
+
+    def evict_obj(self, item):
+        """
+        Drops item from session cache if it is evictable, for readers done
+        with objects they pulled in. Returns whether it was
+        """
+        if item is None or self.mem.get(item.jid) is not item:
+            return False
+        if not self.mem.can_evict(item):
+            return False
+        self.mem.drop(item.jid)
+        return True
+
+    def on_obj_evict(self, item):
+        """Called for each object evicted from session cache"""
+        pass
+
+    def apply_invalidations(self):
+        """
+        Drops objects changed by other processes from session cache so they
+        are reloaded, objects with unsaved local changes are kept
+        """
+        while self.invalidated_ids:
+            try:
+                jid = self.invalidated_ids.pop()
+            except KeyError:
+                break
+            if jid == "*":
+                for k in list(self.mem.keys()):
+                    if k != "global" and self.is_obj_evictable(self.mem[k]):
+                        self.mem.pop(k)
+                for i in self.missing_ids.values():
+                    i.clear()
+                continue
+            self.clear_obj_missing(jid)
+            item = self.mem.get(jid)
+            if item is not None and self.is_obj_evictable(item):
+                self.mem.pop(jid)
 
     ####################################################
     # ------------------ UTILITIES ------------------- #
     ####################################################
 
-    def get_object_distribution(self):
+    def get_object_distribution(self, with_stats=False):
         dist = {}
         for i in self.mem.keys():
             t = type(self.mem[i])
@@ -212,11 +434,52 @@ class MemoryHook:
                 dist[t] += 1
             else:
                 dist[t] = 1
+        if with_stats:
+            dist.update(self.mem_stats())
         return dist
 
+    def mem_stats(self):
+        """Session cache hit, miss and eviction counters"""
+        return self.mem.stats()
+
     def mem_size(self):
         return sys.getsizeof(self.mem) / 1024
 
+    ###################################################
+    #                     LOADER                      #
+    ###################################################
+
+    def build_obj(self, loaded_obj, item_id=None):
+        """
+        Build object from a stored blob (json or msgpack, maybe compressed)
+        without caching it, returns the object
+        and the decoded payload. The object is None if the blob of item_id
+        is corrupt, so callers treat it as missing
+        """
+        try:
+            loaded_obj = decompress_blob(loaded_obj)
+            if isinstance(loaded_obj, (bytes, memoryview)) and not is_msgpack_blob(
+                loaded_obj
+            ):
+                loaded_obj = str(loaded_obj, "utf-8")
+        except (ValueError, zlib.error):
+            logger.error(f"Object {item_id} has a corrupt blob, treating as missing")
+            return None, loaded_obj
+        jdict = json_str_to_jsci_dict(loaded_obj, hook=self)
+        if "j_type" not in jdict:
+            logger.error(f"Object {item_id} has a corrupt blob, treating as missing")
+            return None, loaded_obj
+        j_type = jdict["j_type"]
+        j_master = jdict["j_master"]
+        class_for_type = self.find_class_and_import(j_type, core_mod)
+        ret_obj = class_for_type(h=self, m_id=j_master, auto_save=False)
+        # blob is decoded once, its id lists are handed over to the object
+        for i in jdict.values():
+            if isinstance(i, IdList):
+                i.parent_obj = ret_obj
+        ret_obj.dict_load(jdict)
+        return ret_obj, loaded_obj
+
     ###################################################
     #                  CLASS CONTROL                  #
     ###################################################
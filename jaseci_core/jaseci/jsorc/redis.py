@@ -3,12 +3,18 @@ This module includes code related to hooking Jaseci's Redis to the
 core engine.
 """
 import json
-
-import jaseci as core_mod
-from jaseci.utils.json_handler import JaseciJsonDecoder
+import threading
+import uuid
+import weakref
+from time import sleep
+
+from jaseci.utils.compress_handler import decompress_blob
+from jaseci.utils.id_list import IdList
+from jaseci.utils.json_handler import JaseciJsonEncoder, json_str_to_jsci_dict
+from jaseci.utils.utils import logger
 from jaseci.jsorc.memory import MemoryHook
 from jaseci.jsorc.jsorc import JsOrc
-from jaseci.extens.svc.redis_svc import RedisService
+from jaseci.extens.svc.redis_svc import VERSION_SUFFIX, RedisService
 
 
 #################################################
@@ -21,8 +27,14 @@ class RedisHook(MemoryHook):
     def __init__(self, redis: RedisService = None):
         self.redis = JsOrc.svc("redis", RedisService)
         self.red_touch_count = 0
+        self.red_skip_count = 0
+        self.red_bytes_saved = 0
+        self.red_conflict_count = 0
+        self.red_decommit_ids = set()
 
         super().__init__()
+        if self.config.get("l1_invalidation", False) and self.redis.is_running():
+            l1_invalidator.register(self)
 
     ####################################################
     #        DATASOURCE METHOD (TO BE OVERRIDE)        #
@@ -36,29 +48,85 @@ class RedisHook(MemoryHook):
         """
         obj = super().get_obj_from_store(item_id)
 
-        if obj is None and self.redis.is_running():
-            loaded_obj = self.redis.get(item_id)
+        if (
+            obj is None
+            and item_id not in self.red_decommit_ids
+            and not self.is_obj_missing(item_id, "red")
+            and self.redis.is_running()
+        ):
+            version = None
+            if self.config.get("occ", False):
+                loaded_obj, version = self.redis.mget_bytes(
+                    [item_id, item_id + VERSION_SUFFIX]
+                )
+            else:
+                loaded_obj = self.redis.get_bytes(item_id)
             if loaded_obj:
-                self.red_touch_count += 1
-                jdict = json.loads(loaded_obj, cls=JaseciJsonDecoder)
-                j_type = jdict["j_type"]
-                j_master = jdict["j_master"]
-                class_for_type = self.find_class_and_import(j_type, core_mod)
-                ret_obj = class_for_type(h=self, m_id=j_master, auto_save=False)
-                ret_obj.json_load(loaded_obj)
-
-                super().commit_obj_to_cache(ret_obj)
-                return ret_obj
+                obj = self.load_obj_from_redis(loaded_obj, version, item_id)
+            if obj is not None:
+                self.prefetch_neighbors([obj])
+                return obj
+            self.mark_obj_missing(item_id, "red")
 
         return obj
 
+    def get_obj_from_store_many(self, item_ids):
+        """
+        Get dict of items from externally hooked general store by ids
+        using a single MGET for everything not in the session cache
+        """
+        objs = super().get_obj_from_store_many(item_ids)
+        missing = [
+            i
+            for i in dict.fromkeys(item_ids)
+            if i not in objs
+            and i not in self.red_decommit_ids
+            and not self.is_obj_missing(i, "red")
+        ]
+
+        if missing and self.redis.is_running():
+            new_objs = []
+            if self.config.get("occ", False):
+                blobs = self.redis.mget_bytes(
+                    missing + [i + VERSION_SUFFIX for i in missing]
+                )
+                versions = blobs[len(missing) :]
+            else:
+                blobs = self.redis.mget_bytes(missing)
+                versions = [None] * len(missing)
+            for item_id, loaded_obj, version in zip(missing, blobs, versions):
+                if not loaded_obj:
+                    self.mark_obj_missing(item_id, "red")
+                    continue
+                # decoding an earlier item may have already pulled this one in
+                obj = super().get_obj_from_store(item_id)
+                if obj is None:
+                    obj = self.load_obj_from_redis(loaded_obj, version, item_id)
+                    if obj is None:
+                        self.mark_obj_missing(item_id, "red")
+                        continue
+                    new_objs.append(obj)
+                objs[item_id] = obj
+            self.prefetch_neighbors(new_objs)
+
+        return objs
+
     def has_obj_in_store(self, item_id):
         """
         Checks for object existance in store
         """
-        return super().has_obj_in_store(item_id) or (
-            self.redis.is_running() and self.redis.exists(item_id)
-        )
+        if super().has_obj_in_store(item_id):
+            return True
+        if (
+            item_id in self.red_decommit_ids
+            or self.is_obj_missing(item_id, "red")
+            or not self.redis.is_running()
+        ):
+            return False
+        if self.redis.exists(item_id):
+            return True
+        self.mark_obj_missing(item_id, "red")
+        return False
 
     # --------------------- GLOB --------------------- #
 
@@ -116,14 +184,216 @@ class RedisHook(MemoryHook):
     def commit_obj_to_cache(self, item, all_caches=False):
         super().commit_obj_to_cache(item)
 
-        if all_caches and item._persist and self.redis.is_running():
-            self.redis.set(item.jid, item.json(detailed=True))
+        if all_caches:
+            self.commit_obj_to_redis(item)
+
+    def commit_obj_to_redis(self, item):
+        if item._persist and self.redis.is_running():
+            self.red_decommit_ids.discard(item.jid)
+            payload = self.dump_obj(item)
+            if self.is_obj_dirty(item, "red", payload):
+                if self.config.get("occ", False):
+                    self.commit_obj_dict_to_redis({item: payload})
+                else:
+                    self.redis.set(item.jid, self.compress_payload(payload, "red"))
+                    self.mark_obj_clean(item, "red", payload)
+                    self.publish_invalidations([item.jid])
+            else:
+                self.red_skip_count += 1
+
+    def commit_obj_list_to_cache(self, items, all_caches=False):
+        """
+        Commit objects to session cache, then to redis with one MSET per
+        batch instead of a round trip per object
+        """
+        items = list(items)
+        super().commit_obj_list_to_cache(items)
+
+        if all_caches and self.redis.is_running():
+            dirty = {}
+            for i in items:
+                if i._persist:
+                    self.red_decommit_ids.discard(i.jid)
+                    payload = self.dump_obj(i)
+                    if self.is_obj_dirty(i, "red", payload):
+                        dirty[i] = payload
+                    else:
+                        self.red_skip_count += 1
+            if dirty:
+                self.commit_obj_dict_to_redis(dirty)
+            logger.debug(
+                f"Synced {len(dirty)} objects to redis, "
+                f"skipped {len(items) - len(dirty)} unchanged"
+            )
+
+    def commit_obj_dict_to_redis(self, dirty):
+        """
+        Writes dict of item -> payload to redis in batched MSETs, when occ is
+        on each write only lands if the stored j_version is the one the item
+        was read at, items losing against a concurrent commit are resolved
+        (see resolve_obj_conflict) and written again
+        """
+        batch_size = self.config.get("redis_batch_size", 1000)
+        if not self.config.get("occ", False):
+            self.redis.mset(
+                {i.jid: self.compress_payload(p, "red") for i, p in dirty.items()},
+                batch_size,
+            )
+            for i, payload in dirty.items():
+                self.mark_obj_clean(i, "red", payload)
+            self.publish_invalidations([i.jid for i in dirty])
+            return
+
+        for attempt in range(self.config.get("occ_retries", 3) + 1):
+            versions = {}
+            for i in dirty:
+                expected = getattr(i, "_red_version", None)
+                i.j_version = max(i.j_version, (expected or 0) + 1)
+                versions[i.jid] = (expected, i.j_version)
+            conflicts = self.redis.mset_if_version(
+                {i.jid: self.compress_payload(p, "red") for i, p in dirty.items()},
+                versions,
+                batch_size,
+                self.config.get("occ_retries", 3),
+            )
+            for i, payload in dirty.items():
+                if i.jid not in conflicts:
+                    self.mark_obj_clean(i, "red", payload)
+                    self.mark_obj_version(i, "red", i.j_version, payload)
+            self.publish_invalidations([i.jid for i in dirty if i.jid not in conflicts])
+            if not conflicts:
+                return
+            items = {i.jid: i for i in dirty if i.jid in conflicts}
+            blobs = self.redis.mget_bytes(list(conflicts.keys()))
+            dirty = {}
+            for (jid, version), blob in zip(conflicts.items(), blobs):
+                stored = self.build_obj(blob, jid)[0] if blob else None
+                if stored is not None and version is not None:
+                    stored.j_version = version
+                if self.resolve_obj_conflict(items[jid], "red", stored):
+                    dirty[items[jid]] = self.dump_obj(items[jid])
+            if not dirty:
+                return
+        logger.error(f"Gave up writing {len(dirty)} objects to redis on conflicts")
+
+    def commit_all_cache_sync(self):
+        super().commit_all_cache_sync()
+        self.commit_decommits_to_cache()
 
     def decommit_obj_from_cache(self, item):
         super().decommit_obj_from_cache(item)
 
         if self.redis.is_running():
-            self.redis.delete(item.jid)
+            self.red_decommit_ids.add(item.jid)
+
+    def has_backing_store(self):
+        return self.redis.is_running()
+
+    def on_obj_evict(self, item):
+        """Write back evicted objects so unsynced changes are not lost"""
+        self.commit_obj_to_redis(item)
+
+    def commit_decommits_to_cache(self):
+        """
+        Deletes all decommitted objects from redis with one DEL per batch,
+        reads of pending ids skip redis until then
+        """
+        if self.red_decommit_ids and self.redis.is_running():
+            self.redis.delete_many(
+                self.red_decommit_ids,
+                self.config.get("redis_batch_size", 1000),
+                versions=self.config.get("occ", False),
+            )
+            self.publish_invalidations(self.red_decommit_ids)
+        self.red_decommit_ids = set()
+
+    def publish_invalidations(self, ids):
+        """Tells other processes to drop ids from their session caches"""
+        if ids and self.config.get("l1_invalidation", False):
+            l1_invalidator.publish(self, ids)
+
+    # ------------------ VERSIONS ------------------- #
+
+    def resolve_obj_conflict(self, item, tier, stored):
+        """
+        Called when a commit of item to tier (red or db) lost against a
+        concurrent commit, stored is the copy now in tier (None if it is
+        gone). Applies the configured conflict_strategy, 'merge' keeps local
+        changes made since item was read and takes everything else from
+        stored, 'overwrite' keeps item as is and 'skip' drops the local
+        changes. Returns True if item should be written again
+        """
+        setattr(
+            self, f"{tier}_conflict_count", getattr(self, f"{tier}_conflict_count") + 1
+        )
+        logger.warning(f"Commit of {item} to {tier} lost against a concurrent commit")
+        if stored is None:
+            return False
+        strategy = self.config.get("conflict_strategy", "merge")
+        if strategy == "skip":
+            self.merge_obj_fields(item, stored, base=None, keep_local=False)
+        elif strategy == "merge":
+            base = getattr(item, f"_{tier}_base", None)
+            if base is not None:
+                base = json_str_to_jsci_dict(decompress_blob(base), hook=self)
+            self.merge_obj_fields(item, stored, base)
+        # stored is the base of any further merge
+        payload = self.dump_obj(stored)
+        self.mark_obj_version(item, tier, stored.j_version, payload)
+        item.j_version = max(item.j_version, stored.j_version)
+        if strategy == "skip":
+            self.mark_obj_clean(item, tier, payload)
+            return False
+        return True
+
+    def merge_obj_fields(self, item, stored, base, keep_local=True):
+        """
+        Merges fields of stored into item, fields and dict keys changed on
+        item since base keep the local value, lists (ids) keep local adds
+        and removes. Without base (or keep_local) stored wins
+        """
+        for k, theirs in vars(stored).items():
+            if k.startswith("_") or k in ("jid", "j_version"):
+                continue
+            if keep_local and base is not None and hasattr(item, k):
+                theirs = merge_value(base.get(k), getattr(item, k), theirs)
+            if isinstance(theirs, IdList):
+                theirs = IdList(parent_obj=item, in_list=theirs)
+            setattr(item, k, theirs)
+
+    ####################################################
+    # ------------------ COMMITTER ------------------- #
+    ####################################################
+
+    def commit(self, skip_cache=False):
+        super().commit(skip_cache)
+        self.commit_decommits_to_cache()
+
+    ###################################################
+    #                     LOADER                      #
+    ###################################################
+
+    def load_obj_from_redis(self, loaded_obj, version=None, item_id=None):
+        """
+        Build object from redis blob and add it to session cache, both json
+        and msgpack blobs are accepted regardless of the configured codec.
+        Returns None if the blob can not be decoded
+        """
+        self.red_touch_count += 1
+        ret_obj, loaded_obj = self.build_obj(loaded_obj, item_id)
+        if ret_obj is None:
+            return None
+        # only clean on redis, its db write may have failed or still be queued
+        self.mark_obj_clean(ret_obj, "red", loaded_obj)
+        if self.config.get("occ", False):
+            ret_obj.j_version = int(version) if version else 0
+            self.mark_obj_version(
+                ret_obj, "red", int(version) if version else None, loaded_obj
+            )
+            self.mark_obj_version(ret_obj, "db", ret_obj.j_version, loaded_obj)
+
+        MemoryHook.commit_obj_to_cache(self, ret_obj)
+        return ret_obj
 
     ###################################################
     #                     CLEANER                     #
@@ -133,7 +403,110 @@ class RedisHook(MemoryHook):
         if self.redis.is_running():
             self.redis.app.flushdb()
 
+        self.red_decommit_ids = set()
         MemoryHook.__init__(self)
 
 
+#################################################
+#               L1 INVALIDATION                 #
+#################################################
+
+L1_INVALIDATION_CHANNEL = "jaseci:l1:invalidate"
+
+
+class L1Invalidator:
+    """
+    Process wide subscriber of the l1 invalidation channel. Hooks publish
+    ids of objects they write to or delete from redis, every other hook of
+    every process registered here gets those ids queued for eviction from
+    its session cache (see MemoryHook.apply_invalidations)
+    """
+
+    def __init__(self):
+        self.origin = uuid.uuid4().hex
+        self.hooks = weakref.WeakSet()
+        self.lock = threading.Lock()
+        self.redis = None
+        self.worker = None
+
+    def tag(self, hook):
+        return f"{self.origin}:{id(hook)}"
+
+    def register(self, hook):
+        with self.lock:
+            self.hooks.add(hook)
+            if self.worker is None:
+                self.redis = hook.redis
+                self.worker = threading.Thread(
+                    target=self.run, name="jaseci-l1-invalidation", daemon=True
+                )
+                self.worker.start()
+
+    def publish(self, hook, ids):
+        try:
+            hook.redis.app.publish(
+                L1_INVALIDATION_CHANNEL,
+                json.dumps({"o": self.tag(hook), "ids": list(ids)}),
+            )
+        except Exception as e:
+            logger.error(f"Publishing l1 invalidations failed due to {e}")
+
+    def invalidate(self, origin, ids):
+        with self.lock:
+            hooks = list(self.hooks)
+        for h in hooks:
+            if self.tag(h) != origin:
+                h.invalidated_ids.update(ids)
+
+    def run(self):
+        connected = False
+        while True:
+            try:
+                pubsub = self.redis.app.pubsub(ignore_subscribe_messages=True)
+                pubsub.subscribe(L1_INVALIDATION_CHANNEL)
+                if connected:
+                    # messages may have been missed while disconnected
+                    self.invalidate(None, ["*"])
+                connected = True
+                for msg in pubsub.listen():
+                    data = json.loads(msg["data"])
+                    self.invalidate(data["o"], data["ids"])
+            except Exception as e:
+                logger.error(f"L1 invalidation subscriber failed due to {e}")
+                sleep(1)
+
+
+l1_invalidator = L1Invalidator()
+
+
+def merge_value(base, mine, theirs):
+    """Three way merge of a field value, local changes win on clashes"""
+
+    def enc(val):
+        return json.dumps(val, cls=JaseciJsonEncoder, sort_keys=True)
+
+    if enc(mine) == enc(base):
+        return theirs
+    if enc(theirs) == enc(base):
+        return mine
+    if isinstance(mine, dict) and isinstance(theirs, dict) and isinstance(base, dict):
+        merged = dict(theirs)
+        for k in set(mine.keys()) | set(base.keys()):
+            if k not in mine:
+                merged.pop(k, None)
+            elif k not in base or enc(mine[k]) != enc(base[k]):
+                merged[k] = merge_value(base.get(k), mine[k], theirs.get(k))
+        return merged
+    if isinstance(mine, list) and isinstance(theirs, list) and isinstance(base, list):
+        mine_enc = {enc(i) for i in mine}
+        base_enc = {enc(i) for i in base}
+        theirs_enc = {enc(i) for i in theirs}
+        merged = [i for i in theirs if enc(i) in mine_enc or enc(i) not in base_enc]
+        merged += [
+            i for i in mine if enc(i) not in base_enc and enc(i) not in theirs_enc
+        ]
+        return merged
+    return mine
+
+
 # ----------------------------------------------- #
@@ -0,0 +1,291 @@
+"""
+This module includes code related to hooking a local SQLite file to the
+core engine, for jsctl sessions and single node deployments without a db
+or redis.
+"""
+import os
+import sqlite3
+
+from jaseci.utils.utils import logger
+from jaseci.jsorc.memory import MemoryHook
+from jaseci.jsorc.jsorc import JsOrc
+
+# sqlite caps the number of bound parameters per statement
+SQLITE_BATCH_SIZE = 900
+
+
+#################################################
+#                  SQLITE HOOK                  #
+#################################################
+
+
+# only replaces redis/orm hooks when a sqlite file is configured
+@JsOrc.repository(name="hook", priority=3 if os.getenv("JSORC_SQLITE_PATH") else -1)
+class SqliteHook(MemoryHook):
+    """
+    Hooks a local SQLite file (in WAL mode) for Jaseci objects and globals
+    to Jaseci's core engine, writes only land on commit. There is no redis
+    tier, the file is the only copy
+    """
+
+    def __init__(self, path: str = None):
+        self.db_touch_count = 0
+        self.db_skip_count = 0
+        self.db_bytes_saved = 0
+        super().__init__()
+        self.path = path or self.config.get("sqlite_path", "jaseci.db")
+        self.conn = sqlite3.connect(self.path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        with self.conn:
+            self.conn.execute(
+                "CREATE TABLE IF NOT EXISTS objects "
+                "(jid TEXT PRIMARY KEY, j_type TEXT, payload BLOB)"
+            )
+            self.conn.execute(
+                "CREATE TABLE IF NOT EXISTS globs (name TEXT PRIMARY KEY, value TEXT)"
+            )
+
+    ####################################################
+    #                DATASOURCE METHOD                 #
+    ####################################################
+
+    # --------------------- OBJ ---------------------- #
+
+    def get_obj_from_store(self, item_id):
+        obj = super().get_obj_from_store(item_id)
+        if obj is None and not self.is_obj_missing(item_id, "db"):
+            try:
+                row = self.conn.execute(
+                    "SELECT payload FROM objects WHERE jid = ?", (item_id,)
+                ).fetchone()
+            except sqlite3.Error as e:
+                logger.error(f"Operation failed due to {e}")
+                return None
+            if row is None:
+                logger.error(str(f"Object {item_id} does not exist in SQLite!"))
+                self.mark_obj_missing(item_id, "db")
+                return None
+            self.db_touch_count += 1
+            obj = self.load_obj_from_sqlite(row[0], item_id)
+            if obj is None:
+                self.mark_obj_missing(item_id, "db")
+                return None
+            self.prefetch_neighbors([obj])
+        return obj
+
+    def get_obj_from_store_many(self, item_ids):
+        """
+        Get dict of items from externally hooked general store by ids
+        using one query per batch for everything not found in the caches
+        """
+        objs = super().get_obj_from_store_many(item_ids)
+        missing = [i for i in item_ids if i not in objs]
+        missing = [
+            i for i in dict.fromkeys(missing) if not self.is_obj_missing(i, "db")
+        ]
+
+        new_objs = []
+        for i in range(0, len(missing), SQLITE_BATCH_SIZE):
+            batch = missing[i : i + SQLITE_BATCH_SIZE]
+            try:
+                rows = self.conn.execute(
+                    "SELECT jid, payload FROM objects WHERE jid IN "
+                    f"({','.join('?' * len(batch))})",
+                    batch,
+                ).fetchall()
+            except sqlite3.Error as e:
+                logger.error(f"Operation failed due to {e}")
+                return objs
+            self.db_touch_count += len(rows)
+            for jid, payload in rows:
+                # decoding an earlier item may have already pulled this one in
+                obj = super().get_obj_from_store(jid)
+                if obj is None:
+                    obj = self.load_obj_from_sqlite(payload, jid)
+                    if obj is None:
+                        continue
+                    new_objs.append(obj)
+                objs[jid] = obj
+        self.prefetch_neighbors(new_objs)
+
+        for item_id in missing:
+            if item_id not in objs:
+                logger.error(f"Object {item_id} does not exist in SQLite!")
+                self.mark_obj_missing(item_id, "db")
+
+        return objs
+
+    def has_obj_in_store(self, item_id):
+        """
+        Checks for object existance in store
+        """
+        if super().has_obj_in_store(item_id):
+            return True
+        if self.is_obj_missing(item_id, "db"):
+            return False
+        row = self.conn.execute(
+            "SELECT 1 FROM objects WHERE jid = ?", (item_id,)
+        ).fetchone()
+        if row is not None:
+            return True
+        self.mark_obj_missing(item_id, "db")
+        return False
+
+    def has_backing_store(self):
+        return True
+
+    def destroy_obj_from_store(self, item):
+        super().destroy_obj_from_store(item)
+        try:
+            with self.conn:
+                self.conn.execute("DELETE FROM objects WHERE jid = ?", (item.jid,))
+        except sqlite3.Error as e:
+            logger.error(f"Operation failed due to {e}")
+
+    # --------------------- GLOB --------------------- #
+
+    def get_glob_from_store(self, name):
+        """
+        Get global config from externally hooked general store by name
+        """
+        glob = super().get_glob_from_store(name)
+        if glob is None:
+            row = self.conn.execute(
+                "SELECT value FROM globs WHERE name = ?", (name,)
+            ).fetchone()
+            if row is None:
+                logger.error(str(f"Global {name} does not exist in SQLite!"))
+                return None
+            self.db_touch_count += 1
+            glob = row[0]
+            super().commit_glob_to_cache(name, glob)
+        return glob
+
+    def has_glob_in_store(self, name):
+        """
+        Checks for global config existance in store
+        """
+        if super().has_glob_in_store(name):
+            return True
+        row = self.conn.execute(
+            "SELECT 1 FROM globs WHERE name = ?", (name,)
+        ).fetchone()
+        return row is not None
+
+    def list_glob_from_store(self):
+        """Get list of global config to externally hooked general store"""
+        return list(
+            dict.fromkeys(
+                super().list_glob_from_store()
+                + [i[0] for i in self.conn.execute("SELECT name FROM globs")]
+            )
+        )
+
+    def destroy_glob_from_store(self, name):
+        """Destroy global config to externally hooked general store"""
+        super().destroy_glob_from_store(name)
+        with self.conn:
+            self.conn.execute("DELETE FROM globs WHERE name = ?", (name,))
+
+    ####################################################
+    #                      LOADER                      #
+    ####################################################
+
+    def load_obj_from_sqlite(self, loaded_obj, item_id=None):
+        """
+        Build object from stored payload and add it to session cache, None if
+        the payload is corrupt
+        """
+        ret_obj, payload = self.build_obj(loaded_obj, item_id)
+        if ret_obj is None:
+            return None
+        self.mark_obj_clean(ret_obj, "db", payload)
+        self.commit_obj_to_cache(ret_obj)
+        return ret_obj
+
+    def adopt(self, hook):
+        """
+        Moves every object and global held in the session cache of hook
+        over to this hook, they are written on the next commit
+        """
+        for i in list(hook.mem.keys()):
+            if i == "global":
+                for k, v in hook.mem["global"].items():
+                    self.save_glob(k, v)
+                continue
+            obj = hook.mem.lookup(i)
+            if obj is None:
+                continue
+            obj._h = self
+            self.commit_obj_to_cache(obj)
+            if obj._persist:
+                self.save_obj_list.add(obj)
+
+    ###################################################
+    #                     CLEANER                     #
+    ###################################################
+
+    def clear_store(self):
+        """Drops every object and global from the sqlite file"""
+        with self.conn:
+            self.conn.execute("DELETE FROM objects")
+            self.conn.execute("DELETE FROM globs")
+        self.clear_cache()
+
+    ####################################################
+    #                    COMMITTER                     #
+    ####################################################
+
+    def commit_obj_list(self, items):
+        """Write through changed objects in a single transaction"""
+        rows = []
+        payloads = {}
+        for i in items:
+            if not i._persist:
+                continue
+            payload = self.dump_obj(i)
+            if self.is_obj_dirty(i, "db", payload):
+                payloads[i] = payload
+                rows.append((i.jid, i.j_type, self.compress_payload(payload, "db")))
+            else:
+                self.db_skip_count += 1
+        if not rows:
+            return
+        try:
+            with self.conn:
+                self.conn.executemany(
+                    "INSERT OR REPLACE INTO objects (jid, j_type, payload) "
+                    "VALUES (?, ?, ?)",
+                    rows,
+                )
+        except sqlite3.Error as e:
+            logger.error(f"Commit of {len(rows)} objects failed due to {e}")
+            return
+        for i, payload in payloads.items():
+            self.mark_obj_clean(i, "db", payload)
+
+    def commit_glob(self, name, value):
+        self.commit_glob_to_cache(name, value)
+        with self.conn:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO globs (name, value) VALUES (?, ?)",
+                (name, value),
+            )
+
+    def commit(self, skip_cache=False):
+        """Write through all saves to store"""
+        if not skip_cache:
+            self.commit_obj_list_to_cache(self.save_obj_list, all_caches=True)
+        self.commit_obj_list(list(self.save_obj_list))
+        self.save_obj_list = set()
+
+        for k, v in self.save_glob_dict.items():
+            self.commit_glob_to_cache(k, v)
+        if self.save_glob_dict:
+            with self.conn:
+                self.conn.executemany(
+                    "INSERT OR REPLACE INTO globs (name, value) VALUES (?, ?)",
+                    list(self.save_glob_dict.items()),
+                )
+        self.save_glob_dict = {}
@@ -0,0 +1,547 @@
+import json
+import mmap
+import os
+import subprocess
+import sys
+import tempfile
+import unittest.mock
+from unittest import TestCase
+from unittest.mock import MagicMock
+
+from redis.exceptions import WatchError
+
+from jaseci.extens.svc.redis_svc import RedisService
+from jaseci.jsorc.memory import MemoryHook
+from jaseci.jsorc.redis import (
+    L1_INVALIDATION_CHANNEL,
+    L1Invalidator,
+    RedisHook,
+    merge_value,
+)
+from jaseci.jsorc.log_store import LogStoreHook
+from jaseci.jsorc.sqlite import SqliteHook
+from jaseci.prim.edge import Edge
+from jaseci.prim.node import Node
+from jaseci.utils.compress_handler import ZLIB_MAGIC
+from jaseci.utils.id_list import IdList
+from jaseci.utils.msgpack_handler import MSGPACK_MAGIC
+from jaseci.utils.segment_log import GLOB_PUT, SegmentLog
+from jaseci.utils.utils import TestCaseHelper
+
+
+class RedisHookTest(TestCaseHelper, TestCase):
+    """Unit tests for redis hook batching against a mocked redis service"""
+
+    def setUp(self):
+        super().setUp()
+        self.hook = RedisHook()
+        self.hook.redis = MagicMock()
+        self.hook.redis.is_running.return_value = True
+        self.hook.redis.get_bytes.return_value = None
+        self.hook.redis.exists.return_value = 0
+
+    def tearDown(self):
+        super().tearDown()
+
+    def test_commit_all_cache_sync_uses_single_mset(self):
+        nodes = [Node(m_id=0, h=self.hook) for i in range(10)]
+        self.hook.commit_all_cache_sync()
+        self.hook.redis.set.assert_not_called()
+        self.hook.redis.mset.assert_called_once()
+        mapping = self.hook.redis.mset.call_args[0][0]
+        self.assertEqual(set(mapping.keys()), {i.jid for i in nodes})
+
+    def test_decommits_coalesced_until_commit(self):
+        nodes = [Node(m_id=0, h=self.hook) for i in range(3)]
+        for i in nodes:
+            i.destroy()
+        self.hook.redis.delete.assert_not_called()
+        self.hook.redis.reset_mock()
+        self.assertIsNone(self.hook.get_obj_from_store(nodes[0].jid))
+        self.assertFalse(self.hook.has_obj_in_store(nodes[0].jid))
+        self.hook.redis.get_bytes.assert_not_called()
+        self.hook.redis.exists.assert_not_called()
+        self.hook.commit_all_cache_sync()
+        self.hook.redis.delete_many.assert_called_once()
+        deleted = self.hook.redis.delete_many.call_args[0][0]
+        self.assertEqual(set(deleted), {i.jid for i in nodes})
+        self.assertEqual(len(self.hook.red_decommit_ids), 0)
+
+    def test_get_obj_from_store_many_uses_single_mget(self):
+        nodes = [Node(m_id=0, h=self.hook) for i in range(5)]
+        blobs = {i.jid: i.json(detailed=True).encode() for i in nodes}
+        for i in nodes:
+            self.hook.mem.pop(i.jid)
+        self.hook.redis.mget_bytes.side_effect = lambda ids: [blobs.get(i) for i in ids]
+        objs = self.hook.get_obj_many(0, [i.jid for i in nodes])
+        self.hook.redis.mget_bytes.assert_called_once()
+        self.assertEqual([i.jid for i in objs], [i.jid for i in nodes])
+
+    def test_commit_all_cache_sync_skips_unchanged(self):
+        nodes = [Node(m_id=0, h=self.hook) for i in range(3)]
+        self.hook.commit_all_cache_sync()
+        self.hook.redis.reset_mock()
+        nodes[0].name = "changed"
+        self.hook.commit_all_cache_sync()
+        mapping = self.hook.redis.mset.call_args[0][0]
+        self.assertEqual(list(mapping.keys()), [nodes[0].jid])
+        self.assertEqual(self.hook.red_skip_count, 2)
+
+    def test_loaded_obj_is_clean_on_redis_only(self):
+        nd = Node(m_id=0, h=self.hook)
+        blob = nd.json(detailed=True)
+        self.hook.mem.pop(nd.jid)
+        self.hook.save_obj_list = set()
+        self.hook.redis.get_bytes.return_value = blob.encode()
+        loaded = self.hook.get_obj(0, nd.jid)
+        self.assertFalse(self.hook.is_obj_dirty(loaded, "red", blob))
+        # the db copy may lag redis, so it is only clean once written or loaded
+        self.assertTrue(self.hook.is_obj_dirty(loaded, "db", blob))
+        self.assertFalse(
+            self.hook.is_obj_dirty(loaded, "red", loaded.json(detailed=True))
+        )
+
+    def test_corrupt_blob_is_missing(self):
+        nd = Node(m_id=0, h=self.hook)
+        self.hook.mem.pop(nd.jid)
+        self.hook.save_obj_list = set()
+        self.hook.redis.get_bytes.return_value = b"{not json"
+        self.hook.redis.mget_bytes.return_value = [b"{not json"]
+        self.assertIsNone(self.hook.get_obj(0, nd.jid))
+        self.hook.clear_obj_missing(nd.jid)
+        self.assertEqual(self.hook.get_obj_many(0, [nd.jid]), [None])
+
+    def test_json_codec_without_msgpack_installed(self):
+        code = (
+            "import sys; sys.modules['msgpack'] = None; "
+            "from jaseci.prim.node import Node; "
+            "from jaseci.jsorc.redis import RedisHook; "
+            "from jaseci.jsorc.memory import MemoryHook; "
+            "print(Node(m_id=0, h=MemoryHook()).json(detailed=True)[:1])"
+        )
+        ret = subprocess.run([sys.executable, "-c", code], capture_output=True)
+        self.assertEqual(ret.returncode, 0, ret.stderr.decode())
+        self.assertEqual(ret.stdout.decode().strip(), "{")
+
+    def test_msgpack_codec_round_trip(self):
+        self.hook.config = dict(self.hook.config, codec="msgpack")
+        nd = Node(m_id=0, h=self.hook)
+        other = Node(m_id=0, h=self.hook)
+        nd.edge_ids.append(other.jid)
+        nd.context = {"vec": [0.5] * 8, "ref": other, "name": "n"}
+        self.hook.commit_all_cache_sync()
+        blob = self.hook.redis.mset.call_args[0][0][nd.jid]
+        self.assertTrue(blob.startswith(MSGPACK_MAGIC))
+        self.assertLess(len(blob), len(nd.json(detailed=True)))
+        self.hook.mem.pop(nd.jid)
+        self.hook.redis.get_bytes.return_value = blob
+        loaded = self.hook.get_obj(0, nd.jid)
+        self.assertEqual(loaded.context["vec"], nd.context["vec"])
+        self.assertEqual(loaded.context["ref"].jid, other.jid)
+        self.assertEqual(loaded.edge_ids, [other.jid])
+        self.assertIsInstance(loaded.edge_ids, IdList)
+        self.assertFalse(self.hook.is_obj_dirty(loaded, "red", blob))
+
+    def test_msgpack_codec_reads_json_blobs(self):
+        nd = Node(m_id=0, h=self.hook)
+        nd.context = {"a": 1}
+        blob = nd.json(detailed=True).encode()
+        self.hook.mem.pop(nd.jid)
+        self.hook.config = dict(self.hook.config, codec="msgpack")
+        self.hook.redis.get_bytes.return_value = blob
+        loaded = self.hook.get_obj(0, nd.jid)
+        self.assertEqual(loaded.context, {"a": 1})
+        # stale format is rewritten with the configured codec on next sync
+        self.assertTrue(
+            self.hook.is_obj_dirty(loaded, "red", self.hook.dump_obj(loaded))
+        )
+
+    def test_large_payloads_compressed(self):
+        self.hook.config = dict(self.hook.config, compress_threshold=1024)
+        small = Node(m_id=0, h=self.hook)
+        big = Node(m_id=0, h=self.hook)
+        big.context = {"doc": "lorem ipsum " * 500}
+        self.hook.commit_all_cache_sync()
+        mapping = self.hook.redis.mset.call_args[0][0]
+        self.assertEqual(mapping[small.jid], small.json(detailed=True))
+        blob = mapping[big.jid]
+        self.assertTrue(blob.startswith(ZLIB_MAGIC))
+        self.assertEqual(
+            self.hook.red_bytes_saved, len(big.json(detailed=True)) - len(blob)
+        )
+        self.hook.mem.pop(big.jid)
+        self.hook.redis.get_bytes.return_value = blob
+        loaded = self.hook.get_obj(0, big.jid)
+        self.assertEqual(loaded.context, big.context)
+        self.assertFalse(
+            self.hook.is_obj_dirty(loaded, "red", self.hook.dump_obj(loaded))
+        )
+
+    def test_missing_ids_skip_redis_until_committed(self):
+        nd = Node(m_id=0, h=self.hook, auto_save=False)
+        self.hook.redis.reset_mock()
+        self.assertIsNone(self.hook.get_obj_from_store(nd.jid))
+        self.assertIsNone(self.hook.get_obj_from_store(nd.jid))
+        self.assertEqual(self.hook.get_obj_many(0, [nd.jid]), [None])
+        self.assertFalse(self.hook.has_obj_in_store(nd.jid))
+        self.hook.redis.get_bytes.assert_called_once()
+        self.hook.redis.mget_bytes.assert_not_called()
+        self.hook.redis.exists.assert_not_called()
+        nd.save()
+        self.assertFalse(self.hook.is_obj_missing(nd.jid, "red"))
+        self.assertEqual(self.hook.get_obj_from_store(nd.jid), nd)
+
+    def test_missing_ids_expire(self):
+        nd = Node(m_id=0, h=self.hook, auto_save=False)
+        self.hook.get_obj_from_store(nd.jid)
+        self.hook.missing_ids["red"][nd.jid] -= 60
+        self.hook.get_obj_from_store(nd.jid)
+        self.assertEqual(self.hook.redis.get_bytes.call_count, 2)
+
+
+class MemCacheTest(TestCaseHelper, TestCase):
+    """Unit tests for the bounded session cache of hooks"""
+
+    def setUp(self):
+        super().setUp()
+        self.hook = RedisHook()
+        self.hook.redis = MagicMock()
+        self.hook.redis.is_running.return_value = True
+        self.hook.redis.get_bytes.return_value = None
+        self.hook.redis.exists.return_value = 0
+        self.hook.mem.max_objs = 5
+
+    def tearDown(self):
+        super().tearDown()
+
+    def test_lru_eviction_keeps_pinned_objects(self):
+        nodes = [Node(m_id=0, h=self.hook) for i in range(10)]
+        # everything is pending save so nothing can be evicted
+        self.assertEqual(self.hook.mem_stats()["l1_objects"], 10)
+        self.hook.commit_all_cache_sync()
+        self.hook.save_obj_list = set()
+        for i in nodes[1:] + nodes[:1]:
+            self.hook.get_obj_from_store(i.jid)
+        Node(m_id=0, h=self.hook)
+        stats = self.hook.mem_stats()
+        self.assertEqual(stats["l1_objects"], 5)
+        self.assertEqual(stats["l1_evictions"], 6)
+        self.assertIn(nodes[0].jid, self.hook.mem)
+        self.assertNotIn(nodes[1].jid, self.hook.mem)
+        self.assertIn("global", self.hook.mem)
+
+    def test_eviction_writes_back_unsynced_objects(self):
+        nd = Node(m_id=0, h=self.hook)
+        self.hook.commit_all_cache_sync()
+        self.hook.save_obj_list = set()
+        nd.name = "changed"
+        self.hook.redis.reset_mock()
+        for i in range(5):
+            Node(m_id=0, h=self.hook, persist=False)
+        self.hook.save_obj_list = set()
+        Node(m_id=0, h=self.hook)
+        self.assertNotIn(nd.jid, self.hook.mem)
+        self.hook.redis.set.assert_called_once()
+        self.assertEqual(self.hook.redis.set.call_args[0][0], nd.jid)
+
+    def test_ttl_expires_evictable_objects(self):
+        self.hook.mem.ttl = 1
+        nd = Node(m_id=0, h=self.hook)
+        self.hook.commit_all_cache_sync()
+        self.hook.save_obj_list = set()
+        self.hook.mem.stamps[nd.jid] -= 2
+        self.assertIsNone(self.hook.mem.lookup(nd.jid))
+        self.assertEqual(self.hook.mem_stats()["l1_evictions"], 1)
+
+    def test_occ_conflict_merges_fields(self):
+        self.hook.config = dict(self.hook.config, occ=True)
+        self.hook.redis.mset_if_version.return_value = {}
+        nd = Node(m_id=0, h=self.hook)
+        nd.context = {"a": 1, "b": 1}
+        self.hook.commit_all_cache_sync()
+        self.hook.save_obj_list = set()
+        self.assertEqual(nd.j_version, 1)
+
+        theirs = Node(m_id=0, h=MemoryHook(), auto_save=False)
+        theirs.jid = nd.jid
+        theirs.context = {"a": 1, "b": 2}
+        self.hook.redis.mget_bytes.return_value = [theirs.dumps().encode()]
+        self.hook.redis.mset_if_version.side_effect = [{nd.jid: 4}, {}]
+        nd.context["a"] = 3
+        nd.save()
+        self.hook.commit_all_cache_sync()
+        self.assertEqual(nd.context, {"a": 3, "b": 2})
+        self.assertEqual(nd.j_version, 5)
+        self.assertEqual(self.hook.red_conflict_count, 1)
+        versions = self.hook.redis.mset_if_version.call_args[0][1]
+        self.assertEqual(versions[nd.jid], (4, 5))
+
+    def test_mset_if_version_gives_up_on_contention(self):
+        svc = RedisService.__new__(RedisService)
+        svc.app = MagicMock()
+        pipe = svc.app.pipeline.return_value.__enter__.return_value
+        pipe.mget.return_value = ["1", None]
+        pipe.execute.side_effect = WatchError
+        svc.app.mget.return_value = ["2", None]
+        conflicts = svc.mset_if_version(
+            {"a": "x", "b": "y"}, {"a": (1, 2), "b": (None, 1)}, retries=2
+        )
+        self.assertEqual(pipe.execute.call_count, 3)
+        self.assertEqual(conflicts, {"a": 2, "b": None})
+
+    def test_merge_value_keeps_both_sides_changes(self):
+        base = {"ids": ["a", "b"], "x": 1, "y": 1}
+        mine = {"ids": ["a", "c"], "x": 2, "y": 1}
+        theirs = {"ids": ["a", "b", "d"], "x": 1, "y": 3}
+        self.assertEqual(
+            merge_value(base, mine, theirs), {"ids": ["a", "d", "c"], "x": 2, "y": 3}
+        )
+
+    def test_l1_invalidation_evicts_other_hooks_copies(self):
+        self.hook.config = dict(self.hook.config, l1_invalidation=True)
+        other = RedisHook()
+        other.redis = self.hook.redis
+        invalidator = L1Invalidator()
+        invalidator.hooks.add(self.hook)
+        invalidator.hooks.add(other)
+        nodes = [Node(m_id=0, h=self.hook) for i in range(2)]
+        self.hook.commit_all_cache_sync()
+        self.hook.save_obj_list = set()
+        for i in nodes:
+            other.mem.put(i.jid, i)
+        other.save_obj_list = {nodes[1]}
+
+        published = []
+        self.hook.redis.app.publish.side_effect = lambda c, m: published.append(m)
+        with unittest.mock.patch("jaseci.jsorc.redis.l1_invalidator", invalidator):
+            nodes[0].name = "changed"
+            nodes[0].save()
+            self.hook.commit_all_cache_sync()
+        self.assertEqual(
+            self.hook.redis.app.publish.call_args[0][0], L1_INVALIDATION_CHANNEL
+        )
+        for msg in published:
+            data = json.loads(msg)
+            invalidator.invalidate(data["o"], data["ids"] + [nodes[1].jid])
+
+        self.assertEqual(self.hook.invalidated_ids, set())
+        self.assertIsNone(other.get_obj_from_store(nodes[0].jid))
+        # unsaved local changes are kept
+        self.assertEqual(other.get_obj_from_store(nodes[1].jid), nodes[1])
+
+    def test_memory_only_hook_never_evicts(self):
+        hook = MemoryHook()
+        hook.mem.max_objs = 2
+        nodes = [Node(m_id=0, h=hook) for i in range(5)]
+        hook.commit()
+        Node(m_id=0, h=hook)
+        self.assertEqual(hook.mem_stats()["l1_objects"], 6)
+        self.assertEqual(hook.get_obj(0, nodes[0].jid), nodes[0])
+        dist = hook.get_object_distribution(with_stats=True)
+        self.assertEqual(dist[Node], 6)
+        self.assertGreater(dist["l1_hits"], 0)
+
+
+class SqliteHookTest(TestCaseHelper, TestCase):
+    """Unit tests for the sqlite hook against a temporary file"""
+
+    def setUp(self):
+        super().setUp()
+        self.dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.dir.name, "js.session.db")
+        self.hook = SqliteHook(self.path)
+
+    def tearDown(self):
+        self.hook.conn.close()
+        self.dir.cleanup()
+        super().tearDown()
+
+    def reopen(self):
+        return SqliteHook(self.path)
+
+    def test_wal_mode(self):
+        mode = self.hook.conn.execute("PRAGMA journal_mode").fetchone()[0]
+        self.assertEqual(mode, "wal")
+
+    def test_commit_round_trip(self):
+        nodes = [Node(m_id=0, h=self.hook, name=str(i)) for i in range(3)]
+        nodes[0].attach_outbound(nodes[1])
+        self.hook.save_glob("CONF", "val")
+        self.hook.commit()
+        hook = self.reopen()
+        loaded = hook.get_obj_from_store_many([i.jid for i in nodes])
+        self.assertEqual(len(loaded), 3)
+        self.assertEqual(loaded[nodes[1].jid].name, "1")
+        self.assertEqual(len(loaded[nodes[0].jid].attached_nodes()), 1)
+        self.assertEqual(hook.get_glob("CONF"), "val")
+        self.assertTrue(hook.has_obj(nodes[2].jid))
+
+    def test_file_is_the_only_store(self):
+        with unittest.mock.patch.object(RedisService, "get_bytes") as get_bytes:
+            node = Node(m_id=0, h=self.hook)
+            self.hook.commit()
+            self.assertEqual(self.reopen().get_obj(0, node.jid).jid, node.jid)
+        get_bytes.assert_not_called()
+        self.assertNotIsInstance(self.hook, RedisHook)
+
+    def test_corrupt_payload_is_missing(self):
+        node = Node(m_id=0, h=self.hook)
+        self.hook.commit()
+        with self.hook.conn:
+            self.hook.conn.execute("UPDATE objects SET payload = '{not json'")
+        hook = self.reopen()
+        self.assertIsNone(hook.get_obj(0, node.jid))
+        self.assertEqual(hook.get_obj_many(0, [node.jid]), [None])
+
+    def test_commit_skips_unchanged(self):
+        nodes = [Node(m_id=0, h=self.hook) for i in range(3)]
+        self.hook.commit()
+        nodes[0].name = "changed"
+        for i in nodes:
+            i.save()
+        self.hook.commit()
+        self.assertEqual(self.hook.db_skip_count, 2)
+
+    def test_destroy_deletes_row(self):
+        node = Node(m_id=0, h=self.hook)
+        self.hook.commit()
+        node.destroy()
+        self.hook.commit()
+        self.assertIsNone(self.reopen().get_obj_from_store(node.jid))
+
+    def test_streamed_traversal_evicts_what_it_loaded(self):
+        root = Node(m_id=0, h=self.hook)
+        kids = [Node(m_id=0, h=self.hook) for i in range(4)]
+        slow = Edge(m_id=0, h=self.hook, auto_save=False)
+        slow.context = {str(i): i for i in range(200)}
+        slow.save()
+        root.attach_outbound(kids[0], [slow])
+        for i in kids[1:]:
+            root.attach_outbound(i)
+        self.hook.commit()
+        hook = self.reopen()
+        root = hook.get_obj(0, root.jid)
+        streamed = list(root.iter_architypes(stream=True))
+        self.assertEqual(set(hook.mem.keys()), {"global", root.jid})
+        self.assertEqual(sum(isinstance(i, Edge) for i in streamed), 1)
+        self.assertEqual(
+            {i.jid for i in streamed}, {i.jid for i in root.iter_architypes()}
+        )
+
+    def test_adopt_moves_session_cache(self):
+        mem_hook = MemoryHook()
+        node = Node(m_id=0, h=mem_hook)
+        mem_hook.save_glob("CONF", "val")
+        self.hook.adopt(mem_hook)
+        self.hook.commit()
+        self.assertIs(node._h, self.hook)
+        hook = self.reopen()
+        self.assertEqual(hook.get_obj_from_store(node.jid).jid, node.jid)
+        self.assertEqual(hook.get_glob("CONF"), "val")
+
+
+class SegmentLogTest(TestCaseHelper, TestCase):
+    """Unit tests for the append-only segment log and its hook"""
+
+    def setUp(self):
+        super().setUp()
+        self.dir = tempfile.TemporaryDirectory()
+        self.log = self.open_log()
+
+    def tearDown(self):
+        self.log.close()
+        self.dir.cleanup()
+        super().tearDown()
+
+    def open_log(self, **kwargs):
+        return SegmentLog(self.dir.name, fsync=False, threaded=False, **kwargs)
+
+    def test_latest_record_wins_after_reopen(self):
+        self.log.put_many({"a": "1", "b": "2"})
+        self.log.put("a", "3")
+        self.log.delete("b")
+        self.log.put("g", "conf", GLOB_PUT)
+        self.log.close()
+        self.log = self.open_log()
+        self.assertEqual(self.log.get("a"), b"3")
+        self.assertIsNone(self.log.get("b"))
+        self.assertIsNone(self.log.get("g"))
+        self.assertEqual(self.log.get("g", GLOB_PUT), b"conf")
+
+    def test_torn_tail_is_truncated(self):
+        self.log.put_many({"a": "1", "b": "2"})
+        self.log.close()
+        path = self.log.segment_path(0)
+        size = os.path.getsize(path)
+        with open(path, "r+b") as f:
+            f.truncate(size - 1)
+        self.log = self.open_log()
+        self.assertEqual(self.log.get("a"), b"1")
+        self.assertFalse(self.log.has("b"))
+        self.log.put("c", "3")
+        self.log.close()
+        self.log = self.open_log()
+        self.assertEqual(self.log.get("c"), b"3")
+
+    def test_compaction_drops_superseded_records(self):
+        self.log.close()
+        self.log = self.open_log(segment_size=256)
+        for i in range(20):
+            self.log.put_many({"a": str(i) * 20, "b": "keep"})
+        self.log.delete("b")
+        segments = len(self.log.segments())
+        self.assertGreater(self.log.compact(), 0)
+        self.assertLess(len(self.log.segments()), segments)
+        self.assertEqual(self.log.get("a"), b"19" * 20)
+        self.log.close()
+        self.log = self.open_log(segment_size=256)
+        self.assertEqual(self.log.get("a"), b"19" * 20)
+        self.assertIsNone(self.log.get("b"))
+
+    def test_reads_are_views_of_the_map(self):
+        self.log.close()
+        self.log = self.open_log(segment_size=256)
+        self.log.put("a", "value")
+        value = self.log.get("a")
+        self.assertIsInstance(value, memoryview)
+        self.assertIsInstance(value.obj, mmap.mmap)
+        self.assertTrue(value.readonly)
+        # segments can be remapped and compacted away while views are held
+        for i in range(20):
+            self.log.put_many({"a": str(i) * 20, "b": "keep"})
+        self.assertGreater(self.log.compact(), 0)
+        self.assertEqual(value, b"value")
+        self.assertEqual(self.log.get("a"), b"19" * 20)
+
+    def test_second_open_fails_while_held(self):
+        with self.assertRaises(Exception):
+            self.open_log()
+        code = (
+            "import sys\n"
+            "from jaseci.utils.segment_log import SegmentLog\n"
+            "try:\n"
+            f"    SegmentLog({self.dir.name!r}, threaded=False)\n"
+            "except Exception:\n"
+            "    sys.exit(3)\n"
+        )
+        self.assertEqual(subprocess.run([sys.executable, "-c", code]).returncode, 3)
+        self.log.close()
+        self.log = self.open_log()
+
+    def test_hook_round_trip(self):
+        self.log.close()
+        hook = LogStoreHook(self.dir.name)
+        hook.log.threaded = False
+        self.assertNotIsInstance(hook, RedisHook)
+        nodes = [Node(m_id=0, h=hook, name=str(i)) for i in range(3)]
+        hook.save_glob("CONF", "val")
+        hook.commit()
+        hook.clear_cache()
+        loaded = hook.get_obj_from_store_many([i.jid for i in nodes])
+        self.assertEqual(loaded[nodes[1].jid].name, "1")
+        self.assertEqual(hook.get_glob("CONF"), "val")
+        nodes[2].destroy()
+        hook.commit()
+        hook.clear_cache()
+        self.assertFalse(hook.has_obj(nodes[2].jid))
+        self.log = hook.log
@@ -0,0 +1,82 @@
+"""
+Startup warmup of Jaseci's caches
+
+Loads the global sentinel (and any other configured sentinels), their
+architypes and actions and the configured global configs through a hook, so
+they land in redis and the hook's session cache, and decodes their jac IR
+into the process wide AST cache before the first request needs them.
+"""
+from time import time
+
+from jaseci.jac.ir.jac_code import JacCode, jac_ir_to_ast_cached
+from jaseci.jsorc.jsorc import JsOrc
+from jaseci.utils.utils import logger
+
+
+def is_jac_ir(value):
+    """Ability actions and presets hold jac IR, other actions hold a name"""
+    return isinstance(value, str) and value.startswith('{"gram_hash"')
+
+
+def load_objs(hook, ids):
+    """Objects of ids found through hook, fetched in one batch per tier"""
+    return [i for i in hook.get_obj_many(None, list(ids), override=True) if i]
+
+
+def warmup(hook=None, sentinel_ids=None, glob_names=None):
+    """
+    Preloads sentinels (the global one included), their architypes and
+    actions and global configs, and builds their ASTs. Returns a report of
+    what was loaded and how long it took
+    """
+    start = time()
+    hook = hook if hook is not None else JsOrc.hook()
+    report = {
+        "globals": 0,
+        "sentinels": 0,
+        "architypes": 0,
+        "actions": 0,
+        "asts": 0,
+    }
+
+    for name in dict.fromkeys(["GLOB_SENTINEL"] + list(glob_names or [])):
+        if hook.has_glob(name) and hook.get_glob(name) is not None:
+            report["globals"] += 1
+
+    sentinel_ids = list(sentinel_ids or [])
+    if hook.has_glob("GLOB_SENTINEL"):
+        sentinel_ids.insert(0, hook.get_glob("GLOB_SENTINEL"))
+    snts = load_objs(hook, dict.fromkeys(sentinel_ids))
+    archs = load_objs(hook, [j for i in snts for j in i.arch_ids])
+    actions = load_objs(
+        hook,
+        [
+            j
+            for i in archs
+            for j in i.entry_action_ids + i.activity_action_ids + i.exit_action_ids
+        ],
+    )
+    report["sentinels"] = len(snts)
+    report["architypes"] = len(archs)
+    report["actions"] = len(actions)
+
+    for i in snts:
+        # sentinels rebuild their architypes on refresh, only decode the IR
+        if i.code_ir and jac_ir_to_ast_cached(i.code_ir) is not None:
+            report["asts"] += 1
+    for i in archs:
+        if i.code_ir:
+            JacCode.refresh(i)
+            report["asts"] += i._jac_ast is not None
+    for i in actions:
+        for ir in (i.value, i.preset_in_out):
+            if is_jac_ir(ir) and jac_ir_to_ast_cached(ir) is not None:
+                report["asts"] += 1
+
+    report["seconds"] = round(time() - start, 3)
+    logger.info(
+        f"Warmed up {report['sentinels']} sentinels, {report['architypes']} "
+        f"architypes, {report['actions']} actions, {report['globals']} globals "
+        f"and {report['asts']} ASTs in {report['seconds']}s"
+    )
+    return report
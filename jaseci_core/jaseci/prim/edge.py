@@ -11,6 +11,33 @@ import uuid
 import sys
 
 
+def dot_index(id_map, jid):
+    """Index of jid in an id -> index dict (or a list of ids) for DOT names"""
+    return id_map[jid] if isinstance(id_map, dict) else id_map.index(jid)
+
+
+def edge_key(edge):
+    """
+    Key telling edges apart, its jid or for fast edges stored without one
+    (older graphs) its ends and name, unordered ends if bidirected
+    """
+    if edge.jid:
+        return edge.jid
+    ends = (edge.from_node_id, edge.to_node_id)
+    return (frozenset(ends) if edge.is_bidirected() else ends, edge.name)
+
+
+def dot_context(obj):
+    """Copy of obj's context without its private values, for DOT attributes"""
+    private = obj.private_values()
+    return {k: v for k, v in obj.context.items() if k not in private}
+
+
+def is_fast_context(context):
+    """Edges with contexts this small are kept in their nodes' fast_edges"""
+    return sys.getsizeof(context) < 2000
+
+
 class Edge(Element, Anchored):
     """Edge class for Jaseci"""
 
@@ -49,6 +76,9 @@ class Edge(Element, Anchored):
         """Returns both nodes connected to edge in a list"""
         return [self.to_node(), self.from_node()]
 
+    def neighbor_ids(self):
+        return [i for i in [self.from_node_id, self.to_node_id] if i]
+
     def opposing_node(self, node_obj):
         """Returns opposite node edge is pointing from node_obj"""
         node_set = [self.to_node_id, self.from_node_id]
@@ -74,6 +104,15 @@ class Edge(Element, Anchored):
     def set_bidirected(self, bidirected: bool):
         """Sets/unsets edge to be bidirected"""
         self.bidirected = bidirected
+        # update the fast edge entries and index of its nodes already in memory
+        for i in self.neighbor_ids():
+            node = (
+                self._h.get_obj(self._m_id, i)
+                if self._h.has_id_in_mem_cache(i)
+                else None
+            )
+            if node:
+                node.smart_edge_redirected(self)
         self.save()
 
     def is_bidirected(self):
@@ -97,7 +136,7 @@ class Edge(Element, Anchored):
         return True
 
     def is_fast(self):
-        return sys.getsizeof(self.context) < 2000
+        return is_fast_context(self.context)
 
     def save(self):
         """
@@ -127,23 +166,23 @@ class Edge(Element, Anchored):
             return str[:32].replace('"', '\\"')
 
         from_name = (
-            uuid.UUID(self.from_node().jid).hex
+            uuid.UUID(self.from_node_id).hex
             if node_map is None
-            else node_map.index(self.from_node().jid)
+            else dot_index(node_map, self.from_node_id)
         )
         to_name = (
-            uuid.UUID(self.to_node().jid).hex
+            uuid.UUID(self.to_node_id).hex
             if node_map is None
-            else node_map.index(self.to_node().jid)
+            else dot_index(node_map, self.to_node_id)
         )
         dstr = f'"n{from_name}" -> "n{to_name}" [ '
 
-        if detailed:
+        if detailed and self.jid:
             dstr += f'id="{uuid.UUID(self.jid).hex}", '
 
         label = ""
         if edge_map:
-            label = f"e{edge_map.index(self.jid)}"
+            label = f"e{dot_index(edge_map, edge_key(self))}"
         if self.name != "generic":
             label += f":{self.name}"
 
@@ -152,11 +191,9 @@ class Edge(Element, Anchored):
         if self.bidirected:
             dstr += ', dir="both"'
 
-        edge_dict = self.context
-        for i in self.private_values():
-            edge_dict.pop(i)
+        edge_dict = dot_context(self) if detailed else None
 
-        if edge_dict and detailed:
+        if edge_dict:
             for k, v in edge_dict.items():
                 if not isinstance(v, str) or v == "":
                     continue
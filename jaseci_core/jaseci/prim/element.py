@@ -17,10 +17,13 @@ from jaseci.prim.obj_mixins import Hookable
 from jaseci.jsorc.memory import MemoryHook
 from jaseci.utils.id_list import IdList
 from jaseci.utils.json_handler import JaseciJsonEncoder, json_str_to_jsci_dict
+from jaseci.utils.msgpack_handler import jsci_msgpack_dumps
 from jaseci.utils.utils import log_var_out, logger, camel_to_snake
 
 __version__ = "1.0.0"
 element_fields = None
+# j_type of each element class, shared by all its instances
+j_type_names = {}
 
 
 class Element(Hookable):
@@ -56,7 +59,11 @@ class Element(Hookable):
         self.kind = kind
         self.jid = uuid.uuid4().urn
         self.j_timestamp = datetime.utcnow().isoformat()
-        self.j_type = camel_to_snake(type(self).__name__)
+        self.j_type = j_type_names.get(type(self))
+        if self.j_type is None:
+            self.j_type = j_type_names[type(self)] = camel_to_snake(type(self).__name__)
+        # bumped on every write when optimistic concurrency (occ) is on
+        self.j_version = 0
         Hookable.__init__(self, **kwargs)
         if self.is_master():
             self.set_master(self.jid)
@@ -110,6 +117,8 @@ class Element(Hookable):
             else:
                 setattr(dup, i, self.__dict__[i])
         dup.id = id_save
+        dup._red_hash = dup._db_hash = None
+        dup.j_version = 0
         dup.timestamp = datetime.utcnow()
         dup.save()
         return dup
@@ -127,11 +136,13 @@ class Element(Hookable):
                         return False
         return True
 
-    def jsci_payload(self):
+    def jsci_payload(self, codec="json"):
         """
         Returns all data fields and values of jaseci object as json string.
         This grabs any fields that are added into inherited objects. Useful for
         saving and loading item.
+
+        codec 'msgpack' returns the text form of the msgpack blob instead
         """
         global element_fields
         if element_fields is None:
@@ -143,6 +154,8 @@ class Element(Hookable):
         obj_dict = {}
         for i in obj_fields:
             obj_dict[i] = getattr(self, i)
+        if codec == "msgpack":
+            return jsci_msgpack_dumps(obj_dict, text=True)
         return json.dumps(obj_dict, cls=JaseciJsonEncoder)
 
     def serialize(self, deep=0, detailed=False):
@@ -163,7 +176,9 @@ class Element(Hookable):
             "from_node_id",
         ]
         for i in vars(self).keys():
-            if not i.startswith("_"):
+            # versions live next to payloads in stores so payloads of unchanged
+            # objects stay the same across writes
+            if not i.startswith("_") and i != "j_version":
                 if not detailed and i not in key_fields:
                     continue
                 jdict[i] = copy.copy(vars(self)[i])
@@ -171,10 +186,9 @@ class Element(Hookable):
                     for j in self.private_values():
                         del jdict[i][j]
                 if deep > 0 and isinstance(jdict[i], IdList):
+                    objs = self._h.get_obj_many(self._m_id, jdict[i])
                     for j in range(len(jdict[i])):
-                        jdict[i][j] = copy.copy(
-                            self._h.get_obj(self._m_id, jdict[i][j]).serialize(deep - 1)
-                        )
+                        jdict[i][j] = copy.copy(objs[j].serialize(deep - 1))
         return jdict
 
     def json(self, deep=0, detailed=False):
@@ -187,8 +201,22 @@ class Element(Hookable):
             self.serialize(deep, detailed=detailed), indent=4, cls=JaseciJsonEncoder
         )
 
+    def msgpack(self, deep=0, detailed=False):
+        """
+        Returns entire self object as msgpack blob
+
+        deep indicates number of levels to unwind uuids
+        """
+        return jsci_msgpack_dumps(self.serialize(deep, detailed=detailed))
+
+    def dumps(self, codec="json"):
+        """Returns detailed self object encoded with codec for stores"""
+        if codec == "msgpack":
+            return self.msgpack(detailed=True)
+        return self.json(detailed=True)
+
     def json_load(self, blob):
-        """Loads self from json blob"""
+        """Loads self from json (or msgpack) blob"""
         jdict = json_str_to_jsci_dict(blob, parent_obj=self)
         self.dict_load(jdict=jdict)
 
@@ -198,6 +226,10 @@ class Element(Hookable):
             if i in vars(self).keys():
                 setattr(self, i, jdict[i])
 
+    def neighbor_ids(self):
+        """Ids of objects likely to be loaded next, used for prefetching"""
+        return []
+
     def get_deep_obj_list(self, objs=None):
         """Recursively get all contained Jaseci objects and return id_list"""
         if objs is None:
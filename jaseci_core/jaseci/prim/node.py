@@ -5,9 +5,10 @@ Each node has an id, name, timestamp and it's set of edges.
 First node in list of 'member_node_ids' is designated root node
 """
 from collections import OrderedDict
+from datetime import datetime
 from jaseci.prim.element import Element
 from jaseci.prim.obj_mixins import Anchored
-from jaseci.prim.edge import Edge
+from jaseci.prim.edge import Edge, dot_context, dot_index, edge_key
 from jaseci.utils.id_list import IdList
 from jaseci.utils.utils import logger
 
@@ -18,6 +19,109 @@ FROM = 1
 BI = 2
 
 
+class FastEdgeView:
+    """
+    Read only view of a fast edge entry [NODEID, DIR, EDGEID, CONTEXT] of a
+    node that answers edge queries without building its Edge object, use
+    promote() to get the full Edge when it is mutated or handed out
+    """
+
+    __slots__ = ("node", "name", "details")
+
+    def __init__(self, node, name, details):
+        self.node = node
+        self.name = name
+        self.details = details
+
+    @property
+    def jid(self):
+        return self.details[2] if len(self.details) > 2 else None
+
+    @property
+    def from_node_id(self):
+        return self.details[0] if self.details[1] == FROM else self.node.jid
+
+    @property
+    def to_node_id(self):
+        return self.node.jid if self.details[1] == FROM else self.details[0]
+
+    @property
+    def bidirected(self):
+        return self.details[1] == BI
+
+    @property
+    def context(self):
+        return self.details[3] if len(self.details) > 3 else {}
+
+    def is_bidirected(self):
+        return self.bidirected
+
+    def is_fast(self):
+        return True
+
+    def from_node(self):
+        return self.node._h.get_obj(self.node._m_id, self.from_node_id)
+
+    def to_node(self):
+        return self.node._h.get_obj(self.node._m_id, self.to_node_id)
+
+    def opposing_node(self, node_obj):
+        other = self.to_node_id if node_obj.jid == self.from_node_id else None
+        if other is None and node_obj.jid == self.to_node_id:
+            other = self.from_node_id
+        if other is None:
+            logger.critical(str(f"{self} disconnected to node {node_obj}"))
+            return None
+        return self.node._h.get_obj(self.node._m_id, other)
+
+    connects = Edge.connects
+    dot_str = Edge.dot_str
+
+    def edge(self):
+        """Edge of this fast edge built for one use, neither cached nor saved"""
+        return self.node.fast_edge_obj(self.name, self.details, save=False)
+
+    def private_values(self):
+        key = "edge" + self.name
+        arch = Anchored.arch_map.get(key)
+        if key not in Anchored.arch_map or (arch and id(arch._h) != id(self.node._h)):
+            return self.edge().private_values()
+        # looked up before, a cached None is an edge without architype
+        return arch.private_vars if arch else []
+
+    def serialize(self, deep=0, detailed=False):
+        """
+        Serializes as the Edge of this fast edge would, detailed needs the
+        element fields of an Edge so only that one builds it
+        """
+        if detailed:
+            return self.edge().serialize(deep, detailed)
+        private = self.private_values()
+        return {
+            "from_node_id": self.from_node_id,
+            "to_node_id": self.to_node_id,
+            "context": {k: v for k, v in self.context.items() if k not in private},
+            "name": self.name,
+            "kind": "edge",
+            "jid": self.jid,
+            "j_timestamp": datetime.utcnow().isoformat(),
+            "j_type": "edge",
+        }
+
+    def promote(self):
+        """The full Edge of this fast edge, built if not already in memory"""
+        h = self.node._h
+        edge = (
+            h.get_obj(self.node._m_id, self.jid)
+            if h.has_id_in_mem_cache(self.jid)
+            else None
+        )
+        return edge if edge else self.node.fast_edge_obj(self.name, self.details)
+
+    def __repr__(self):
+        return f"fast edge {self.name}:{self.jid}"
+
+
 class Node(Element, Anchored):
     """Node class for Jaseci"""
 
@@ -28,6 +132,7 @@ class Node(Element, Anchored):
         self.parent_node_ids = IdList(self)
         self.member_node_ids = IdList(self)
         self.dimension = dimension  # Nodes are always hdgd 0
+        self._adjacency = None
         Element.__init__(self, **kwargs)
         Anchored.__init__(self)
 
@@ -51,17 +156,214 @@ class Node(Element, Anchored):
         self._fast_edge_ids = IdList(self, in_list=self.edge_ids)
         for k in self.fast_edges.keys():
             for v in self.fast_edges[k]:
-                link_order = [v[0], self.jid] if v[1] == FROM else [self.jid, v[0]]
-                edge = Edge(
-                    m_id=self._m_id, h=self._h, kind="edge", name=k, auto_save=False
-                )
-                edge.from_node_id = link_order[0]
-                edge.to_node_id = link_order[1]
-                edge.bidirected = v[1] == BI
-                edge.jid = v[2] if len(v) > 2 else uuid.uuid4().urn
-                edge.context = v[3] if len(v) > 3 else {}
-                edge.save()
-                self._fast_edge_ids.add_obj(edge)
+                self._fast_edge_ids.add_obj(self.fast_edge_obj(k, v))
+
+    def smart_edge_views(self):
+        """
+        Attached edges for read only use, the built edges if there are, else
+        stored edges and views of fast edges, so no Edge is built for those
+        """
+        if len(self._fast_edge_ids):
+            return self.smart_edges
+        edges = self.edge_ids.obj_list()
+        for k, entries in self.fast_edges.items():
+            edges += [FastEdgeView(self, k, v) for v in entries]
+        return edges
+
+    def attached_edge_views(self):
+        """Edges as attached_edges orders them, fast edges as views"""
+        views = self.smart_edge_views()
+        return (
+            [i for i in views if not i.is_bidirected() and i.from_node_id == self.jid]
+            + [i for i in views if not i.is_bidirected() and i.to_node_id == self.jid]
+            + [i for i in views if i.is_bidirected()]
+        )
+
+    def fast_edge_obj(self, name, details, save=True):
+        """Builds (and unless save is off caches) the edge object of a fast edge"""
+        v = details
+        link_order = [v[0], self.jid] if v[1] == FROM else [self.jid, v[0]]
+        edge = Edge(m_id=self._m_id, h=self._h, kind="edge", name=name, auto_save=False)
+        edge.from_node_id = link_order[0]
+        edge.to_node_id = link_order[1]
+        edge.bidirected = v[1] == BI
+        edge.jid = v[2] if len(v) > 2 else uuid.uuid4().urn
+        edge.context = v[3] if len(v) > 3 else {}
+        if save:
+            edge.save()
+        return edge
+
+    def indexed_edges(self, direction):
+        """
+        Edges of node in direction (out, in or bi) using the store's
+        adjacency index, so only matching stored edges get loaded. None when
+        the index can not be used: store has none, edges are already built
+        or node has unsaved changes
+        """
+        if len(self._fast_edge_ids) or self in self._h.save_obj_list:
+            return None
+        ids = self._h.get_edge_ids_from_store(self.jid, direction)
+        if ids is None:
+            return None
+        ids = set(ids)
+        edges = [
+            i
+            for i in self._h.get_obj_many(
+                self._m_id, [i for i in self.edge_ids if i in ids]
+            )
+            if i is not None
+        ]
+        fast_dir = {"out": TO, "in": FROM, "bi": BI}[direction]
+        for k in self.fast_edges.keys():
+            for v in self.fast_edges[k]:
+                if v[1] == fast_dir:
+                    edge = None
+                    if len(v) > 2 and self._h.has_id_in_mem_cache(v[2]):
+                        edge = self._h.get_obj(self._m_id, v[2])
+                    edges.append(edge if edge else self.fast_edge_obj(k, v))
+        return edges
+
+    # ------------------ ADJACENCY ------------------ #
+
+    def adjacency(self):
+        """
+        In memory index of edges by name and direction (out, in or bi),
+        {name: {direction: {edge_id: (seq, fast edge details or None)}}}
+        where seq keeps the order edges were added in. Built on first use
+        from fast_edges and stored edges, then kept up to date as edges are
+        added, removed or change direction. None when fast edges predate
+        edge ids and can not be indexed
+        """
+        if self._adjacency is None:
+            self._adjacency = {}
+            self._adjacency_seq = 0
+            for i in self._h.get_obj_many(self._m_id, list(self.edge_ids)):
+                if i is not None:
+                    self.adjacency_add(i)
+            for k, entries in self.fast_edges.items():
+                for v in entries:
+                    if len(v) < 3:
+                        self._adjacency = False
+                        break
+                    edge = None
+                    if self._h.has_id_in_mem_cache(v[2]):
+                        edge = self._h.get_obj(self._m_id, v[2])
+                    if edge:
+                        # details keep the direction an edge was added with
+                        self.adjacency_add(edge, v)
+                        continue
+                    link_order = [v[0], self.jid] if v[1] == FROM else [self.jid, v[0]]
+                    directions = self.edge_directions(*link_order, v[1] == BI)
+                    self.adjacency_file(k, v[2], directions, v)
+                if self._adjacency is False:
+                    break
+            if self._adjacency and len(self._fast_edge_ids):
+                self.adjacency_reorder(list(self._fast_edge_ids))
+        return self._adjacency if self._adjacency is not False else None
+
+    def adjacency_reorder(self, edge_ids):
+        """Sequences indexed edges in the order of edge_ids (edges built so far)"""
+        pos = {i: n for n, i in enumerate(edge_ids)}
+        for buckets in self._adjacency.values():
+            for b in buckets.values():
+                for i, v in b.items():
+                    b[i] = (pos.get(i, len(pos) + v[0]), v[1])
+        self._adjacency_seq += len(pos)
+
+    def edge_directions(self, from_id, to_id, bidirected):
+        """Directions an edge runs in from this node (both for self loops)"""
+        if bidirected:
+            return ["bi"]
+        return [d for d, i in [("out", from_id), ("in", to_id)] if i == self.jid]
+
+    def adjacency_file(self, name, edge_id, directions, details):
+        """Files edge id under directions, keeping its seq if already filed"""
+        buckets = self._adjacency.setdefault(name, {})
+        seq = None
+        for b in buckets.values():
+            entry = b.pop(edge_id, None)
+            if entry is not None:
+                seq = entry[0]
+                details = entry[1] if details is None else details
+        if seq is None:
+            seq = self._adjacency_seq
+            self._adjacency_seq += 1
+        for d in directions:
+            buckets.setdefault(d, {})[edge_id] = (seq, details)
+
+    def adjacency_add(self, obj, details=None):
+        """(Re)files edge in the adjacency index, if it has been built"""
+        if not isinstance(self._adjacency, dict):
+            return
+        directions = self.edge_directions(
+            obj.from_node_id, obj.to_node_id, obj.is_bidirected()
+        )
+        self.adjacency_file(obj.name, obj.jid, directions, details)
+
+    def adjacency_drop(self, name, edge_id):
+        if not self._adjacency or name not in self._adjacency:
+            return
+        buckets = self._adjacency[name]
+        for d in list(buckets.keys()):
+            buckets[d].pop(edge_id, None)
+            if not buckets[d]:
+                del buckets[d]
+        if not buckets:
+            del self._adjacency[name]
+
+    def adjacency_objs(self, entries):
+        """
+        Edge objects of (name, edge_id, details) index entries, in order, with
+        stored edges fetched in one batch and fast edges built if not cached
+        """
+        stored = [i for k, i, v in entries if v is None]
+        objs = dict(zip(stored, self._h.get_obj_many(self._m_id, stored)))
+        ret = []
+        for k, i, v in entries:
+            if v is not None and i not in objs:
+                edge = None
+                if self._h.has_id_in_mem_cache(i):
+                    edge = self._h.get_obj(self._m_id, i)
+                objs[i] = edge if edge else self.fast_edge_obj(k, v)
+            if objs[i] is not None:
+                ret.append(objs[i])
+        return ret
+
+    def adjacency_matches(self, name, arch_name):
+        """Whether edges named name are instances of edge architype arch_name"""
+        for b in self._adjacency[name].values():
+            for i, v in b.items():
+                edge = self.adjacency_objs([(name, i, v[1])])
+                if edge:
+                    return edge[0].get_architype().is_instance(arch_name)
+        return False
+
+    def adjacent_edges(self, directions, name=None):
+        """
+        Edges of node in directions (out, in and/or bi), in that order,
+        limited to instances of edge architype name if given. Only edges of
+        matching names and directions are looked at and loaded
+        """
+        index = self.adjacency()
+        if index is None:
+            edges = []
+            for d in directions:
+                edges += {
+                    "out": self.outbound_edges,
+                    "in": self.inbound_edges,
+                    "bi": self.bidirected_edges,
+                }[d]()
+            return [i for i in edges if not name or i.get_architype().is_instance(name)]
+        names = [k for k in index.keys() if not name or self.adjacency_matches(k, name)]
+        entries = []
+        for d in directions:
+            found = []
+            for k in names:
+                for i, v in index[k].get(d, {}).items():
+                    found.append((v[0], k, i, v[1]))
+            found.sort(key=lambda x: x[0])
+            entries += [x[1:] for x in found]
+        return self.adjacency_objs(entries)
 
     def smart_add_edge(self, obj):
         # make sure fast edges built
@@ -72,8 +374,10 @@ class Node(Element, Anchored):
         # then store how needed
         if obj.is_fast():
             self.smart_edge_to_fast_edge(obj)
+            self.adjacency_add(obj, self.fast_edges[obj.name][-1])
         else:
             self.edge_ids.add_obj(obj)
+            self.adjacency_add(obj)
 
     def smart_edge_to_fast_edge(self, obj):
         if obj.name not in self.fast_edges:
@@ -86,10 +390,30 @@ class Node(Element, Anchored):
         ]
         self.fast_edges[obj.name].append(details)
 
+    def smart_edge_redirected(self, obj):
+        """Updates the fast edge entry and index of an edge that changed direction"""
+        if obj.is_fast():
+            # newest first, edges change direction right after being added
+            for i in reversed(self.fast_edges.get(obj.name, [])):
+                if len(i) > 2 and i[2] == obj.jid:
+                    i[1] = (
+                        BI
+                        if obj.is_bidirected()
+                        else TO
+                        if obj.from_node_id == self.jid
+                        else FROM
+                    )
+                    break
+        self.adjacency_add(obj)
+
     def smart_remove_edge(self, obj):
         if obj.is_fast():
             pluck = None
             for i in self.fast_edges[obj.name]:
+                if len(i) > 2 and i[2] == obj.jid:
+                    pluck = i
+                    break
+            for i in self.fast_edges[obj.name] if pluck is None else []:
                 other_node_id = obj.to_node_id if i[1] == TO else obj.from_node_id
                 if i[0] == other_node_id:
                     if obj.is_bidirected() or not (
@@ -98,16 +422,35 @@ class Node(Element, Anchored):
                         pluck = i
                         break
             self.fast_edges[obj.name].remove(pluck)
+            self.adjacency_drop(obj.name, obj.jid if len(pluck) < 3 else pluck[2])
             if not len(self.fast_edges[obj.name]):
                 del self.fast_edges[obj.name]
         elif obj and obj.jid in self.edge_ids:
             self.edge_ids.remove_obj(obj)
+            self.adjacency_drop(obj.name, obj.jid)
         self.clear_fast_edge_ids()
         self.save()
 
     def clear_fast_edge_ids(self):
         self._fast_edge_ids = IdList(self)
 
+    def smart_reset_edges(self):
+        """Drops built edges and index after fast_edges/edge_ids were written to"""
+        self.clear_fast_edge_ids()
+        self.edge_ids.cache_reset()
+        self._adjacency = None
+
+    def dict_load(self, jdict):
+        """Loads self from dict, edges may have changed so reindexes them"""
+        super().dict_load(jdict)
+        self._adjacency = None
+
+    def neighbor_ids(self):
+        """Opposing node ids of fast edges then ids of stored edges"""
+        ids = [v[0] for k in self.fast_edges.values() for v in k]
+        ids.extend(self.edge_ids)
+        return ids
+
     def attach(self, node_obj, edge_set=None, as_outbound=True, as_bidirected=False):
         """
         Generalized attach function for attaching nodes with edges
@@ -302,7 +645,8 @@ class Node(Element, Anchored):
     def outbound_edges(self, node_obj=None):
         """Returns list of all edges out of node"""
         edge_set = []
-        for e in self.smart_edges:
+        edges = self.indexed_edges("out")
+        for e in self.smart_edges if edges is None else edges:
             if not e.is_bidirected() and e.connects(self, node_obj):
                 edge_set.append(e)
         return edge_set
@@ -310,7 +654,8 @@ class Node(Element, Anchored):
     def inbound_edges(self, node_obj=None):
         """Returns list of all edges in to node"""
         edge_set = []
-        for e in self.smart_edges:
+        edges = self.indexed_edges("in")
+        for e in self.smart_edges if edges is None else edges:
             if not e.is_bidirected() and e.connects(node_obj, self):
                 edge_set.append(e)
         return edge_set
@@ -318,7 +663,8 @@ class Node(Element, Anchored):
     def bidirected_edges(self, node_obj=None):
         """Returns list of all edges between nodes"""
         edge_set = []
-        for e in self.smart_edges:
+        edges = self.indexed_edges("bi")
+        for e in self.smart_edges if edges is None else edges:
             if e.is_bidirected() and e.connects(self, node_obj):
                 edge_set.append(e)
         return edge_set
@@ -342,7 +688,7 @@ class Node(Element, Anchored):
     def outbound_nodes(self, edge_set=None):
         """Returns list of all nodes connected by edges out"""
         if edge_set is None:
-            edge_set = self.smart_edges
+            edge_set = self.smart_edge_views()
         ret_list = []
         for e in edge_set:
             if not e.is_bidirected() and e.connects(source=self):
@@ -352,7 +698,7 @@ class Node(Element, Anchored):
     def inbound_nodes(self, edge_set=None):
         """Returns list of all nodes connected by edges in"""
         if edge_set is None:
-            edge_set = self.smart_edges
+            edge_set = self.smart_edge_views()
         ret_list = []
         for e in edge_set:
             if not e.is_bidirected() and e.connects(target=self):
@@ -362,7 +708,7 @@ class Node(Element, Anchored):
     def bidirected_nodes(self, edge_set=None):
         """Returns list of all nodes connected by edges"""
         if edge_set is None:
-            edge_set = self.smart_edges
+            edge_set = self.smart_edge_views()
         ret_list = []
         for e in edge_set:
             if e.is_bidirected():
@@ -371,7 +717,7 @@ class Node(Element, Anchored):
 
     def attached_nodes(self):
         """Returns list of all nodes connected"""
-        edge_set = self.smart_edges
+        edge_set = self.smart_edge_views()
         ret_list = []
         for e in edge_set:
             ret_list.append(e.opposing_node(self))
@@ -442,7 +788,7 @@ class Node(Element, Anchored):
         if node_map is None:
             nid = f"{uuid.UUID(self.jid).hex}"
         else:
-            nid = f"{node_map.index(self.jid)}"
+            nid = f"{dot_index(node_map, self.jid)}"
 
         dstr = f'"n{nid}" [ '
 
@@ -451,11 +797,9 @@ class Node(Element, Anchored):
 
         dstr += f'label="n{nid}:{self.name}" '
 
-        node_dict = self.context
-        for i in self.private_values():
-            node_dict.pop(i)
+        node_dict = dot_context(self) if detailed else None
 
-        if node_dict and detailed:
+        if node_dict:
             for k, v in node_dict.items():
                 if not isinstance(v, str) or v == "":
                     continue
@@ -465,58 +809,104 @@ class Node(Element, Anchored):
 
         return dstr + "\n"
 
-    def get_all_architypes(self, depth: int = 0):
+    def iter_architypes(self, depth: int = 0, stream: bool = False):
         """
-        Returns all reachable architypes
-        """
-
-        childs = {self.jid: self}
+        Yields self then reachable nodes and edges breadth first as they are
+        found, up to depth steps away (0 for no limit). A node is yielded
+        before the first edge reaching it.
 
-        edges = OrderedDict()
-        nodes = OrderedDict(childs)
+        stream is for callers done with each object once it is yielded (e.g.
+        exports): fast edges come as views instead of Edges, and objects
+        this walk loaded into the session cache are evicted again after
+        they are yielded, unless they have unsaved changes. The frontier
+        then holds ids of those and they are loaded again to be expanded,
+        so only ids of what was seen are kept
+        """
+        h = self._h
+        batch = {}
+        nodes = {self.jid}
+        edges = set()
+        childs = [self]
+        yield self
 
         depth -= 1
 
         while len(childs) and depth != 0:
-            new_childs = OrderedDict()
-
-            for node in childs.values():
-                for edge in node.attached_edges():
-                    if not (edge.jid in edges):
-                        n_node = False
-                        to_node = edge.to_node()
-
-                        if to_node == node:
-                            n_node = edge.from_node()
-                        else:
-                            n_node = to_node
+            new_childs = []
+
+            for n, node in enumerate(childs):
+                reloaded = isinstance(node, str)
+                if reloaded:
+                    if node not in batch:
+                        # evicted ones are loaded again a batch at a time
+                        ids = [i for i in childs[n : n + 100] if isinstance(i, str)]
+                        batch = dict(zip(ids, h.get_obj_many(self._m_id, ids)))
+                    node = batch.pop(node)
+                if stream:
+                    loaded = [i for i in node.edge_ids if not h.has_id_in_mem_cache(i)]
+                    attached = node.attached_edge_views()
+                else:
+                    attached = node.attached_edges()
+                for edge in attached:
+                    key = edge_key(edge)
+                    if key in edges:
+                        continue
+                    edges.add(key)
+                    other = (
+                        edge.from_node_id
+                        if edge.to_node_id == node.jid
+                        else edge.to_node_id
+                    )
 
-                        if not (n_node.jid in nodes):
-                            edges.update({edge.jid: edge})
-                            new_childs.update({n_node.jid: n_node})
-                        else:
-                            edges.update({edge.jid: edge})
+                    if other not in nodes:
+                        nodes.add(other)
+                        cached = h.has_id_in_mem_cache(other)
+                        n_node = h.get_obj(self._m_id, other)
+                        yield n_node
+                        if stream and not cached and h.evict_obj(n_node):
+                            n_node = other
+                        new_childs.append(n_node)
+                    yield edge
+                if stream:
+                    for i in loaded:
+                        h.evict_obj(h.mem.get(i))
+                if reloaded:
+                    h.evict_obj(node)
 
             childs = new_childs
-            nodes.update(childs)
             depth -= 1
 
+    def get_all_architypes(self, depth: int = 0):
+        """
+        Returns all reachable architypes
+        """
+        nodes = OrderedDict()
+        edges = OrderedDict()
+        for i in self.iter_architypes(depth):
+            (edges if isinstance(i, Edge) else nodes)[i.jid] = i
         return nodes, edges
 
+    def traversing_dot_lines(self, detailed=False, depth: int = 0):
+        """
+        Yields DOT representation for graph line by line, nodes and edges
+        named by their index in id -> index dicts as they are reached
+        """
+        yield f"strict digraph {self.name} {{\n"
+        node_map = {}
+        edge_map = {}
+        for i in self.iter_architypes(depth, stream=True):
+            if isinstance(i, Node):
+                node_map[i.jid] = len(node_map)
+                yield f"    {i.dot_str(node_map, detailed)}"
+            else:
+                edge_map[edge_key(i)] = len(edge_map)
+                yield f"    {i.dot_str(node_map, edge_map, detailed)}"
+        yield "}"
+
     def traversing_dot_str(self, detailed=False, depth: int = 0):
         """
         DOT representation for graph.
         NOTE: This is different from the dot_str method for node intentionally
         because graph inherits node.
         """
-        nodes, edges = self.get_all_architypes(depth)
-
-        # Construct the graph string
-        dstr = ""
-        dstr += f"strict digraph {self.name} {{\n"
-        for n in nodes.values():
-            dstr += f"    {n.dot_str(list(nodes.keys()), detailed)}"
-        for e in edges.values():
-            dstr += f"    {e.dot_str(list(nodes.keys()), list(edges.keys()), detailed)}"
-        dstr += "}"
-        return dstr
+        return "".join(self.traversing_dot_lines(detailed, depth))
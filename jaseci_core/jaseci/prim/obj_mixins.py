@@ -190,6 +190,8 @@ class Hookable(Sharable):
     def __init__(self, h, persist: bool = True, parent=None, **kwargs):
         self._h = h  # hook for storing and loading to persistent store
         self._persist = persist
+        self._red_hash = None  # hash of payload last written to redis
+        self._db_hash = None  # hash of payload last written to db
         self.j_parent = parent.jid if parent else None  # member of
         Sharable.__init__(self, **kwargs)
 
@@ -1,3 +1,5 @@
+import copy
+import pickle
 import uuid
 from unittest import TestCase
 
@@ -9,6 +11,8 @@ from jaseci.prim.node import Node
 from jaseci.jsorc.jsorc import JsOrc
 from jaseci.utils.utils import TestCaseHelper, get_all_subclasses
 from jaseci.prim.architype import Architype
+from jaseci.jac.jac_set import JacSet
+from jaseci.utils.id_list import EMPTY_INDEX
 
 
 class ArchitypeTests(TestCaseHelper, TestCase):
@@ -151,3 +155,58 @@ class ArchitypeTests(TestCaseHelper, TestCase):
         sent.arch_ids.obj_list()
         after = len(sent.arch_ids)
         self.assertEqual(after, before - 2)
+
+    def test_id_list_index_tracks_mutations(self):
+        mast = JsOrc.master()
+        nd = Node(m_id=mast._m_id, h=mast._h)
+        ids = nd.edge_ids
+        ids.extend(["a", "b", "a"])
+        ids += ["c"]
+        ids.insert(0, "d")
+        ids.remove("a")
+        ids[0] = "e"
+        del ids[-1]
+        ids.pop()
+        self.assertEqual(ids, ["e", "b"])
+        self.assertEqual(ids.id_index, {"e": 1, "b": 1})
+        self.assertNotIn("a", ids)
+        with self.assertRaises(ValueError):
+            ids.remove("a")
+
+    def test_id_list_index_survives_pickle_and_copy(self):
+        mast = JsOrc.master()
+        nd = Node(m_id=mast._m_id, h=mast._h)
+        nd.edge_ids.extend(["a", "b"])
+        for loaded in [pickle.loads(pickle.dumps(nd)), copy.deepcopy(nd)]:
+            self.assertEqual(loaded.edge_ids.id_index, {"a": 1, "b": 1})
+            self.assertIs(loaded.edge_ids.parent_obj, loaded)
+
+    def test_empty_id_lists_share_companions_until_written(self):
+        mast = JsOrc.master()
+        nd1 = Node(m_id=mast._m_id, h=mast._h)
+        nd2 = Node(m_id=mast._m_id, h=mast._h)
+        self.assertFalse(hasattr(nd1.edge_ids, "__dict__"))
+        self.assertIs(nd1.edge_ids.id_index, nd2.edge_ids.id_index)
+        self.assertIs(nd1.edge_ids.id_index, EMPTY_INDEX)
+        nd1.edge_ids.append("a")
+        nd1.edge_ids.remove("a")
+        self.assertIs(nd2.edge_ids.id_index, EMPTY_INDEX)
+        self.assertEqual(nd2.edge_ids.obj_list(), [])
+        self.assertNotIn("a", nd2.edge_ids)
+
+    def test_jac_set_algebra_uses_jid_index(self):
+        mast = JsOrc.master()
+        a, b, c = [Node(m_id=mast._m_id, h=mast._h) for i in range(3)]
+        left = JacSet(in_list=[a, b, a])
+        right = JacSet(in_list=[b, c])
+        self.assertEqual(list(left), [a, b])
+        self.assertEqual(list(left + right), [a, b, c])
+        self.assertEqual(list(left - right), [a])
+        self.assertEqual(list(left * right), [b])
+        self.assertEqual(list(left / [b, c]), [a, c])
+        left += [c]
+        left.remove(a)
+        self.assertEqual(left.jid_index, {b.jid: 1, c.jid: 1})
+        self.assertNotIn(a, left)
+        for loaded in [pickle.loads(pickle.dumps(left)), copy.deepcopy(left)]:
+            self.assertEqual(set(loaded.jid_index), {b.jid, c.jid})
@@ -1,10 +1,20 @@
+import hashlib
 import os
 from unittest import TestCase
+from unittest.mock import patch
 
 from antlr4 import CommonTokenStream, InputStream
 
 import jaseci.jsorc.live_actions as lact
 import jaseci.tests.jac_test_code as jtc
+from jaseci.jac.ir import jac_code
+from jaseci.jac.ir.ast import Ast
+from jaseci.jac.ir.jac_code import (
+    IR_AST_CACHE,
+    clear_ir_ast_cache,
+    jac_ast_to_ir,
+    jac_ir_to_ast_cached,
+)
 from jaseci.prim.sentinel import Sentinel
 from jaseci.prim.graph import Graph
 from jaseci.jac.jac_parse.jacLexer import jacLexer
@@ -88,6 +98,34 @@ class JacTests(TestCaseHelper, TestCase):
             "week",
         )
 
+    def test_running_walker_leaves_shared_ast_untouched(self):
+        """Test bytecode debug info does not write locs into the shared AST"""
+        sent = Sentinel(m_id=0, h=JsOrc.hook())
+        sent.register_code(jtc.prog1)
+        arch = sent.arch_ids.get_obj_by_name("get_gen_day", kind="walker")
+        test_node = sent.arch_ids.get_obj_by_name("life", kind="node").run()
+        test_walker = sent.run_architype("get_gen_day")
+        test_walker.prime(test_node)
+        test_walker.context["date"] = "2010-08-03T03:00:00.000000"
+        test_walker.run()
+        self.assertEqual(jac_ast_to_ir(arch._jac_ast), arch.code_ir)
+
+    def test_ir_ast_cache_evicts_least_recently_used_by_size(self):
+        """Test the IR AST cache is keyed by IR hash and capped by IR bytes"""
+        irs = [jac_ast_to_ir(Ast(f"mod{i}")) for i in range(3)]
+        clear_ir_ast_cache()
+        with patch.object(jac_code, "IR_AST_CACHE_BYTES", len(irs[0]) * 2):
+            jac_ir_to_ast_cached(irs[0])
+            jac_ir_to_ast_cached(irs[1])
+            first = jac_ir_to_ast_cached(irs[0])
+            jac_ir_to_ast_cached(irs[2])
+            self.assertIs(jac_ir_to_ast_cached(irs[0]), first)
+        self.assertEqual(
+            list(IR_AST_CACHE.keys()),
+            [hashlib.md5(irs[i].encode()).hexdigest() for i in (2, 0)],
+        )
+        clear_ir_ast_cache()
+
     def test_sentinel_setp_running_walker(self):
         """Test the execution of a basic walker building graph"""
         sent = Sentinel(m_id=0, h=JsOrc.hook())
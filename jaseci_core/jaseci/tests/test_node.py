@@ -1,9 +1,10 @@
 from unittest import TestCase
+from unittest.mock import patch
 
 from jaseci.prim.architype import Architype
 from jaseci.prim import action
 from jaseci.prim.edge import Edge
-from jaseci.prim.node import Node
+from jaseci.prim.node import BI, TO, FastEdgeView, Node
 from jaseci.jsorc.jsorc import JsOrc
 from jaseci.utils.utils import TestCaseHelper
 
@@ -90,3 +91,120 @@ class NodeTests(TestCaseHelper, TestCase):
         )
         a.connect(Node(m_id=0, h=hook), Node(m_id=0, h=hook)),
         self.assertEqual(a.name, "my edge")
+
+    def test_get_obj_many_aligned_with_ids(self):
+        """Test batched get returns objects in id order with None for misses"""
+        hook = JsOrc.hook()
+        node1 = Node(m_id=0, h=hook)
+        node2 = Node(m_id=0, h=hook)
+        missing = Node(m_id=0, h=hook, auto_save=False).jid
+        objs = hook.get_obj_many(0, [node2.jid, missing, node1.jid, node2.jid])
+        self.assertEqual(objs, [node2, None, node1, node2])
+
+    def test_id_list_obj_list_heals_missing_with_batched_get(self):
+        """Test obj_list drops dangling ids when loading through get_obj_many"""
+        hdgd = Node(m_id=0, h=JsOrc.hook(), dimension=1)
+        members = [Node(m_id=0, h=hdgd._h) for _ in range(3)]
+        for i in members:
+            i.make_member_of(hdgd)
+        hdgd._h.decommit_obj_from_cache(members[1])
+        self.assertEqual(hdgd.member_node_ids.obj_list(), [members[0], members[2]])
+        self.assertEqual(len(hdgd.member_node_ids), 2)
+
+    def test_json_load_resolves_refs_in_one_batch(self):
+        """Test nested object references are fetched once after parsing"""
+        hook = JsOrc.hook()
+        refs = [Node(m_id=0, h=hook) for _ in range(3)]
+        nd = Node(m_id=0, h=hook)
+        nd.context = {
+            "a": refs[0],
+            "deep": {"list": [[refs[1]], {"b": refs[2]}], "c": [1, {"d": refs[0]}]},
+        }
+        blob = nd.jsci_payload()
+        loaded = Node(m_id=0, h=hook, auto_save=False)
+        with patch.object(
+            hook, "get_obj_from_store_many", wraps=hook.get_obj_from_store_many
+        ) as many, patch.object(hook, "get_obj_from_store") as single:
+            loaded.json_load(blob)
+        many.assert_called_once()
+        single.assert_not_called()
+        self.assertEqual(loaded.context, nd.context)
+
+    def test_adjacent_edges_indexed_by_name_and_direction(self):
+        """Test adjacency index matches edge scans and tracks edge changes"""
+        hub = Node(m_id=0, h=JsOrc.hook())
+        others = [Node(m_id=0, h=hub._h) for _ in range(4)]
+
+        def edge(name):
+            return [Edge(m_id=0, h=hub._h, kind="edge", name=name)]
+
+        friends = [hub.attach_outbound(i, edge("friend"))[0] for i in others[:3]]
+        family = hub.attach_outbound(others[3], edge("family"))[0]
+        hub.attach_inbound(others[0], edge("friend"))
+        hub.attach_bidirected(others[1], edge("family"))
+        self.assertEqual(
+            hub.adjacent_edges(["out", "bi"]),
+            hub.outbound_edges() + hub.bidirected_edges(),
+        )
+        self.assertEqual(hub.adjacent_edges(["in"]), hub.inbound_edges())
+
+        def arch(e):
+            return Architype(m_id=0, h=hub._h, name=e.name, kind="edge")
+
+        with patch.object(Edge, "get_architype", autospec=True, side_effect=arch):
+            found = hub.adjacent_edges(["out"], "family")
+            # one architype check per edge name, not per edge
+            self.assertEqual(Edge.get_architype.call_count, 2)
+        self.assertEqual(found, [family])
+
+        family.set_bidirected(True)
+        friends[0].destroy()
+        self.assertEqual(hub.adjacent_edges(["out"]), friends[1:])
+        self.assertEqual(hub.adjacent_edges(["bi"])[0], family)
+
+    def test_fast_edge_views_answer_without_building_edges(self):
+        """Test node queries on unbuilt fast edges use views, not Edges"""
+        node1 = Node(m_id=0, h=JsOrc.hook())
+        node2 = Node(m_id=0, h=node1._h)
+        node3 = Node(m_id=0, h=node1._h)
+        bi = node1.attach_bidirected(node2)[0]
+        out = node1.attach_outbound(node3)[0]
+        self.assertEqual([i[1] for i in node1.fast_edges["generic"]], [BI, TO])
+        node1.clear_fast_edge_ids()
+        with patch.object(Node, "fast_edge_obj") as build:
+            self.assertEqual(node1.attached_nodes(), [node2, node3])
+            self.assertEqual(node1.outbound_nodes(), [node3])
+            self.assertEqual(node1.bidirected_nodes(), [node2])
+            views = node1.smart_edge_views()
+        build.assert_not_called()
+        self.assertEqual(len(node1._fast_edge_ids), 0)
+        for view, edge in zip(views, [bi, out]):
+            self.assertIsInstance(view, FastEdgeView)
+            self.assertEqual(
+                [view.jid, view.from_node_id, view.to_node_id, view.bidirected],
+                [edge.jid, edge.from_node_id, edge.to_node_id, edge.bidirected],
+            )
+            self.assertTrue(view.connects(node1, ignore_direction=True))
+            self.assertIs(view.promote(), edge)
+        bi.destroy()
+        self.assertEqual(node1.attached_nodes(), [node3])
+
+    def test_streamed_traversal_keeps_fast_edges_without_jids_apart(self):
+        """Test fast edges stored without jids are each walked and drawn once"""
+        hub = Node(m_id=0, h=JsOrc.hook())
+        kids = [Node(m_id=0, h=hub._h) for i in range(3)]
+        hub.attach_outbound(kids[0])
+        hub.attach_outbound(kids[1])
+        hub.attach_bidirected(kids[2])
+        # entries as older graphs stored them, [NODEID, DIR]
+        for node in [hub] + kids:
+            node.fast_edges["generic"] = [i[:2] for i in node.fast_edges["generic"]]
+            node.clear_fast_edge_ids()
+        items = list(hub.iter_architypes(stream=True))
+        self.assertEqual(len(items), 7)
+        self.assertEqual(sum(isinstance(i, FastEdgeView) for i in items), 3)
+        lines = list(hub.traversing_dot_lines())
+        self.assertEqual(
+            sorted(i.split('label="')[1][:2] for i in lines if "->" in i),
+            ["e0", "e1", "e2"],
+        )
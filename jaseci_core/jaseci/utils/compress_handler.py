@@ -0,0 +1,55 @@
+"""
+Compression of large Jaseci object payloads
+
+Payloads (json or msgpack) over a size threshold are zlib compressed before
+being written to redis or the db. Compressed blobs carry a magic prefix so
+readers can decompress transparently and pass everything else through.
+"""
+import base64
+import zlib
+
+# 0xc1 can not start json, utf-8 text or a msgpack payload (see msgpack_handler)
+ZLIB_MAGIC = b"\xc1jz"
+ZLIB_VERSION = 1
+ZLIB_HEADER = ZLIB_MAGIC + bytes([ZLIB_VERSION])
+# text form for stores that only hold strings (db text columns)
+ZLIB_TEXT_PREFIX = "jsz:"
+
+
+def payload_size(blob):
+    """Size in bytes of a str or bytes payload"""
+    return len(blob.encode()) if isinstance(blob, str) else len(blob)
+
+
+def is_compressed_blob(blob):
+    """Test if blob (bytes or text form) was produced by compress_blob"""
+    if isinstance(blob, (bytes, bytearray, memoryview)):
+        return bytes(blob[: len(ZLIB_MAGIC)]) == ZLIB_MAGIC
+    return isinstance(blob, str) and blob.startswith(ZLIB_TEXT_PREFIX)
+
+
+def compress_blob(blob, level=6, text=False):
+    """
+    Compress str or bytes blob, text returns a base64 string for stores
+    that can not hold raw bytes. Str blobs decompress back to str.
+    """
+    is_str = isinstance(blob, str)
+    data = blob.encode() if is_str else bytes(blob)
+    # flag byte records if the original was text
+    packed = ZLIB_HEADER + bytes([is_str]) + zlib.compress(data, level)
+    if text:
+        return ZLIB_TEXT_PREFIX + base64.b64encode(packed).decode()
+    return packed
+
+
+def decompress_blob(blob):
+    """Decompress blob produced by compress_blob, anything else is returned as is"""
+    if not is_compressed_blob(blob):
+        return blob
+    if isinstance(blob, str):
+        blob = base64.b64decode(blob[len(ZLIB_TEXT_PREFIX) :])
+    version = blob[len(ZLIB_MAGIC)]
+    if version != ZLIB_VERSION:
+        raise ValueError(f"Unsupported compressed payload version {version}")
+    data = zlib.decompress(blob[len(ZLIB_HEADER) + 1 :])
+    return data.decode() if blob[len(ZLIB_HEADER)] else data
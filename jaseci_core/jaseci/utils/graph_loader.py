@@ -0,0 +1,235 @@
+"""
+Bulk loading of graphs for Jaseci
+
+Builds the nodes and edges of a whole graph in one call from a packed graph
+(net.pack's rows, or its columnar form of parallel lists) or from newline
+delimited json objects (graph_get's ndjson mode). Nothing is saved while the
+graph is built: fast edges are written straight into the fast_edges of both
+of their nodes without making Edge objects, only edges with large contexts
+get one, and every object is saved once at the end so the hook commits the
+whole graph through its bulk path.
+"""
+import json
+import uuid
+from time import time
+
+from jaseci.prim.edge import Edge, is_fast_context
+from jaseci.prim.node import BI, FROM, TO, Node
+from jaseci.utils.utils import logger
+
+
+def packed_rows(graph_dict):
+    """
+    Node rows (key, name, ctx) and edge rows (name, ctx, from key, to key,
+    bi_dir) of a packed graph, nodes are keyed by their index. Nodes and
+    edges are each either a list of rows as net.pack makes them or a dict of
+    columns (name, ctx, connect and bi_dir lists)
+    """
+    nodes = graph_dict.get("nodes", [])
+    edges = graph_dict.get("edges", [])
+    if isinstance(nodes, dict):
+        names = nodes.get("name", [])
+        ctxs = nodes.get("ctx") or [None] * len(names)
+        node_rows = list(zip(range(len(names)), names, ctxs))
+    else:
+        node_rows = [(n, i["name"], i.get("ctx")) for n, i in enumerate(nodes)]
+    if isinstance(edges, dict):
+        names = edges.get("name", [])
+        ctxs = edges.get("ctx") or [None] * len(names)
+        bi_dirs = edges.get("bi_dir") or [False] * len(names)
+        edge_rows = [
+            (name, ctx, connect[0], connect[1], bi_dir)
+            for name, ctx, connect, bi_dir in zip(
+                names, ctxs, edges.get("connect", []), bi_dirs
+            )
+        ]
+    else:
+        edge_rows = [
+            (i["name"], i.get("ctx"), i["connect"][0], i["connect"][1], i["bi_dir"])
+            for i in edges
+        ]
+    return node_rows, edge_rows
+
+
+def ndjson_item(obj, detailed=False):
+    """
+    Serialized obj as graph_get's ndjson mode exports it, edges keep their
+    direction so ndjson_rows can read the export back
+    """
+    item = obj.serialize(detailed=detailed)
+    if item.get("j_type") == "edge":
+        item["bidirected"] = obj.bidirected
+    return item
+
+
+def ndjson_rows(lines):
+    """
+    Node and edge rows (see packed_rows) of serialized objects, one json
+    object per line, nodes are keyed by their jids. Returns the jids of graph
+    objects too, they are the root loaded into
+    """
+    node_rows, edge_rows, root_keys = [], [], []
+    for line in lines.splitlines() if isinstance(lines, str) else lines:
+        if not line.strip():
+            continue
+        item = json.loads(line)
+        if item.get("j_type") == "graph":
+            root_keys.append(item.get("jid"))
+        elif item.get("j_type") == "edge":
+            edge_rows.append(
+                (
+                    item["name"],
+                    item.get("context"),
+                    item.get("from_node_id"),
+                    item.get("to_node_id"),
+                    item.get("bidirected", False),
+                )
+            )
+        else:
+            node_rows.append(
+                (item.get("jid", len(node_rows)), item["name"], item.get("context"))
+            )
+    return node_rows, edge_rows, root_keys
+
+
+class GraphLoader:
+    """
+    Builds nodes and edges for master m_id with deferred saves, edges
+    between keys not loaded (or None) land on target, or on the existing node
+    of that jid
+    """
+
+    def __init__(self, m_id, h, target=None, root_keys=()):
+        self._m_id = m_id
+        self._h = h
+        self.target = target
+        self.root_keys = set(root_keys)
+        self.nodes = {}
+        # stored Edges, and (node, name, details) of fast edges from node
+        self.edges = []
+        self.touched = {}
+        # access every element would look up from the master, looked up once
+        mast = h.get_obj(m_id, m_id) if h.has_obj(m_id) else None
+        self.mode = mast.perm_default if mast else "private"
+
+    def add_node(self, key, name, ctx=None):
+        node = Node(
+            m_id=self._m_id,
+            h=self._h,
+            mode=self.mode,
+            kind="node",
+            name=name,
+            auto_save=False,
+        )
+        node.context = ctx if ctx is not None else {}
+        self.nodes[key] = node
+        return node
+
+    def node(self, key):
+        """Node loaded for key, or the target or existing node it refers to"""
+        node = self.nodes.get(key)
+        if node is None:
+            if key is None or key in self.root_keys:
+                node = self.target
+            else:
+                node = self.touched.get(key) or self._h.get_obj(self._m_id, key)
+            if not isinstance(node, Node):
+                raise ValueError(f"Node {key} not found to connect edge to!")
+            self.touched[node.jid] = node
+        return node
+
+    def add_edge(self, name, ctx, source_key, target_key, bi_dir=False):
+        source = self.node(source_key)
+        target = self.node(target_key)
+        ctx = ctx if ctx is not None else {}
+        if is_fast_context(ctx):
+            edge_id = uuid.uuid4().urn
+            details = [
+                [other.jid, BI if bi_dir else TO if i is source else FROM, edge_id, ctx]
+                for i, other in ((source, target), (target, source))
+            ]
+            source.fast_edges.setdefault(name, []).append(details[0])
+            target.fast_edges.setdefault(name, []).append(details[1])
+            self.edges.append((source, name, details[0]))
+            return None
+        edge = Edge(
+            m_id=self._m_id,
+            h=self._h,
+            mode=self.mode,
+            kind="edge",
+            name=name,
+            auto_save=False,
+        )
+        edge.context = ctx
+        edge.from_node_id = source.jid
+        edge.to_node_id = target.jid
+        edge.bidirected = bool(bi_dir)
+        edge.j_parent = source.jid
+        source.edge_ids.append(edge.jid)
+        if edge.jid not in target.edge_ids:
+            target.edge_ids.append(edge.jid)
+        self.edges.append(edge)
+        return edge
+
+    def load(self, node_rows, edge_rows):
+        for i in node_rows:
+            self.add_node(*i)
+        # all ends are found before any node is written to
+        for i in edge_rows:
+            self.node(i[2]), self.node(i[3])
+        for i in edge_rows:
+            self.add_edge(*i)
+        return self
+
+    def save(self):
+        """Saves everything built and the existing nodes edges were added to"""
+        for i in self.touched.values():
+            i.smart_reset_edges()
+            i.save()
+        for i in self.nodes.values():
+            i.save()
+        for i in self.edges:
+            if isinstance(i, Edge):
+                i.save()
+
+    def edge_objs(self):
+        """Edges built in order, fast edges get their Edge objects made"""
+        return [
+            i if isinstance(i, Edge) else i[0].fast_edge_obj(i[1], i[2])
+            for i in self.edges
+        ]
+
+    def report(self):
+        return {"nodes": len(self.nodes), "edges": len(self.edges)}
+
+
+def bulk_load(target, data):
+    """
+    Loads a graph into the graph of target node in one pass, data is a packed
+    graph dict, its json or serialized objects as ndjson. Returns a report of
+    what was loaded and how long it took
+    """
+    start = time()
+    root_keys = ()
+    if isinstance(data, str):
+        try:
+            packed = json.loads(data)
+        except ValueError:
+            # more than one object, so ndjson
+            packed = None
+        if isinstance(packed, dict) and ("nodes" in packed or "edges" in packed):
+            data = packed
+    if isinstance(data, dict):
+        node_rows, edge_rows = packed_rows(data)
+    else:
+        node_rows, edge_rows, root_keys = ndjson_rows(data)
+    loader = GraphLoader(target._m_id, target._h, target, root_keys)
+    loader.load(node_rows, edge_rows)
+    loader.save()
+    report = loader.report()
+    report["seconds"] = round(time() - start, 3)
+    logger.info(
+        f"Bulk loaded {report['nodes']} nodes and {report['edges']} edges "
+        f"in {report['seconds']}s"
+    )
+    return report
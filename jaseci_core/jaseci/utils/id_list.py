@@ -6,26 +6,235 @@ objects
 
 parent_obj is the instance that the list belongs to
 """
+import bisect
+from types import MappingProxyType
+
 from jaseci.utils.utils import logger
 
 
+# shared read only companions of lists until they are first written to
+EMPTY_INDEX = MappingProxyType({})
+
+
+def id_list_restore(items, state):
+    """Rebuilds a pickled IdList (see IdList.__reduce__)"""
+    ret = IdList.__new__(IdList)
+    ret.__setstate__(state)
+    list.extend(ret, items)
+    ret.index_rebuild()
+    return ret
+
+
 class IdList(list):
     """
     ID list class for tracking lists of objects in Jaseci
 
     ingest_list is a list of hex strings to convert to UUID and append.
+
+    Keeps a companion index of id -> count next to the list so membership
+    checks are O(1), and the slot each id was appended at so removals find
+    its position with a bisect over the slots dropped since, instead of
+    comparing against every id before it. Every list mutation goes through
+    the overrides below to keep both in sync. Neither is pickled or copied,
+    they are rebuilt from the list when loaded
+
+    Elements hold many lists that stay empty, so lists are slotted and start
+    out sharing empty companions, each is copied on its first write
     """
 
+    __slots__ = (
+        "parent_obj",
+        "cached_objects",
+        "heal_list",
+        "auto_save",
+        "list_name",
+        "id_index",
+        "id_slots",
+        "next_slot",
+        "dropped_slots",
+        "stale_removes",
+    )
+    # removals to fall back to a scan for before rebuilding stale slots
+    STALE_REMOVES = 4
+
     def __init__(self, parent_obj, auto_save=True, in_list=None):
         self.parent_obj = parent_obj
-        self.cached_objects = []
-        self.heal_list = []
+        self.cached_objects = ()
+        self.heal_list = ()
         self.auto_save = auto_save
+        self.list_name = None
+        self.id_index = EMPTY_INDEX
+        self.slots_rebuild()
         if in_list:
             self.extend(in_list)
 
     def cache_reset(self):
-        self.cached_objects = []
+        self.cached_objects = ()
+
+    # ------------------- INDEX ------------------- #
+
+    def index_rebuild(self):
+        self.id_index = EMPTY_INDEX
+        if len(self):
+            self.id_index = {}
+            for i in self:
+                self.id_index[i] = self.id_index.get(i, 0) + 1
+        self.slots_stale()
+
+    def slots_rebuild(self):
+        """Slots of ids are their positions again"""
+        self.id_slots = EMPTY_INDEX
+        if len(self):
+            self.id_slots = {}
+            for pos, i in enumerate(self):
+                self.id_slots.setdefault(i, pos)
+        self.next_slot = len(self)
+        self.dropped_slots = ()
+        self.stale_removes = 0
+
+    def slots_stale(self):
+        """Positions were shuffled, slots are rebuilt when removals need them"""
+        self.id_slots = None
+        self.stale_removes = 0
+
+    def index_add(self, item):
+        try:
+            index = self.id_index
+        except AttributeError:
+            # items of old pickles are appended ahead of their state
+            return
+        if index is EMPTY_INDEX:
+            index = self.id_index = {}
+        count = index.get(item, 0)
+        index[item] = count + 1
+        if self.id_slots is not None:
+            if not count:
+                if self.id_slots is EMPTY_INDEX:
+                    self.id_slots = {}
+                self.id_slots[item] = self.next_slot
+            self.next_slot += 1
+
+    def index_drop(self, item):
+        count = self.id_index[item] - 1
+        if count:
+            self.id_index[item] = count
+        else:
+            del self.id_index[item]
+
+    def slot_drop(self, item):
+        """Marks the slot of item (its only copy) as dropped"""
+        slot = self.id_slots.pop(item)
+        if not self.dropped_slots:
+            self.dropped_slots = []
+        bisect.insort(self.dropped_slots, slot)
+        if len(self.dropped_slots) > len(self):
+            self.slots_rebuild()
+
+    def __getstate__(self):
+        return {
+            i: getattr(self, i)
+            for i in ["parent_obj", "cached_objects", "heal_list", "auto_save"]
+            + ["list_name"]
+        }
+
+    def __setstate__(self, state):
+        self.cached_objects = self.heal_list = ()
+        self.auto_save = True
+        self.list_name = None
+        for k, v in state.items():
+            if k in IdList.__slots__:
+                setattr(self, k, v)
+        self.index_rebuild()
+
+    def __reduce__(self):
+        return (id_list_restore, (list(self), self.__getstate__()))
+
+    def __contains__(self, item):
+        return item in self.id_index
+
+    def count(self, item):
+        return self.id_index.get(item, 0)
+
+    def append(self, item):
+        list.append(self, item)
+        self.index_add(item)
+
+    def extend(self, items):
+        items = list(items)
+        list.extend(self, items)
+        for i in items:
+            self.index_add(i)
+
+    def __iadd__(self, items):
+        self.extend(items)
+        return self
+
+    def insert(self, pos, item):
+        list.insert(self, pos, item)
+        self.index_add(item)
+        self.slots_stale()
+
+    def __imul__(self, times):
+        list.__imul__(self, times)
+        self.index_rebuild()
+        return self
+
+    def sort(self, *args, **kwargs):
+        list.sort(self, *args, **kwargs)
+        self.slots_stale()
+
+    def reverse(self):
+        list.reverse(self)
+        self.slots_stale()
+
+    def remove(self, item):
+        if item not in self:
+            raise ValueError(f"{item} not in IdList")
+        if self.id_slots is None:
+            self.stale_removes += 1
+            if self.stale_removes > self.STALE_REMOVES:
+                self.slots_rebuild()
+        if self.id_slots is not None and item in self.id_slots:
+            slot = self.id_slots[item]
+            list.__delitem__(self, slot - bisect.bisect_left(self.dropped_slots, slot))
+            self.slot_drop(item)
+        else:
+            list.remove(self, item)
+            if self.id_slots is not None:
+                self.slots_stale()
+        self.index_drop(item)
+
+    def pop(self, pos=-1):
+        item = list.pop(self, pos)
+        if self.id_slots is not None:
+            if self.count(item) == 1 and item in self.id_slots:
+                self.slot_drop(item)
+            else:
+                self.slots_stale()
+        self.index_drop(item)
+        return item
+
+    def clear(self):
+        list.clear(self)
+        self.index_rebuild()
+        self.slots_rebuild()
+
+    def __setitem__(self, pos, value):
+        if isinstance(pos, slice):
+            list.__setitem__(self, pos, value)
+            self.index_rebuild()
+        else:
+            self.slots_stale()
+            self.index_drop(list.__getitem__(self, pos))
+            list.__setitem__(self, pos, value)
+            self.index_add(value)
+
+    def __delitem__(self, pos):
+        if isinstance(pos, slice):
+            list.__delitem__(self, pos)
+            self.index_rebuild()
+        else:
+            self.pop(pos)
 
     def add_obj(self, obj, push_front=False, allow_dups=False, silent=False):
         """Adds a obj obj to Jaseci object"""
@@ -62,7 +271,7 @@ class IdList(list):
             self.remove(i)
         if len(self.heal_list) and hasattr(self.parent_obj, "save"):
             self.save()
-        self.heal_list = []
+        self.heal_list = ()
 
     def destroy_obj(self, obj):
         """Completely destroys a Jaseci obj obj by it's name"""
@@ -70,12 +279,15 @@ class IdList(list):
         obj.destroy()
 
     def obj_for_id_not_exist_error(self, item_id):
+        if not self.heal_list:
+            self.heal_list = []
         self.heal_list.append(item_id)
-        my_name = "id_list"
-        for k, v in self.parent_obj.__dict__.items():
-            if id(v) == id(self):
-                my_name = k
-        return f"{item_id} not found in {my_name} of {self.parent_obj}!"
+        if self.list_name is None:
+            self.list_name = "id_list"
+            for k, v in self.parent_obj.__dict__.items():
+                if v is self:
+                    self.list_name = k
+        return f"{item_id} not found in {self.list_name} of {self.parent_obj}!"
 
     def get_obj_by_name(self, name, kind=None, silent=False):
         """Returns a Jaseci obj obj by it's name"""
@@ -110,14 +322,16 @@ class IdList(list):
     def obj_list(self):
         """Return list of objects from ids"""
         if not len(self.cached_objects):
-            for i in self:
-                obj = self.parent_obj._h.get_obj(self.parent_obj._m_id, i)
+            objs = self.parent_obj._h.get_obj_many(self.parent_obj._m_id, self)
+            cached_objects = []
+            for i, obj in zip(self, objs):
                 if not obj:
                     logger.critical(self.obj_for_id_not_exist_error(i))
                 else:
-                    self.cached_objects.append(obj)
+                    cached_objects.append(obj)
+            self.cached_objects = cached_objects
         self.heal()
-        return self.cached_objects.copy()
+        return list(self.cached_objects)
 
     def remove_all(self):
         """Remove a Jaseci obj obj by it's name"""
@@ -2,7 +2,9 @@ import json
 from json import JSONDecoder, JSONEncoder
 
 from jaseci.jsorc.jsorc import JsOrc
+from jaseci.utils.compress_handler import decompress_blob
 from jaseci.utils.id_list import IdList
+from jaseci.utils.msgpack_handler import is_msgpack_blob, jsci_msgpack_loads
 from jaseci.utils.utils import logger
 
 
@@ -16,49 +18,102 @@ class JaseciJsonEncoder(JSONEncoder):
             return super().default(obj)
 
 
-class JaseciJsonDecoder(JSONDecoder):
-    def __init__(self, *args, **kwargs):
-        JSONDecoder.__init__(self, object_hook=self.object_hook, *args, **kwargs)
-
-    def object_hook(self, obj):
-        if isinstance(obj, dict):
-            if "__mem_id__" in obj:
-                return self.convert(obj["__mem_id__"])
-            else:
-                for k in obj:
-                    self.transform(obj, k)
-        elif isinstance(obj, (list, tuple)):
-            for idx, k in enumerate(obj):
-                self.transform(obj, idx)
+class MemRef:
+    """Placeholder for a referenced object until it is resolved"""
+
+    __slots__ = ("jid",)
+
+    def __init__(self, jid):
+        self.jid = jid
+
+
+class MemRefCollector:
+    """
+    Records where object references sit while a payload is parsed so all of
+    them get resolved with one batched store fetch once parsing is done
+
+    scan_lists walks lists found in dicts, for parsers without list hooks,
+    hook is used to fetch the objects (a fresh JsOrc hook if not given)
+    """
+
+    def __init__(self, scan_lists=True, hook=None):
+        self.scan_lists = scan_lists
+        self.hook = hook
+        self.refs = []
+
+    def collect(self, obj, key, val):
+        if type(val) is MemRef:
+            self.refs.append((obj, key))
+        elif self.scan_lists and type(val) is list:
+            for idx, i in enumerate(val):
+                self.collect(val, idx, i)
+
+    def on_dict(self, obj):
+        if "__mem_id__" in obj:
+            return MemRef(obj["__mem_id__"])
+        for k, v in obj.items():
+            self.collect(obj, k, v)
+        return obj
+
+    def on_list(self, obj):
+        for idx, i in enumerate(obj):
+            self.collect(obj, idx, i)
         return obj
 
-    def transform(self, obj, key):
-        if isinstance(obj[key], dict):
-            if "__mem_id__" in obj[key]:
-                obj[key] = self.convert(obj[key]["__mem_id__"])
-            else:
-                for k in obj[key]:
-                    self.transform(obj[key], k)
-        elif isinstance(obj[key], (list, tuple)):
-            for idx, k in enumerate(obj[key]):
-                self.transform(obj[key], idx)
+    def resolve(self, root):
+        """Replaces every collected reference with its object (or None)"""
+        holder = [root]
+        if type(root) is MemRef or (self.scan_lists and type(root) is list):
+            self.collect(holder, 0, root)
+        if self.refs:
+            jids = list(dict.fromkeys(obj[key].jid for obj, key in self.refs))
+            hook = self.hook if self.hook is not None else JsOrc.hook()
+            objs = hook.get_obj_from_store_many(jids)
+            for obj, key in self.refs:
+                obj[key] = objs.get(obj[key].jid)
+            self.refs = []
+        return holder[0]
+
+
+class JaseciJsonDecoder(JSONDecoder):
+    """
+    Json decoder turning {"__mem_id__": jid} back into objects, every value
+    is visited once and references are fetched in one batch after parsing
+    """
 
-    def convert(self, urn):
-        return JsOrc.hook().get_obj_from_store(urn)
+    def __init__(self, *args, hook=None, **kwargs):
+        self.collector = MemRefCollector(hook=hook)
+        JSONDecoder.__init__(self, object_hook=self.collector.on_dict, *args, **kwargs)
 
+    def decode(self, s, *args, **kwargs):
+        return self.collector.resolve(super().decode(s, *args, **kwargs))
 
-def json_str_to_jsci_dict(input_str, parent_obj=None):
+
+def json_str_to_jsci_dict(input_str, parent_obj=None, hook=None):
     """
     Helper function to convert JSON strings to dictionarys with _ids list
-    conversions from hex to UUID
+    conversions from hex to UUID, msgpack and compressed blobs are detected
+    and decoded too
 
-    ret_obj is the owning object for id_list objects
+    ret_obj is the owning object for id_list objects, referenced objects are
+    fetched through hook (defaults to the hook of parent_obj)
     """
 
+    if hook is None:
+        hook = getattr(parent_obj, "_h", None)
     try:
-        obj_fields = json.loads(input_str, cls=JaseciJsonDecoder)
+        input_str = decompress_blob(input_str)
+        if is_msgpack_blob(input_str):
+            obj_fields = jsci_msgpack_loads(input_str, hook=hook)
+        else:
+            obj_fields = json.loads(input_str, cls=JaseciJsonDecoder, hook=hook)
     except ValueError:
-        logger.error(str(f"Invalid jsci_obj string {input_str} on {parent_obj.jid}"))
+        logger.error(
+            str(
+                f"Invalid jsci_obj string {input_str} on "
+                f"{getattr(parent_obj, 'jid', None)}"
+            )
+        )
         obj_fields = {}
     for i in obj_fields.keys():
         if str(i).endswith("_ids") and isinstance(obj_fields[i], list):
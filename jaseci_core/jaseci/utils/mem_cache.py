@@ -0,0 +1,104 @@
+"""
+Memory cache class for Jaseci
+
+Bounded LRU/TTL object cache used as the session (L1) cache of hooks. Keys
+are jids, except for 'global' which holds global configs and is never evicted
+"""
+from collections import OrderedDict
+from time import time
+
+
+class MemCache(OrderedDict):
+    """
+    LRU/TTL cache of Jaseci objects
+
+    max_objs is the max number of objects kept (0 is unbounded), ttl is the
+    number of seconds an object is served before reloading (0 is forever).
+    evictable is called before dropping an object and can veto it (pinned
+    objects), on_evict is called for every dropped object.
+    """
+
+    SCAN_WINDOW = 64
+
+    def __init__(self, max_objs=0, ttl=0, evictable=None, on_evict=None):
+        super().__init__()
+        self.max_objs = max_objs
+        self.ttl = ttl
+        self.evictable = evictable
+        self.on_evict = on_evict
+        self.stamps = {}
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self["global"] = {}
+
+    def lookup(self, key):
+        """Get object by key, tracking hits/misses, LRU order and TTL"""
+        obj = OrderedDict.get(self, key)
+        if obj is None:
+            self.misses += 1
+            return None
+        if self.ttl and time() - self.stamps.get(key, 0) > self.ttl:
+            if self.can_evict(obj):
+                self.drop(key)
+                self.misses += 1
+                return None
+            self.stamps[key] = time()
+        self.hits += 1
+        self.move_to_end(key)
+        return obj
+
+    def put(self, key, obj):
+        """Add object by key and evict least recently used when over budget"""
+        self[key] = obj
+        self.move_to_end(key)
+        if self.ttl:
+            self.stamps[key] = time()
+        if self.max_objs:
+            self.evict(len(self) - 1 - self.max_objs, keep=key)
+
+    def evict(self, count, keep=None):
+        """Evicts up to count least recently used objects that are evictable"""
+        if count <= 0:
+            return
+        victims = []
+        pinned = []
+        for key in self.keys():
+            if len(victims) >= count or len(pinned) >= count + self.SCAN_WINDOW:
+                break
+            if key == "global" or key == keep:
+                continue
+            if self.can_evict(self[key]):
+                victims.append(key)
+            else:
+                pinned.append(key)
+        # pinned objects are moved up so later scans reach evictable ones
+        for key in pinned:
+            self.move_to_end(key)
+        for key in victims:
+            self.drop(key)
+
+    def can_evict(self, obj):
+        return self.evictable is None or self.evictable(obj)
+
+    def drop(self, key):
+        obj = self.pop(key)
+        self.evictions += 1
+        if self.on_evict is not None:
+            self.on_evict(obj)
+
+    def pop(self, key, *args):
+        self.stamps.pop(key, None)
+        return super().pop(key, *args)
+
+    def __delitem__(self, key):
+        self.stamps.pop(key, None)
+        super().__delitem__(key)
+
+    def stats(self):
+        return {
+            "l1_objects": len(self) - 1,
+            "l1_hits": self.hits,
+            "l1_misses": self.misses,
+            "l1_evictions": self.evictions,
+        }
@@ -0,0 +1,111 @@
+"""
+Msgpack codec for Jaseci objects
+
+Compact binary alternative to the json payloads written to redis and the db.
+Blobs carry a magic prefix and version so readers can tell them apart from
+json, object references and id lists are packed as 16 byte uuids.
+
+msgpack is only imported when a blob is packed or unpacked, telling blobs
+apart needs only their magic prefix, so the default json codec works
+without it installed.
+"""
+import base64
+import uuid
+
+from jaseci.utils.id_list import IdList
+
+# 0xc1 is never used by msgpack and can not start a json (or utf-8) string
+MSGPACK_MAGIC = b"\xc1js"
+MSGPACK_VERSION = 1
+MSGPACK_HEADER = MSGPACK_MAGIC + bytes([MSGPACK_VERSION])
+# text form for stores that only hold strings (db text columns)
+MSGPACK_TEXT_PREFIX = "jsmp:"
+
+EXT_MEM_ID = 1
+EXT_ID_LIST = 2
+
+
+def msgpack_default(obj):
+    import msgpack
+    from jaseci.prim.element import Element
+
+    if isinstance(obj, Element):
+        return msgpack.ExtType(EXT_MEM_ID, uuid.UUID(obj.jid).bytes)
+    elif isinstance(obj, IdList):
+        try:
+            return msgpack.ExtType(
+                EXT_ID_LIST, b"".join(uuid.UUID(i).bytes for i in obj)
+            )
+        except (TypeError, ValueError, AttributeError):
+            return list(obj)
+    # strict types hands over subclasses of builtins, pack them as json would
+    elif isinstance(obj, (list, tuple)):
+        return list(obj)
+    elif isinstance(obj, dict):
+        return dict(obj)
+    elif isinstance(obj, str):
+        return str(obj)
+    elif isinstance(obj, float):
+        return float(obj)
+    elif isinstance(obj, int):
+        return int(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not msgpack serializable")
+
+
+def msgpack_ext_hook(code, data):
+    import msgpack
+    from jaseci.utils.json_handler import MemRef
+
+    if code == EXT_MEM_ID:
+        return MemRef(uuid.UUID(bytes=data).urn)
+    elif code == EXT_ID_LIST:
+        return [uuid.UUID(bytes=data[i : i + 16]).urn for i in range(0, len(data), 16)]
+    return msgpack.ExtType(code, data)
+
+
+def is_msgpack_blob(blob):
+    """Test if blob (bytes or text form) was produced by jsci_msgpack_dumps"""
+    if isinstance(blob, (bytes, bytearray, memoryview)):
+        return bytes(blob[: len(MSGPACK_MAGIC)]) == MSGPACK_MAGIC
+    return isinstance(blob, str) and blob.startswith(MSGPACK_TEXT_PREFIX)
+
+
+def jsci_msgpack_dumps(obj, text=False):
+    """
+    Pack obj into a versioned msgpack blob, text returns a base64 string
+    for stores that can not hold raw bytes
+    """
+    import msgpack
+
+    blob = MSGPACK_HEADER + msgpack.packb(
+        obj, default=msgpack_default, strict_types=True, use_bin_type=True
+    )
+    if text:
+        return MSGPACK_TEXT_PREFIX + base64.b64encode(blob).decode()
+    return blob
+
+
+def jsci_msgpack_loads(blob, hook=None):
+    """
+    Unpack blob (bytes or text form) produced by jsci_msgpack_dumps, object
+    references are resolved in one batch through hook after unpacking
+    """
+    import msgpack
+    from jaseci.utils.json_handler import MemRefCollector
+
+    if isinstance(blob, str):
+        blob = base64.b64decode(blob[len(MSGPACK_TEXT_PREFIX) :])
+    # buffers (memoryviews of mapped files) are unpacked in place
+    version = blob[len(MSGPACK_MAGIC)]
+    if version != MSGPACK_VERSION:
+        raise ValueError(f"Unsupported msgpack payload version {version}")
+    collector = MemRefCollector(scan_lists=False, hook=hook)
+    obj = msgpack.unpackb(
+        blob[len(MSGPACK_HEADER) :],
+        ext_hook=msgpack_ext_hook,
+        object_hook=collector.on_dict,
+        list_hook=collector.on_list,
+        raw=False,
+        strict_map_key=False,
+    )
+    return collector.resolve(obj)
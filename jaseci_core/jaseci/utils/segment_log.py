@@ -0,0 +1,387 @@
+"""
+Append-only segment log for Jaseci objects and globals
+
+Records are appended to numbered segment files in a directory and located
+through an in-memory index of key -> (segment, offset, length), reads hand
+out a memoryview of the memory mapped segment, without read syscalls or
+copies. Superseded records are
+reclaimed by compacting sealed segments in the background, and the index is
+rebuilt on open by scanning segments in order, dropping any torn tail left
+by a crash.
+
+A log is owned by a single process: the index lives in that process only,
+so opening holds an exclusive lock on the directory and a second process
+(or a forked child) opening it fails instead of corrupting it.
+"""
+import atexit
+import mmap
+import os
+import struct
+import threading
+import zlib
+
+try:
+    import fcntl
+except ImportError:
+    # no advisory locks (windows), ownership is then up to the deployment
+    fcntl = None
+
+from jaseci.utils.utils import logger
+
+# record kinds, one namespace per kind pair
+OBJ_PUT = 0
+OBJ_DEL = 1
+GLOB_PUT = 2
+GLOB_DEL = 3
+
+# crc32 of the rest of the record, kind, key length, value length
+RECORD_HEADER = struct.Struct("<IBHI")
+SEGMENT_SUFFIX = ".seg"
+LOCK_FILE = "LOCK"
+
+
+class SegmentLog:
+    """
+    Durable key value log over a directory of segments, keys are str and
+    values str or bytes (returned as read-only memoryviews of the segment).
+    Safe to share across threads
+    """
+
+    def __init__(
+        self,
+        path,
+        segment_size=64 * 1024 * 1024,
+        compact_ratio=0.5,
+        compact_interval=30.0,
+        fsync=True,
+        threaded=True,
+    ):
+        self.path = path
+        self.segment_size = segment_size
+        self.compact_ratio = compact_ratio
+        self.compact_interval = compact_interval
+        self.fsync = fsync
+        self.threaded = threaded
+        self.lock = threading.RLock()
+        # kind namespace (OBJ_PUT or GLOB_PUT) -> key ->
+        # (segment, value offset, value length, record size)
+        self.index = {OBJ_PUT: {}, GLOB_PUT: {}}
+        # segment -> [total bytes, dead bytes]
+        self.sizes = {}
+        self.maps = {}
+        self.active = None
+        self.active_file = None
+        self.worker = None
+        self.stopping = threading.Event()
+        self.compacted_count = 0
+        os.makedirs(path, exist_ok=True)
+        self.lock_file = self.lock_dir()
+        self.rebuild_index()
+
+    # -------------------- FILES --------------------- #
+
+    def lock_dir(self):
+        """Takes the exclusive lock of the directory, held until close"""
+        lock_file = open(os.path.join(self.path, LOCK_FILE), "a")
+        if fcntl is not None:
+            try:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except OSError:
+                lock_file.close()
+                raise Exception(
+                    f"Segment log {self.path} is in use by another process!"
+                )
+        return lock_file
+
+    def segment_path(self, seg):
+        return os.path.join(self.path, f"{seg:08d}{SEGMENT_SUFFIX}")
+
+    def segments(self):
+        """Ids of segments on disk, oldest first"""
+        return sorted(
+            int(i[: -len(SEGMENT_SUFFIX)])
+            for i in os.listdir(self.path)
+            if i.endswith(SEGMENT_SUFFIX) and i[: -len(SEGMENT_SUFFIX)].isdigit()
+        )
+
+    def open_segment(self, seg):
+        """Makes seg the segment new records are appended to"""
+        if self.active_file is not None:
+            self.active_file.close()
+        self.active = seg
+        self.active_file = open(self.segment_path(seg), "ab")
+        self.sizes.setdefault(seg, [self.active_file.tell(), 0])
+
+    def view(self, seg, end):
+        """Memory map of seg covering at least up to offset end"""
+        mm = self.maps.get(seg)
+        if mm is None or len(mm) < end:
+            # an outgrown map is unmapped once no view of it is left
+            with open(self.segment_path(seg), "rb") as f:
+                mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            self.maps[seg] = mm
+        return mm
+
+    def drop_segment(self, seg):
+        close_map(self.maps.pop(seg, None))
+        self.sizes.pop(seg, None)
+        os.remove(self.segment_path(seg))
+
+    # ------------------- RECOVERY ------------------- #
+
+    def rebuild_index(self):
+        """
+        Rebuilds the index by replaying every segment oldest first, a record
+        that is short or fails its crc ends the segment and the file is
+        truncated there, later records of a key win
+        """
+        with self.lock:
+            segs = self.segments()
+            for seg in segs:
+                self.sizes[seg] = [0, 0]
+                with open(self.segment_path(seg), "rb") as f:
+                    data = f.read()
+                good = self.replay(seg, data)
+                if good < len(data):
+                    logger.warning(
+                        f"Truncating segment {seg} of {self.path} at {good}, "
+                        f"dropping {len(data) - good} bytes of a torn write"
+                    )
+                    with open(self.segment_path(seg), "r+b") as f:
+                        f.truncate(good)
+                        os.fsync(f.fileno())
+                self.sizes[seg][0] = good
+            if segs and self.sizes[segs[-1]][0] < self.segment_size:
+                self.open_segment(segs[-1])
+            else:
+                self.open_segment(segs[-1] + 1 if segs else 0)
+
+    def replay(self, seg, data):
+        """Applies records of seg to the index, returns the end of the last good one"""
+        pos = 0
+        while pos + RECORD_HEADER.size <= len(data):
+            crc, kind, klen, vlen = RECORD_HEADER.unpack_from(data, pos)
+            end = pos + RECORD_HEADER.size + klen + vlen
+            if end > len(data) or kind > GLOB_DEL:
+                break
+            if zlib.crc32(data[pos + 4 : end]) != crc:
+                break
+            key = data[pos + RECORD_HEADER.size : pos + RECORD_HEADER.size + klen]
+            self.apply(kind, key.decode(), seg, end - vlen, vlen, end - pos)
+            pos = end
+        return pos
+
+    def apply(self, kind, key, seg, offset, length, size):
+        """Points key at its newest record, accounting the superseded one as dead"""
+        index = self.index[kind & ~1]
+        old = index.get(key)
+        if old is not None and old[0] in self.sizes:
+            self.sizes[old[0]][1] += old[3]
+        if kind & 1:
+            index.pop(key, None)
+            # tombstones are dead weight once written
+            self.sizes[seg][1] += size
+        else:
+            index[key] = (seg, offset, length, size)
+
+    # -------------------- ACCESS -------------------- #
+
+    def get(self, key, kind=OBJ_PUT):
+        """
+        Value of key as a read-only memoryview into its segment's map (no
+        copy is made), None if there is none
+        """
+        with self.lock:
+            loc = self.index[kind].get(key)
+            if loc is None:
+                return None
+            seg, offset, length, size = loc
+            if seg == self.active:
+                self.active_file.flush()
+            return memoryview(self.view(seg, offset + length))[offset : offset + length]
+
+    def has(self, key, kind=OBJ_PUT):
+        return key in self.index[kind]
+
+    def keys(self, kind=OBJ_PUT):
+        with self.lock:
+            return list(self.index[kind].keys())
+
+    def put_many(self, items, kind=OBJ_PUT):
+        """Appends dict of key -> value (None deletes) and syncs once"""
+        with self.lock:
+            for key, value in items.items():
+                self.append(kind if value is not None else kind | 1, key, value)
+            self.sync()
+
+    def put(self, key, value, kind=OBJ_PUT):
+        self.put_many({key: value}, kind)
+
+    def delete(self, key, kind=OBJ_PUT):
+        if self.has(key, kind):
+            self.put_many({key: None}, kind)
+
+    def append(self, kind, key, value):
+        """Appends a single record to the active segment, rolling it when full"""
+        kb = key.encode()
+        vb = b"" if value is None else value
+        vb = vb.encode() if isinstance(vb, str) else bytes(vb)
+        body = RECORD_HEADER.pack(0, kind, len(kb), len(vb))[4:] + kb + vb
+        record = struct.pack("<I", zlib.crc32(body)) + body
+        if self.sizes[self.active][0] and (
+            self.sizes[self.active][0] + len(record) > self.segment_size
+        ):
+            self.sync()
+            self.open_segment(self.active + 1)
+        offset = self.sizes[self.active][0]
+        self.active_file.write(record)
+        self.sizes[self.active][0] += len(record)
+        self.apply(
+            kind,
+            key,
+            self.active,
+            offset + len(record) - len(vb),
+            len(vb),
+            len(record),
+        )
+
+    def sync(self):
+        """Makes appended records durable"""
+        with self.lock:
+            self.active_file.flush()
+            if self.fsync:
+                os.fsync(self.active_file.fileno())
+        if self.threaded and self.compactable():
+            self.start()
+
+    # ------------------ COMPACTION ------------------ #
+
+    def compactable(self):
+        """Sealed segments where dead records passed compact_ratio"""
+        return [
+            seg
+            for seg, (total, dead) in sorted(self.sizes.items())
+            if seg != self.active and total and dead / total >= self.compact_ratio
+        ]
+
+    def compact(self):
+        """
+        Copies live records of compactable segments to the active segment,
+        then deletes them. Copies are synced before a segment is deleted so a
+        crash in between leaves duplicates, never losses. Tombstones are
+        carried over while an older segment could still hold their key
+        """
+        count = 0
+        for seg in self.compactable():
+            with self.lock:
+                if seg not in self.sizes:
+                    continue
+                oldest = min(self.sizes) == seg
+                mm = self.view(seg, self.sizes[seg][0])
+                pos = 0
+                while pos < self.sizes[seg][0]:
+                    crc, kind, klen, vlen = RECORD_HEADER.unpack_from(mm, pos)
+                    start = pos + RECORD_HEADER.size
+                    key = mm[start : start + klen].decode()
+                    value = mm[start + klen : start + klen + vlen]
+                    end = start + klen + vlen
+                    if kind & 1:
+                        if not oldest and key not in self.index[kind & ~1]:
+                            self.append(kind, key, None)
+                    elif self.index[kind].get(key, (None, None))[:2] == (
+                        seg,
+                        end - vlen,
+                    ):
+                        self.append(kind, key, value)
+                    pos = end
+                self.sync_quiet()
+                self.drop_segment(seg)
+                count += 1
+        self.compacted_count += count
+        return count
+
+    def sync_quiet(self):
+        """Sync without triggering another compaction"""
+        self.active_file.flush()
+        if self.fsync:
+            os.fsync(self.active_file.fileno())
+
+    # -------------------- WORKER -------------------- #
+
+    def start(self):
+        if self.worker is None or not self.worker.is_alive():
+            with self.lock:
+                if self.worker is not None and self.worker.is_alive():
+                    return
+                self.stopping.clear()
+                self.worker = threading.Thread(
+                    target=self.run, name="jaseci-log-compactor", daemon=True
+                )
+                self.worker.start()
+
+    def run(self):
+        while not self.stopping.is_set():
+            try:
+                if not self.compact():
+                    self.stopping.wait(self.compact_interval)
+            except Exception as e:
+                logger.error(f"Compaction of {self.path} failed due to {e}")
+                self.stopping.wait(self.compact_interval)
+
+    def close(self):
+        """Stops compaction and closes every segment"""
+        self.stopping.set()
+        if self.worker is not None:
+            self.worker.join()
+            self.worker = None
+        with self.lock:
+            if self.active_file is not None:
+                self.sync_quiet()
+                self.active_file.close()
+                self.active_file = None
+            for mm in self.maps.values():
+                close_map(mm)
+            self.maps = {}
+            if self.lock_file is not None:
+                self.lock_file.close()
+                self.lock_file = None
+
+
+def close_map(mm):
+    """Unmaps mm, unless views handed out by get still use it"""
+    if mm is None:
+        return
+    try:
+        mm.close()
+    except BufferError:
+        # unmapped when the last view of it is released
+        pass
+
+
+SEGMENT_LOGS = {}
+
+
+def segment_log(path, config):
+    """Process wide segment log of path, opened on first use"""
+    path = os.path.abspath(path)
+    if path not in SEGMENT_LOGS:
+        SEGMENT_LOGS[path] = SegmentLog(
+            path,
+            segment_size=config.get("log_segment_size", 64 * 1024 * 1024),
+            compact_ratio=config.get("log_compact_ratio", 0.5),
+            compact_interval=config.get("log_compact_interval", 30.0),
+            fsync=config.get("log_fsync", True),
+        )
+        atexit.register(SEGMENT_LOGS[path].close)
+    return SEGMENT_LOGS[path]
+
+
+def reset_segment_logs():
+    """
+    Forked children do not own their parent's logs, opening one again fails
+    while the parent holds it
+    """
+    SEGMENT_LOGS.clear()
+
+
+os.register_at_fork(after_in_child=reset_segment_logs)
@@ -151,13 +151,8 @@ def matching_fields(obj1, obj2):
     Return list of matching member attributes in objects
     (non-private fields only)
     """
-    matches = []
-    for a in dir(obj1):
-        if not a.startswith("_"):
-            for b in dir(obj2):
-                if a == b:
-                    matches.append(a)
-    return matches
+    obj2_attrs = set(dir(obj2))
+    return [a for a in dir(obj1) if not a.startswith("_") and a in obj2_attrs]
 
 
 obj_class_cache = {}
@@ -19,6 +19,7 @@ setup(
         "fastapi[all]>=0.75.0,<1.0.0",
         "requests",
         "redis",
+        "msgpack>=1.0.0,<2.0.0",
         "celery>=5,<6",
         "flake8",
         "pep8-naming",
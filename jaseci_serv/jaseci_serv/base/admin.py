@@ -53,6 +53,14 @@ class JaseciObjectAdmin(admin.ModelAdmin):
 admin.site.register(models.JaseciObject, JaseciObjectAdmin)
 
 
+class JaseciEdgeAdmin(admin.ModelAdmin):
+    list_display = ("jid", "name", "from_node_id", "to_node_id", "bidirected")
+    search_fields = ["jid", "name", "from_node_id", "to_node_id"]
+
+
+admin.site.register(models.JaseciEdge, JaseciEdgeAdmin)
+
+
 class GlobalVarsAdmin(admin.ModelAdmin):
     ordering = ["name"]
     list_display = ("name", "value")
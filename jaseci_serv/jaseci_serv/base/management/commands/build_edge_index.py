@@ -0,0 +1,33 @@
+from django.core.management.base import BaseCommand
+
+from jaseci.jsorc.jsorc import JsOrc
+from jaseci.utils.utils import logger
+from jaseci_serv.base.models import JaseciObject
+
+
+class Command(BaseCommand):
+    """
+    (Re)builds the JaseciEdge adjacency index from stored nodes and edges,
+    run once before turning on HOOK_CONFIG edge_index on existing data
+    """
+
+    def add_arguments(self, parser):
+        super(Command, self).add_arguments(parser)
+        parser.add_argument("--batch", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        batch = options.get("batch")
+        ids = [
+            i.urn
+            for i in JaseciObject.objects.filter(
+                j_type__in=["node", "graph", "edge"]
+            ).values_list("jid", flat=True)
+        ]
+        for i in range(0, len(ids), batch):
+            # fresh hook per batch keeps the session cache bounded
+            hook = JsOrc.hook()
+            objs = hook.get_obj_from_store_many(ids[i : i + batch])
+            hook.commit_edge_index(objs.values())
+            logger.info(f"Indexed edges of {min(i + batch, len(ids))}/{len(ids)}")
+
+        logger.info(self.style.SUCCESS("Edge index built!"))
@@ -0,0 +1,26 @@
+import json
+
+from django.core.management.base import BaseCommand
+
+from jaseci.jsorc.jsorc import JsOrc
+from jaseci.jsorc.warmup import warmup
+
+
+class Command(BaseCommand):
+    """
+    Preloads the global sentinel (and any given sentinels), their architypes
+    and actions and global configs into redis, and reports how long it took
+    """
+
+    def add_arguments(self, parser):
+        super(Command, self).add_arguments(parser)
+        parser.add_argument("--sentinel", action="append", default=None)
+        parser.add_argument("--glob", action="append", default=None)
+
+    def handle(self, *args, **options):
+        config = JsOrc.settings("WARMUP_CONFIG", {})
+        report = warmup(
+            sentinel_ids=options.get("sentinel") or config.get("sentinels"),
+            glob_names=options.get("glob") or config.get("globals"),
+        )
+        self.stdout.write(self.style.SUCCESS(json.dumps(report)))
@@ -244,9 +244,32 @@ class JaseciObject(models.Model):
     j_access = models.CharField(max_length=15, default="private")
     j_r_acc_ids = models.TextField(blank=True)
     j_rw_acc_ids = models.TextField(blank=True)
+    j_version = models.IntegerField(default=0)
     jsci_obj = models.TextField(blank=True)
 
 
+class JaseciEdge(models.Model):
+    """
+    Normalized adjacency of edges between nodes
+
+    Optional index (HOOK_CONFIG edge_index) kept in sync by the orm hook for
+    both stored and fast edges, so edges of a node can be queried without
+    loading and parsing node payloads.
+    """
+
+    jid = models.UUIDField(primary_key=True, editable=False)
+    from_node_id = models.UUIDField(null=True, blank=True)
+    to_node_id = models.UUIDField(null=True, blank=True)
+    name = models.CharField(max_length=255, blank=True)
+    bidirected = models.BooleanField(default=False)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["from_node_id", "name"]),
+            models.Index(fields=["to_node_id", "name"]),
+        ]
+
+
 class GlobalVars(models.Model):
     """Global configuration item"""
 
@@ -1,16 +1,31 @@
+import json
+from io import StringIO
+from unittest.mock import patch
+
 from django.contrib.auth import get_user_model
 
 from jaseci.utils.utils import TestCaseHelper
 from jaseci.utils.id_list import IdList
+from django.db import connection
+from django.db.utils import DatabaseError
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.core.management import call_command
+from celery.signals import worker_process_shutdown
 
 from jaseci.jsorc.jsorc import JsOrc
-from jaseci_serv.base.models import JaseciObject
+from jaseci_serv.base.models import JaseciEdge, JaseciObject, lookup_global_config
+from jaseci_serv.hook.orm import write_behind_rows
+from jaseci_serv.hook import write_behind
+from jaseci_serv.hook.write_behind import SAVE, WriteBehindQueue
 from jaseci.prim import node
 from jaseci.prim import edge
 from jaseci.prim.graph import Graph
 from jaseci.prim.sentinel import Sentinel
 import jaseci.tests.jac_test_code as jtc
+from jaseci.jac.ir.jac_code import IR_AST_CACHE, clear_ir_ast_cache
+from jaseci.utils.compress_handler import ZLIB_TEXT_PREFIX
+from jaseci.utils.msgpack_handler import MSGPACK_TEXT_PREFIX
 from jaseci.utils.test_core import skip_without_redis
 import uuid
 
@@ -133,6 +148,469 @@ class OrmPrivateTests(TestCaseHelper, TestCase):
         self.assertEqual(node2.id, new_node.jid)
         self.assertEqual(node1.id, new_jsci_node.parent().id)
 
+    def test_id_list_obj_list_loads_in_one_query(self):
+        """Test that expanding an id_list costs a single db round trip"""
+        user = self.user
+        mid = user.master.urn
+        hdgd = node.Node(m_id=mid, h=user._h, dimension=1)
+        for i in range(5):
+            node.Node(m_id=mid, h=user._h).make_member_of(hdgd)
+        user._h.commit()
+        user._h.clear_cache()
+        user.get_master()
+        hdgd = user._h.get_obj(mid, hdgd.jid)
+        with self.assertNumQueries(1):
+            members = hdgd.member_node_ids.obj_list()
+        self.assertEqual(len(members), 5)
+        self.assertEqual([i.jid for i in members], list(hdgd.member_node_ids))
+
+    def test_bulk_commit_inserts_and_updates(self):
+        """Test that commit writes dirty objects with a constant query count"""
+        user = self.user
+        nodes = [node.Node(m_id=0, h=user._h) for i in range(20)]
+        with CaptureQueriesContext(connection) as ctx:
+            user._h.commit()
+        self.assertLess(len(ctx.captured_queries), 10)
+        self.assertEqual(
+            JaseciObject.objects.filter(jid__in=[i.id for i in nodes]).count(), 20
+        )
+
+        for i in nodes[:10]:
+            i.name = "updated"
+            i.save()
+        nodes.append(node.Node(m_id=0, h=user._h, name="updated"))
+        with CaptureQueriesContext(connection) as ctx:
+            user._h.commit()
+        self.assertLess(len(ctx.captured_queries), 10)
+        self.assertEqual(JaseciObject.objects.filter(name="updated").count(), 11)
+
+    def test_commit_skips_unchanged_objects(self):
+        """Test that objects saved without changes are not rewritten"""
+        user = self.user
+        nodes = [node.Node(m_id=0, h=user._h) for i in range(5)]
+        user._h.commit()
+        user._h.clear_cache()
+        nodes = [user._h.get_obj(0, i.jid) for i in nodes]
+        for i in nodes:
+            i.save()
+        nodes[0].name = "changed"
+        nodes[0].save()
+        with CaptureQueriesContext(connection) as ctx:
+            user._h.commit()
+        self.assertEqual(user._h.db_skip_count, 4)
+        self.assertEqual(len(ctx.captured_queries), 2)
+        self.assertEqual(JaseciObject.objects.get(jid=nodes[0].id).name, "changed")
+
+    def test_bulk_commit_globs(self):
+        """Test that globals are bulk written and updated"""
+        h = self.user._h
+        h.save_glob("BULK_A", "1")
+        h.save_glob("BULK_B", "2")
+        h.commit()
+        h.save_glob("BULK_A", "3")
+        h.save_glob("BULK_C", "4")
+        h.commit()
+        self.assertEqual(lookup_global_config("BULK_A"), "3")
+        self.assertEqual(lookup_global_config("BULK_B"), "2")
+        self.assertEqual(lookup_global_config("BULK_C"), "4")
+
+    def test_commit_without_bulk_falls_back_to_per_object(self):
+        """Test per object commits still work when bulk commit is disabled"""
+        h = self.user._h
+        h.config = dict(h.config, bulk_commit=False)
+        nodes = [node.Node(m_id=0, h=h) for i in range(3)]
+        h.commit()
+        self.assertEqual(
+            JaseciObject.objects.filter(jid__in=[i.id for i in nodes]).count(), 3
+        )
+
+    def test_msgpack_codec_round_trip(self):
+        """Test msgpack payloads are stored and read back by any codec"""
+        h = self.user._h
+        h.config = dict(h.config, codec="msgpack")
+        hdgd = node.Node(m_id=0, h=h, dimension=1)
+        member = node.Node(m_id=0, h=h)
+        member.make_member_of(hdgd)
+        hdgd.context = {"vec": [0.25] * 16, "doc": "text"}
+        hdgd.save()
+        h.commit()
+        row = JaseciObject.objects.get(jid=hdgd.id)
+        self.assertTrue(row.jsci_obj.startswith(MSGPACK_TEXT_PREFIX))
+
+        h.clear_cache()
+        loaded = h.get_obj(0, hdgd.jid)
+        self.assertEqual(loaded.context, hdgd.context)
+        self.assertEqual(list(loaded.member_node_ids), [member.jid])
+        self.assertIsInstance(loaded.member_node_ids, IdList)
+
+    def test_large_payloads_compressed(self):
+        """Test large payloads are compressed in the db and read back"""
+        h = self.user._h
+        h.config = dict(h.config, compress_threshold=1024)
+        small = node.Node(m_id=0, h=h)
+        big = node.Node(m_id=0, h=h)
+        big.context = {"doc": "lorem ipsum " * 500}
+        h.commit()
+        self.assertFalse(
+            JaseciObject.objects.get(jid=small.id).jsci_obj.startswith(ZLIB_TEXT_PREFIX)
+        )
+        row = JaseciObject.objects.get(jid=big.id)
+        self.assertTrue(row.jsci_obj.startswith(ZLIB_TEXT_PREFIX))
+        self.assertGreater(h.db_bytes_saved, 0)
+        self.assertLess(len(row.jsci_obj), len(big.jsci_payload()))
+
+        h.clear_cache()
+        self.assertEqual(h.get_obj(0, big.jid).context, big.context)
+
+    def test_missing_ids_hit_db_once(self):
+        """Test repeated lookups of a missing id stop hitting the db"""
+        h = self.user._h
+        missing = node.Node(m_id=0, h=h, auto_save=False)
+        with self.assertNumQueries(1):
+            self.assertIsNone(h.get_obj(0, missing.jid))
+            self.assertIsNone(h.get_obj(0, missing.jid))
+            self.assertFalse(h.has_obj(missing.jid))
+            self.assertEqual(h.get_obj_many(0, [missing.jid]), [None])
+
+        gone = node.Node(m_id=0, h=h)
+        h.commit()
+        gone.destroy()
+        h.commit()
+        with self.assertNumQueries(0):
+            self.assertFalse(h.has_obj(gone.jid))
+            self.assertIsNone(h.get_obj(0, gone.jid))
+
+    def test_has_obj_uses_exists_query(self):
+        """Test existence checks do not count rows"""
+        h = self.user._h
+        nd = node.Node(m_id=0, h=h)
+        h.commit()
+        h.clear_cache()
+        with CaptureQueriesContext(connection) as ctx:
+            self.assertTrue(h.has_obj(nd.jid))
+        self.assertNotIn("COUNT", ctx.captured_queries[0]["sql"])
+
+    def test_prefetch_neighbors_one_query_per_level(self):
+        """Test loading a node prefetches its neighborhood level by level"""
+        user = self.user
+        h = user._h
+        mid = user.master.urn
+        root = node.Node(m_id=mid, h=h)
+        level1 = [node.Node(m_id=mid, h=h) for i in range(3)]
+        level2 = [node.Node(m_id=mid, h=h) for i in range(3)]
+        for i in range(3):
+            root.attach_outbound(level1[i])
+            level1[i].attach_outbound(level2[i])
+        h.commit()
+        h.clear_cache()
+        user.get_master()
+        h.config = dict(h.config, prefetch_depth=2)
+        with self.assertNumQueries(3):
+            root = h.get_obj(mid, root.jid)
+        with self.assertNumQueries(0):
+            nodes = [j for i in root.outbound_nodes() for j in i.outbound_nodes()]
+        self.assertEqual({i.jid for i in nodes}, {i.jid for i in level2})
+
+        h.clear_cache()
+        user.get_master()
+        h.config = dict(h.config, prefetch_depth=1, prefetch_fanout=2)
+        with self.assertNumQueries(2):
+            root = h.get_obj(mid, root.jid)
+        self.assertEqual(sum(i.jid in h.mem for i in level1), 2)
+
+    def slow_edge(self, h, mid=0):
+        """Edge with a context too large to be stored as a fast edge"""
+        e = edge.Edge(m_id=mid, h=h, kind="edge", name="slow", auto_save=False)
+        e.context = {str(i): i for i in range(200)}
+        e.save()
+        return e
+
+    def test_edge_index_synced_on_commit(self):
+        """Test JaseciEdge rows follow fast and stored edges"""
+        h = self.user._h
+        h.config = dict(h.config, edge_index=True)
+        a, b, c = [node.Node(m_id=0, h=h) for i in range(3)]
+        fast = a.attach_outbound(b)[0]
+        slow = a.attach_outbound(c, [self.slow_edge(h)])[0]
+        h.commit()
+        rows = {i.jid.urn: i for i in JaseciEdge.objects.all()}
+        self.assertEqual(set(rows.keys()), {fast.jid, slow.jid})
+        self.assertEqual(rows[fast.jid].from_node_id, a.id)
+        self.assertEqual(rows[fast.jid].to_node_id, b.id)
+        self.assertEqual(rows[slow.jid].name, "slow")
+        self.assertEqual(
+            set(h.get_edge_ids_from_store(a.jid, "out")), {fast.jid, slow.jid}
+        )
+        self.assertEqual(h.get_edge_ids_from_store(a.jid, "out", "slow"), [slow.jid])
+        self.assertEqual(h.get_edge_ids_from_store(b.jid, "in"), [fast.jid])
+
+        a.detach_outbound(b)
+        h.commit()
+        self.assertEqual(
+            [i.urn for i in JaseciEdge.objects.values_list("jid", flat=True)],
+            [slow.jid],
+        )
+        c.destroy()
+        h.commit()
+        self.assertEqual(JaseciEdge.objects.count(), 0)
+
+    def test_edge_index_writes_only_changed_rows(self):
+        """Test unchanged nodes and unchanged adjacency rows are not rewritten"""
+        h = self.user._h
+        h.config = dict(h.config, edge_index=True)
+        hub = node.Node(m_id=0, h=h)
+        others = [node.Node(m_id=0, h=h) for i in range(3)]
+        hub.attach_outbound(others[0])
+        hub.attach_outbound(others[1], [self.slow_edge(h)])
+        hub.attach_bidirected(others[2])
+        h.commit()
+        self.assertEqual(JaseciEdge.objects.count(), 3)
+
+        def index_writes(queries):
+            return [
+                i["sql"]
+                for i in queries
+                if "jaseciedge" in i["sql"].lower()
+                and not i["sql"].lstrip().upper().startswith("SELECT")
+            ]
+
+        for i in [hub] + others:
+            i.save()
+        with CaptureQueriesContext(connection) as ctx:
+            h.commit()
+        self.assertFalse(any("jaseciedge" in i["sql"].lower() for i in ctx))
+
+        hub.context["touched"] = 1
+        for i in [hub] + others:
+            i.save()
+        with CaptureQueriesContext(connection) as ctx:
+            h.commit()
+        self.assertEqual(index_writes(ctx), [])
+
+        hub.detach_outbound(others[0])
+        with CaptureQueriesContext(connection) as ctx:
+            h.commit()
+        self.assertEqual(len(index_writes(ctx)), 1)
+        self.assertEqual(JaseciEdge.objects.count(), 2)
+
+    def test_edge_index_written_behind_objects(self):
+        """Test the index is queued with the objects it was made from"""
+        h = self.user._h
+        h.config = dict(h.config, edge_index=True)
+        h.writer = WriteBehindQueue(write_behind_rows, batch_size=100, threaded=False)
+        a, b = node.Node(m_id=0, h=h), node.Node(m_id=0, h=h)
+        fast = a.attach_outbound(b)[0]
+        h.commit()
+        self.assertEqual(JaseciEdge.objects.count(), 0)
+        h.writer.flush()
+        self.assertTrue(JaseciObject.objects.filter(jid=a.id).exists())
+        self.assertEqual(
+            [i.urn for i in JaseciEdge.objects.values_list("jid", flat=True)],
+            [fast.jid],
+        )
+
+    def test_outbound_edges_loads_only_indexed_edges(self):
+        """Test edge queries on an uncached node use the adjacency index"""
+        user = self.user
+        h = user._h
+        mid = user.master.urn
+        h.config = dict(h.config, edge_index=True)
+        hub = node.Node(m_id=mid, h=h)
+        outs = [
+            hub.attach_outbound(node.Node(m_id=mid, h=h), [self.slow_edge(h, mid)])[0]
+            for i in range(3)
+        ]
+        ins = [
+            hub.attach_inbound(node.Node(m_id=mid, h=h), [self.slow_edge(h, mid)])[0]
+            for i in range(3)
+        ]
+        h.commit()
+        h.clear_cache()
+        user.get_master()
+        h.config = dict(h.config, edge_index=True)
+        hub = h.get_obj(mid, hub.jid)
+        with self.assertNumQueries(2):
+            found = hub.outbound_edges()
+        self.assertEqual([i.jid for i in found], [i.jid for i in outs])
+        self.assertFalse(any(h.has_id_in_mem_cache(i.jid) for i in ins))
+        self.assertEqual([i.jid for i in hub.inbound_edges()], [i.jid for i in ins])
+
+    def test_build_edge_index_command(self):
+        """Test the index can be built for data stored before enabling it"""
+        h = self.user._h
+        a, b, c = [node.Node(m_id=0, h=h) for i in range(3)]
+        a.attach_outbound(b)
+        a.attach_outbound(c, [self.slow_edge(h)])
+        h.commit()
+        self.assertEqual(JaseciEdge.objects.count(), 0)
+        call_command("build_edge_index")
+        self.assertEqual(JaseciEdge.objects.count(), 2)
+
+    def test_warmup_command(self):
+        """Test warmup loads the global sentinel and builds its ASTs"""
+        h = self.user._h
+        sent = Sentinel(m_id=0, h=h)
+        sent.register_code(jtc.prog1)
+        h.save_glob("GLOB_SENTINEL", sent.jid)
+        h.commit()
+        clear_ir_ast_cache()
+        out = StringIO()
+        call_command("warmup", stdout=out)
+        report = json.loads(out.getvalue())
+        self.assertEqual(report["sentinels"], 1)
+        self.assertEqual(report["architypes"], len(sent.arch_ids))
+        self.assertGreater(report["actions"], 0)
+        self.assertIn(sent.code_sig, IR_AST_CACHE)
+        arch = sent.arch_ids.get_obj_by_name("life", kind="node")
+        self.assertIn(arch.code_sig, IR_AST_CACHE)
+
+    def test_write_behind_coalesces_and_flushes(self):
+        """Test commits are queued, coalesced and readable before the flush"""
+        h = self.user._h
+        h.writer = WriteBehindQueue(write_behind_rows, batch_size=100, threaded=False)
+        nd = node.Node(m_id=0, h=h)
+        nd.name = "first"
+        gone = node.Node(m_id=0, h=h)
+        h.commit()
+        nd.name = "second"
+        nd.save()
+        h.commit()
+        gone.destroy()
+        self.assertEqual(h.writer.coalesced_count, 2)
+        self.assertFalse(JaseciObject.objects.filter(jid=nd.id).exists())
+
+        h.clear_cache()
+        self.assertEqual(h.get_obj(0, nd.jid).name, "second")
+        self.assertFalse(h.has_obj(gone.jid))
+
+        h.writer.flush()
+        self.assertEqual(JaseciObject.objects.get(jid=nd.id).name, "second")
+        self.assertFalse(JaseciObject.objects.filter(jid=gone.id).exists())
+        self.assertIsNone(h.writer.lookup(nd.id))
+
+    def test_write_behind_disabled_with_occ(self):
+        """Test occ commits are not written behind, their versions go unchecked"""
+        config = dict(JsOrc.settings("HOOK_CONFIG"), occ=True, write_behind=True)
+        with patch.object(JsOrc._settings, "HOOK_CONFIG", config):
+            h = JsOrc.hook()
+        self.assertIsNone(h.writer)
+        nd = node.Node(m_id=0, h=h)
+        h.commit()
+        self.assertEqual(JaseciObject.objects.get(jid=nd.id).j_version, 1)
+
+    def test_write_behind_backpressure_and_stop(self):
+        """Test a full queue blocks producers and stop flushes the rest"""
+        batches = []
+        writer = WriteBehindQueue(
+            lambda b: batches.append(list(b.keys())),
+            max_pending=2,
+            batch_size=100,
+            interval=10,
+            put_timeout=5,
+        )
+        writer.put("a", SAVE)
+        writer.put("a", SAVE)
+        writer.put("b", SAVE)
+        writer.put("c", SAVE)
+        self.assertEqual(writer.coalesced_count, 1)
+        self.assertEqual(writer.blocked_count, 1)
+        writer.stop()
+        self.assertEqual(batches, [["a", "b"], ["c"]])
+        self.assertIsNone(writer.worker)
+
+    def test_write_behind_marks_clean_once_written(self):
+        """Test objects stay dirty for the db until their rows are written"""
+        h = self.user._h
+        h.writer = WriteBehindQueue(write_behind_rows, batch_size=100, threaded=False)
+        nd = node.Node(m_id=0, h=h)
+        h.commit()
+        payload = h.dump_obj(nd)
+        self.assertTrue(h.is_obj_dirty(nd, "db", payload))
+        h.writer.flush()
+        self.assertFalse(h.is_obj_dirty(nd, "db", payload))
+
+    def test_write_behind_requeues_failed_rows(self):
+        """Test failed rows are written again and only then reported written"""
+        batches = []
+        written = []
+
+        def write(batch):
+            batches.append(list(batch.keys()))
+            if len(batches) == 1:
+                return ["b"]
+            if len(batches) == 2:
+                raise DatabaseError("down")
+
+        writer = WriteBehindQueue(write, batch_size=100, threaded=False)
+        writer.put("a", SAVE, on_written=lambda: written.append("a"))
+        writer.put("b", SAVE, on_written=lambda: written.append("b"))
+        writer.flush()
+        self.assertEqual(batches, [["a", "b"], ["b"]])
+        self.assertEqual(written, ["a"])
+        self.assertEqual(writer.lookup("b"), (SAVE, None))
+        writer.flush()
+        self.assertEqual(written, ["a", "b"])
+        self.assertEqual(writer.failed_count, 2)
+
+    def test_write_behind_flushed_on_worker_process_shutdown(self):
+        """Test celery worker shutdown flushes the process wide queue"""
+        batches = []
+        writer = WriteBehindQueue(
+            lambda b: batches.append(list(b.keys())), batch_size=100, interval=10
+        )
+        old, write_behind.WRITE_BEHIND_QUEUE = write_behind.WRITE_BEHIND_QUEUE, writer
+        try:
+            writer.put("a", SAVE)
+            worker_process_shutdown.send(sender=None, pid=0, exitcode=0)
+            self.assertEqual(batches, [["a"]])
+            write_behind.reset_write_behind_queue()
+            self.assertIsNone(write_behind.WRITE_BEHIND_QUEUE)
+        finally:
+            write_behind.WRITE_BEHIND_QUEUE = old
+
+    def occ_hooks(self, strategy):
+        """Two hooks holding the same committed node, as two workers would"""
+        user = self.user
+        mid = user.master.urn
+        h1 = user._h
+        h1.config = dict(h1.config, occ=True)
+        nd = node.Node(m_id=mid, h=h1)
+        nd.context = {"a": 1, "b": 1}
+        nd.save()
+        h1.commit()
+        self.assertEqual(nd.j_version, 1)
+        h2 = JsOrc.hook()
+        h2.config = dict(h2.config, occ=True, conflict_strategy=strategy)
+        return h1, h2, nd, h2.get_obj(mid, nd.jid)
+
+    def test_occ_concurrent_commits_merge(self):
+        """Test the losing commit merges its changes into the stored copy"""
+        h1, h2, n1, n2 = self.occ_hooks("merge")
+        n1.context["a"] = 2
+        n1.save()
+        h1.commit()
+        n2.context["b"] = 3
+        n2.save()
+        h2.commit()
+        self.assertEqual(h1.db_conflict_count, 0)
+        self.assertEqual(h2.db_conflict_count, 1)
+        self.assertEqual(n2.context, {"a": 2, "b": 3})
+        self.assertEqual(JaseciObject.objects.get(jid=n1.id).j_version, 3)
+        stored = JsOrc.hook().get_obj(self.user.master.urn, n1.jid)
+        self.assertEqual(stored.context, {"a": 2, "b": 3})
+
+    def test_occ_concurrent_commits_skip(self):
+        """Test the losing commit can be dropped in favor of the stored copy"""
+        h1, h2, n1, n2 = self.occ_hooks("skip")
+        n1.context["a"] = 2
+        n1.save()
+        h1.commit()
+        n2.context["b"] = 3
+        n2.save()
+        h2.commit()
+        self.assertEqual(n2.context, {"a": 2, "b": 1})
+        self.assertEqual(JaseciObject.objects.get(jid=n1.id).j_version, 2)
+
     @skip_without_redis
     def test_redis_connection(self):
         """Test redis connection"""
@@ -4,13 +4,19 @@ core engine.
 
 FIX: Serious permissions work needed
 """
+import functools
 import uuid
 
 from django.core.exceptions import ObjectDoesNotExist
-from django.db.utils import OperationalError
+from django.db import transaction
+from django.db.models import Q
+from django.db.utils import DatabaseError, OperationalError
 
 import jaseci as core_mod
+from jaseci.jsorc.memory import MemoryHook
 from jaseci.jsorc.redis import RedisHook
+from jaseci.prim.edge import Edge
+from jaseci.prim.node import BI, FROM, Node
 from jaseci.utils import utils
 from jaseci.utils.id_list import IdList
 from jaseci.utils.utils import logger
@@ -18,6 +24,12 @@ from datetime import datetime
 import json
 
 from jaseci.jsorc.jsorc import JsOrc
+from jaseci_serv.hook.write_behind import (
+    DELETE,
+    EDGE_INDEX,
+    SAVE,
+    write_behind_queue,
+)
 
 
 @JsOrc.repository(name="hook", priority=2)
@@ -27,12 +39,23 @@ class OrmHook(RedisHook):
     """
 
     def __init__(self):
-        from jaseci_serv.base.models import GlobalVars, JaseciObject
+        from jaseci_serv.base.models import GlobalVars, JaseciEdge, JaseciObject
 
         self.objects = JaseciObject.objects
+        self.edges = JaseciEdge.objects
         self.globs = GlobalVars.objects
         self.db_touch_count = 0
+        self.db_skip_count = 0
+        self.db_bytes_saved = 0
+        self.db_conflict_count = 0
         super().__init__()
+        self.writer = None
+        if self.config.get("write_behind", False):
+            if self.config.get("occ", False):
+                # queued rows are written blind, versions are never checked
+                logger.warning("Write-behind is not supported with occ, disabled!")
+            else:
+                self.writer = write_behind_queue(write_behind_rows, self.config)
 
     ####################################################
     #                DATASOURCE METHOD                 #
@@ -43,48 +66,152 @@ class OrmHook(RedisHook):
     def get_obj_from_store(self, item_id):
         loaded_obj = super().get_obj_from_store(item_id)
         if loaded_obj is None:
+            if self.is_obj_missing(item_id, "db"):
+                return None
+            pending = self.pending_write(item_id)
+            if pending is not None:
+                if pending[0] == DELETE:
+                    return None
+                obj = self.load_obj_from_model(pending[1])
+                self.prefetch_neighbors([obj])
+                return obj
             try:
                 loaded_obj = self.objects.get(jid=item_id)
                 self.db_touch_count += 1
             except ObjectDoesNotExist:
-                logger.error(
-                    str(f"Object {item_id} does not exist in Django ORM!"),
-                    exc_info=True,
-                )
+                logger.error(str(f"Object {item_id} does not exist in Django ORM!"))
+                self.mark_obj_missing(item_id, "db")
                 return None
             except OperationalError as e:
                 logger.error(f"Operation failed due to {e}")
                 return None
 
-            class_for_type = self.find_class_and_import(loaded_obj.j_type, core_mod)
-            kwargs = {"h": self, "m_id": loaded_obj.j_master.urn, "auto_save": False}
-            ret_obj = class_for_type(**kwargs)
-            map_assignment_of_matching_fields(ret_obj, loaded_obj)
-
-            # Unwind jsci_payload for fields beyond element object
-            ret_obj.json_load(loaded_obj.jsci_obj)
-            self.commit_obj_to_cache(ret_obj, all_caches=True)
-            return ret_obj
+            obj = self.load_obj_from_model(loaded_obj)
+            self.prefetch_neighbors([obj])
+            return obj
         return loaded_obj
 
+    def get_obj_from_store_many(self, item_ids):
+        """
+        Get dict of items from externally hooked general store by ids
+        using a single query for everything not found in the caches
+        """
+        objs = super().get_obj_from_store_many(item_ids)
+        missing = {}
+        for i in item_ids:
+            if i not in objs and not self.is_obj_missing(i, "db"):
+                try:
+                    missing[uuid.UUID(i).urn] = i
+                except (TypeError, ValueError):
+                    logger.error(f"Object {i} is not a valid id!")
+
+        if self.writer is not None:
+            for k, i in list(missing.items()):
+                pending = self.pending_write(i)
+                if pending is not None:
+                    del missing[k]
+                    if pending[0] == SAVE:
+                        objs[i] = self.load_obj_from_model(pending[1])
+
+        if missing:
+            try:
+                loaded_objs = list(self.objects.filter(jid__in=list(missing.keys())))
+                self.db_touch_count += len(loaded_objs)
+            except OperationalError as e:
+                logger.error(f"Operation failed due to {e}")
+                return objs
+
+            new_objs = []
+            for loaded_obj in loaded_objs:
+                item_id = missing.pop(loaded_obj.jid.urn)
+                # decoding an earlier item may have already pulled this one in
+                obj = MemoryHook.get_obj_from_store(self, item_id)
+                if obj is None:
+                    obj = self.load_obj_from_model(loaded_obj, all_caches=False)
+                    new_objs.append(obj)
+                objs[item_id] = obj
+            self.commit_obj_list_to_cache(new_objs, all_caches=True)
+            self.prefetch_neighbors(new_objs)
+
+            for item_id in missing.values():
+                logger.error(f"Object {item_id} does not exist in Django ORM!")
+                self.mark_obj_missing(item_id, "db")
+
+        return objs
+
     def has_obj_in_store(self, item_id):
         """
         Checks for object existance in store
         """
-        return super().has_obj_in_store(item_id) or (
-            self.objects.filter(jid=item_id).count()
-        )
+        if super().has_obj_in_store(item_id):
+            return True
+        if self.is_obj_missing(item_id, "db"):
+            return False
+        pending = self.pending_write(item_id)
+        if pending is not None:
+            return pending[0] == SAVE
+        if self.objects.filter(jid=item_id).exists():
+            return True
+        self.mark_obj_missing(item_id, "db")
+        return False
+
+    def has_backing_store(self):
+        return True
+
+    def pending_write(self, item_id):
+        """(op, row) queued for item_id in the write-behind queue, if any"""
+        if self.writer is None:
+            return None
+        try:
+            return self.writer.lookup(uuid.UUID(item_id))
+        except (TypeError, ValueError):
+            return None
 
-    def destroy_obj_from_store(self, item):
-        super().destroy_obj_from_store(item)
+    def get_edge_ids_from_store(self, node_id, direction, name=None):
+        """
+        Ids of edges of node in direction (out, in or bi) optionally named
+        name, from the JaseciEdge adjacency index
+        """
+        if not self.config.get("edge_index", False):
+            return None
+        if direction == "out":
+            query = Q(from_node_id=node_id, bidirected=False)
+        elif direction == "in":
+            query = Q(to_node_id=node_id, bidirected=False)
+        else:
+            query = (Q(from_node_id=node_id) | Q(to_node_id=node_id)) & Q(
+                bidirected=True
+            )
+        if name is not None:
+            query &= Q(name=name)
         try:
-            self.objects.get(jid=item.id).delete()
-        except ObjectDoesNotExist:
-            # NOTE: Should look at this at some point
-            # logger.error("Object does not exists so delete aborted!")
-            pass
+            return [
+                i.urn for i in self.edges.filter(query).values_list("jid", flat=True)
+            ]
         except OperationalError as e:
             logger.error(f"Operation failed due to {e}")
+            return None
+
+    def destroy_obj_from_store(self, item):
+        super().destroy_obj_from_store(item)
+        if self.writer is not None:
+            self.writer.put(item.id, DELETE)
+        else:
+            try:
+                self.objects.get(jid=item.id).delete()
+            except ObjectDoesNotExist:
+                # NOTE: Should look at this at some point
+                # logger.error("Object does not exists so delete aborted!")
+                pass
+            except OperationalError as e:
+                logger.error(f"Operation failed due to {e}")
+        if self.config.get("edge_index", False):
+            try:
+                self.edges.filter(
+                    Q(jid=item.id) | Q(from_node_id=item.id) | Q(to_node_id=item.id)
+                ).delete()
+            except OperationalError as e:
+                logger.error(f"Operation failed due to {e}")
 
     # --------------------- GLOB --------------------- #
 
@@ -148,16 +275,60 @@ class OrmHook(RedisHook):
         except OperationalError as e:
             logger.error(f"Operation failed due to {e}")
 
+    ####################################################
+    #                      LOADER                      #
+    ####################################################
+
+    def load_obj_from_model(self, loaded_obj, all_caches=True):
+        """Build object from django model and add it to caches"""
+        ret_obj = self.build_obj_from_model(loaded_obj)
+        payload = self.dump_obj(ret_obj)
+        self.mark_obj_clean(ret_obj, "db", payload)
+        if self.config.get("occ", False):
+            self.mark_obj_version(ret_obj, "db", ret_obj.j_version, payload)
+            self.mark_obj_version(ret_obj, "red", ret_obj.j_version, payload)
+        self.commit_obj_to_cache(ret_obj, all_caches=all_caches)
+        return ret_obj
+
+    def build_obj_from_model(self, loaded_obj):
+        """Build object from django model without caching it"""
+        class_for_type = self.find_class_and_import(loaded_obj.j_type, core_mod)
+        m_id = loaded_obj.j_master
+        # rows waiting in the write-behind queue still hold urn strings
+        m_id = m_id.urn if isinstance(m_id, uuid.UUID) else m_id
+        kwargs = {"h": self, "m_id": m_id, "auto_save": False}
+        ret_obj = class_for_type(**kwargs)
+        map_assignment_of_matching_fields(ret_obj, loaded_obj)
+
+        # Unwind jsci_payload for fields beyond element object
+        ret_obj.json_load(loaded_obj.jsci_obj)
+        return ret_obj
+
     ####################################################
     #                    COMMITTER                     #
     ####################################################
 
-    def commit_obj(self, item):
+    def obj_to_model(self, item, item_from_db=None):
+        """Fills (or creates) the django model row of item"""
+        if item_from_db is None:
+            item_from_db = self.objects.model(jid=item.id)
+        map_assignment_of_matching_fields(item_from_db, item)
+        item_from_db.jsci_obj = self.compress_payload(
+            item.jsci_payload(self.config.get("codec", "json")), "db"
+        )
+        return item_from_db
+
+    def commit_obj(self, item, payload=None):
+        if self.config.get("occ", False):
+            self.commit_obj_dict_versioned(
+                {item: payload if payload is not None else self.dump_obj(item)}
+            )
+            return
         try:
             item_from_db, created = self.objects.get_or_create(jid=item.id)
-            map_assignment_of_matching_fields(item_from_db, item)
-            item_from_db.jsci_obj = item.jsci_payload()
-            item_from_db.save()
+            self.obj_to_model(item, item_from_db).save()
+            if payload is not None:
+                self.mark_obj_clean(item, "db", payload)
         except OperationalError as e:
             logger.error(f"Operation failed due to {e}")
 
@@ -170,19 +341,335 @@ class OrmHook(RedisHook):
         except OperationalError as e:
             logger.error(f"Operation failed due to {e}")
 
+    def commit_obj_list(self, items):
+        """
+        Write through list of objects using bulk inserts and updates in a
+        single transaction, falls back to per object commits on failure.
+        Returns the objects written (or queued to be), unchanged ones are
+        skipped
+        """
+        payloads = {}
+        for i in items:
+            payload = self.dump_obj(i)
+            if self.is_obj_dirty(i, "db", payload):
+                payloads[i.jid] = payload
+            else:
+                self.db_skip_count += 1
+        logger.debug(
+            f"Committing {len(payloads)} objects to db, "
+            f"skipped {len(items) - len(payloads)} unchanged"
+        )
+        items = [i for i in items if i.jid in payloads]
+
+        if self.writer is not None:
+            # rows are built here so later changes to items are not written
+            for i in items:
+                self.writer.put(
+                    i.id,
+                    SAVE,
+                    self.obj_to_model(i),
+                    on_written=functools.partial(
+                        self.mark_obj_clean, i, "db", payloads[i.jid]
+                    ),
+                )
+            return items
+
+        if self.config.get("occ", False):
+            self.commit_obj_dict_versioned({i: payloads[i.jid] for i in items})
+            return items
+
+        if not self.config.get("bulk_commit", True) or len(items) < 2:
+            for i in items:
+                self.commit_obj(i, payloads[i.jid])
+            return [i for i in items if not self.is_obj_dirty(i, "db", payloads[i.jid])]
+
+        batch_size = self.config.get("bulk_batch_size", 1000)
+        fields = [
+            f.name
+            for f in self.objects.model._meta.concrete_fields
+            if not f.primary_key
+        ]
+        try:
+            with transaction.atomic():
+                existing = set()
+                for i in range(0, len(items), batch_size):
+                    existing.update(
+                        self.objects.filter(
+                            jid__in=[j.id for j in items[i : i + batch_size]]
+                        ).values_list("jid", flat=True)
+                    )
+                creates = []
+                updates = []
+                for i in items:
+                    item_from_db = self.obj_to_model(i)
+                    if i.id in existing:
+                        updates.append(item_from_db)
+                    else:
+                        creates.append(item_from_db)
+                self.objects.bulk_create(creates, batch_size=batch_size)
+                self.objects.bulk_update(updates, fields, batch_size=batch_size)
+            for i in items:
+                self.mark_obj_clean(i, "db", payloads[i.jid])
+        except DatabaseError as e:
+            logger.error(f"Bulk commit failed due to {e}, committing one by one")
+            for i in items:
+                self.commit_obj(i, payloads[i.jid])
+        return [i for i in items if not self.is_obj_dirty(i, "db", payloads[i.jid])]
+
+    def commit_obj_dict_versioned(self, dirty):
+        """
+        Writes dict of item -> payload to the db when occ is on. Rows are
+        locked and their j_version checked against the one each item was
+        read at before the bulk write, items losing against a concurrent
+        commit are resolved (see resolve_obj_conflict) and written again
+        """
+        batch_size = self.config.get("bulk_batch_size", 1000)
+        fields = [
+            f.name
+            for f in self.objects.model._meta.concrete_fields
+            if not f.primary_key
+        ]
+        for attempt in range(self.config.get("occ_retries", 3) + 1):
+            items = list(dirty.keys())
+            conflicts = {}
+            try:
+                with transaction.atomic():
+                    stored = {}
+                    for i in range(0, len(items), batch_size):
+                        stored.update(
+                            self.objects.select_for_update()
+                            .filter(jid__in=[j.id for j in items[i : i + batch_size]])
+                            .order_by("jid")
+                            .values_list("jid", "j_version")
+                        )
+                    creates = []
+                    updates = []
+                    for i in items:
+                        expected = getattr(i, "_db_version", None)
+                        if i.id in stored and stored[i.id] != expected:
+                            conflicts[i.jid] = i
+                            continue
+                        i.j_version = max(i.j_version, (expected or 0) + 1)
+                        if i.id in stored:
+                            updates.append(self.obj_to_model(i))
+                        else:
+                            creates.append(self.obj_to_model(i))
+                    self.objects.bulk_create(creates, batch_size=batch_size)
+                    self.objects.bulk_update(updates, fields, batch_size=batch_size)
+            except DatabaseError as e:
+                logger.error(f"Versioned commit failed due to {e}")
+                return
+            for i, payload in dirty.items():
+                if i.jid not in conflicts:
+                    self.mark_obj_clean(i, "db", payload)
+                    self.mark_obj_version(i, "db", i.j_version, payload)
+            if not conflicts:
+                return
+            loaded = {
+                i.jid.urn: self.build_obj_from_model(i)
+                for i in self.objects.filter(jid__in=list(conflicts.keys()))
+            }
+            dirty = {}
+            for jid, item in conflicts.items():
+                if self.resolve_obj_conflict(item, "db", loaded.get(jid)):
+                    dirty[item] = self.dump_obj(item)
+            if not dirty:
+                return
+        logger.error(f"Gave up writing {len(dirty)} objects to db on conflicts")
+
+    def commit_glob_dict(self, globs):
+        """
+        Write through dict of global configs using bulk inserts and updates in
+        a single transaction, falls back to per global commits on failure
+        """
+        if not self.config.get("bulk_commit", True) or len(globs) < 2:
+            for k, v in globs.items():
+                self.commit_glob(k, v)
+            return
+
+        for k, v in globs.items():
+            self.commit_glob_to_cache(k, v)
+        try:
+            with transaction.atomic():
+                existing = {g.name: g for g in self.globs.filter(name__in=globs.keys())}
+                creates = []
+                for k, v in globs.items():
+                    if k in existing:
+                        existing[k].value = v
+                    else:
+                        creates.append(self.globs.model(name=k, value=v))
+                self.globs.bulk_create(creates)
+                self.globs.bulk_update(existing.values(), ["value"])
+        except DatabaseError as e:
+            logger.error(f"Bulk commit failed due to {e}, committing one by one")
+            for k, v in globs.items():
+                self.commit_glob(k, v)
+
+    def commit_edge_index(self, items):
+        """
+        Syncs JaseciEdge rows with the edges of committed nodes (fast and
+        stored) and committed stored edges, dropping rows of detached edges.
+        Queued behind the objects when writing behind, so the index never
+        runs ahead of the object table
+        """
+        rows = {}
+        node_edges = {}
+        for i in items:
+            if isinstance(i, Edge):
+                rows[i.id] = self.edges.model(
+                    jid=i.id,
+                    from_node_id=to_uuid(i.from_node_id),
+                    to_node_id=to_uuid(i.to_node_id),
+                    name=i.name,
+                    bidirected=i.bidirected,
+                )
+            elif isinstance(i, Node):
+                node_edges[i.id] = set(uuid.UUID(j) for j in i.edge_ids)
+                for name, fast in i.fast_edges.items():
+                    for v in fast:
+                        if len(v) < 3:
+                            continue
+                        ends = [v[0], i.jid] if v[1] == FROM else [i.jid, v[0]]
+                        jid = uuid.UUID(v[2])
+                        rows[jid] = self.edges.model(
+                            jid=jid,
+                            from_node_id=to_uuid(ends[0]),
+                            to_node_id=to_uuid(ends[1]),
+                            name=name,
+                            bidirected=v[1] == BI,
+                        )
+                        node_edges[i.id].add(jid)
+        if not rows and not node_edges:
+            return
+
+        if self.writer is not None:
+            self.writer.put(uuid.uuid4(), EDGE_INDEX, (rows, node_edges))
+            return
+        try:
+            with transaction.atomic():
+                sync_edge_index(
+                    rows, node_edges, self.config.get("bulk_batch_size", 1000)
+                )
+        except DatabaseError as e:
+            logger.error(f"Edge index sync failed due to {e}")
+
     def commit(self, skip_cache=False):
         """Write through all saves to store"""
-        for i in self.save_obj_list:
-            if not skip_cache:
-                self.commit_obj_to_cache(i, all_caches=True)
-            self.commit_obj(i)
+        if not skip_cache:
+            self.commit_obj_list_to_cache(self.save_obj_list, all_caches=True)
+        written = self.commit_obj_list(list(self.save_obj_list))
+        if self.config.get("edge_index", False):
+            self.commit_edge_index(written)
         self.save_obj_list = set()
+        self.commit_decommits_to_cache()
 
-        for k, v in self.save_glob_dict.items():
-            self.commit_glob(k, v)
+        self.commit_glob_dict(self.save_glob_dict)
         self.save_glob_dict = {}
 
 
+def to_uuid(jid):
+    return uuid.UUID(jid) if jid else None
+
+
+def edge_index_key(from_node_id, to_node_id, name, bidirected):
+    """Comparable form of a JaseciEdge row, bidirected ends in either order"""
+    ends = (from_node_id, to_node_id)
+    return (frozenset(ends) if bidirected else ends, name, bool(bidirected))
+
+
+def sync_edge_index(rows, node_edges, batch_size=1000):
+    """
+    Brings JaseciEdge in line with rows (jid -> row) and node_edges (node jid
+    -> jids of all its edges). Only rows differing from the stored ones are
+    deleted and inserted, along with stored rows of edges no longer attached
+    to their nodes. Runs in the caller's transaction
+    """
+    from jaseci_serv.base.models import JaseciEdge
+
+    edges = JaseciEdge.objects
+    node_ids = list(node_edges.keys())
+    row_ids = list(rows.keys())
+    stored = {}
+    for i in range(0, max(len(node_ids), len(row_ids)), batch_size):
+        ids = node_ids[i : i + batch_size]
+        for jid, *row in edges.filter(
+            Q(jid__in=row_ids[i : i + batch_size])
+            | Q(from_node_id__in=ids)
+            | Q(to_node_id__in=ids)
+        ).values_list("jid", "from_node_id", "to_node_id", "name", "bidirected"):
+            stored[jid] = edge_index_key(*row)
+
+    creates = [
+        row
+        for jid, row in rows.items()
+        if stored.get(jid)
+        != edge_index_key(row.from_node_id, row.to_node_id, row.name, row.bidirected)
+    ]
+    drop = [i.jid for i in creates if i.jid in stored]
+    for jid, key in stored.items():
+        if jid not in rows and any(
+            end in node_edges and jid not in node_edges[end] for end in key[0]
+        ):
+            drop.append(jid)
+    for i in range(0, len(drop), batch_size):
+        edges.filter(jid__in=drop[i : i + batch_size]).delete()
+    edges.bulk_create(creates, batch_size=batch_size)
+
+
+def write_behind_rows(batch):
+    """
+    Writes a batch from the write-behind queue (jid -> (op, row)) in a single
+    transaction, edge index syncs after the objects they were made from,
+    falls back to row by row writes on failure. Returns the jids that could
+    not be written
+    """
+    from jaseci_serv.base.models import JaseciObject
+
+    objects = JaseciObject.objects
+    saves = {jid: row for jid, (op, row) in batch.items() if op == SAVE}
+    deletes = [jid for jid, (op, row) in batch.items() if op == DELETE]
+    index = {jid: row for jid, (op, row) in batch.items() if op == EDGE_INDEX}
+    fields = [f.name for f in JaseciObject._meta.concrete_fields if not f.primary_key]
+    try:
+        with transaction.atomic():
+            if deletes:
+                objects.filter(jid__in=deletes).delete()
+            existing = set(
+                objects.filter(jid__in=saves.keys()).values_list("jid", flat=True)
+            )
+            objects.bulk_create([v for k, v in saves.items() if k not in existing])
+            objects.bulk_update([v for k, v in saves.items() if k in existing], fields)
+            for rows, node_edges in index.values():
+                sync_edge_index(rows, node_edges)
+    except DatabaseError as e:
+        logger.error(f"Bulk write-behind failed due to {e}, writing one by one")
+        failed = []
+        for jid in deletes:
+            try:
+                objects.filter(jid=jid).delete()
+            except DatabaseError as e:
+                logger.error(f"Operation failed due to {e}")
+                failed.append(jid)
+        for jid, i in saves.items():
+            try:
+                i.save()
+            except DatabaseError as e:
+                logger.error(f"Operation failed due to {e}")
+                failed.append(jid)
+        for jid, (rows, node_edges) in index.items():
+            # queued again behind failed objects, not ahead of them
+            if failed:
+                failed.append(jid)
+                continue
+            try:
+                with transaction.atomic():
+                    sync_edge_index(rows, node_edges)
+            except DatabaseError as e:
+                logger.error(f"Edge index sync failed due to {e}")
+                failed.append(jid)
+        return failed
+
+
 def map_assignment_of_matching_fields(dest, source):
     """
     Assign the values of identical feild names from source to destination.
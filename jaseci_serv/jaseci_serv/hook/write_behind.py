@@ -0,0 +1,240 @@
+"""
+Write-behind queue for Jaseci objects committed to the db
+
+Commits hand snapshots of object rows to a bounded queue that a background
+thread writes to the db in batches, so request threads do not wait on db
+writes. Repeated writes to the same jid are coalesced, batches are flushed
+on size or time thresholds and whatever is pending is flushed on shutdown,
+at interpreter exit and when a celery worker process shuts down (prefork
+children leave through os._exit, skipping atexit). Rows that fail to write
+are queued again, and writers are told a row landed only once it has.
+"""
+import atexit
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from celery.signals import worker_process_shutdown
+from django.db import close_old_connections, connection
+
+from jaseci.utils.utils import logger
+
+SAVE = "save"
+DELETE = "delete"
+# adjacency rows of written objects, keyed by a fresh id so never coalesced
+EDGE_INDEX = "edge_index"
+
+
+class WriteBehindQueue:
+    """
+    Bounded queue of pending db writes keyed by jid, write_fn receives an
+    ordered dict of jid -> (op, row) for each batch and returns those of them
+    that failed (None when all were written)
+    """
+
+    def __init__(
+        self,
+        write_fn,
+        max_pending=10000,
+        batch_size=500,
+        interval=0.5,
+        put_timeout=5.0,
+        threaded=True,
+    ):
+        self.write_fn = write_fn
+        self.max_pending = max_pending
+        self.batch_size = batch_size
+        self.interval = interval
+        self.put_timeout = put_timeout
+        self.threaded = threaded
+        self.pending = OrderedDict()
+        self.inflight = {}
+        self.cond = threading.Condition()
+        # held while a batch is taken and written so batches land in order
+        self.write_lock = threading.Lock()
+        self.worker = None
+        self.stopping = False
+        # producers currently waiting for room in the queue
+        self.blocked = 0
+        self.coalesced_count = 0
+        self.blocked_count = 0
+        self.written_count = 0
+        self.failed_count = 0
+
+    def put(self, jid, op, row=None, on_written=None):
+        """
+        Queue write of row (or delete) for jid, blocks while the queue is
+        full and writes on the calling thread if it stays full past put_timeout.
+        on_written is called once the row is in the db, a newer write of jid
+        queued before that replaces it
+        """
+        with self.cond:
+            if jid not in self.pending and len(self.pending) >= self.max_pending:
+                self.blocked_count += 1
+                self.blocked += 1
+                self.cond.notify_all()
+                self.cond.wait_for(
+                    lambda: len(self.pending) < self.max_pending,
+                    self.put_timeout if self.threaded else 0,
+                )
+                self.blocked -= 1
+            if jid in self.pending:
+                self.coalesced_count += 1
+            self.pending[jid] = (op, row, on_written)
+            # still over the limit after waiting, writer is not keeping up
+            flush_now = len(self.pending) > self.max_pending
+            if len(self.pending) >= self.batch_size:
+                self.cond.notify_all()
+                flush_now = flush_now or not self.threaded
+        if self.threaded:
+            self.start()
+        if flush_now:
+            self.flush()
+
+    def lookup(self, jid):
+        """Pending (op, row) for jid not yet in the db, None if there is none"""
+        with self.cond:
+            val = self.pending.get(jid) or self.inflight.get(jid)
+            return val[:2] if val else None
+
+    def flush(self):
+        """
+        Write everything pending on the calling thread, stops early when a
+        batch fails entirely (its rows stay queued)
+        """
+        while self.write_batch(wait=False):
+            pass
+
+    def write_batch(self, wait=True):
+        """
+        Take and write one batch, waiting up to interval for it to fill when
+        wait is set. Returns the number of rows written, failed rows are put
+        back unless a newer write of their jid was queued meanwhile
+        """
+        with self.write_lock:
+            with self.cond:
+                if wait:
+                    self.cond.wait_for(
+                        lambda: len(self.pending) >= self.batch_size
+                        or self.blocked
+                        or self.stopping,
+                        self.interval,
+                    )
+                batch = OrderedDict()
+                while self.pending and len(batch) < self.batch_size:
+                    jid, val = self.pending.popitem(last=False)
+                    batch[jid] = val
+                self.inflight = batch
+                self.cond.notify_all()
+            if not batch:
+                return 0
+            try:
+                failed = self.write_fn(
+                    OrderedDict((k, v[:2]) for k, v in batch.items())
+                )
+                failed = set(failed or ())
+            except Exception as e:
+                logger.error(f"Write-behind of {len(batch)} objects failed due to {e}")
+                failed = set(batch.keys())
+            with self.cond:
+                for jid, val in batch.items():
+                    if jid not in failed:
+                        continue
+                    if jid not in self.pending:
+                        self.pending[jid] = val
+                self.inflight = {}
+                self.cond.notify_all()
+            if failed:
+                self.failed_count += len(failed)
+                logger.error(f"Write-behind queued {len(failed)} failed objects again")
+            for jid, val in batch.items():
+                if jid not in failed and val[2] is not None:
+                    val[2]()
+            self.written_count += len(batch) - len(failed)
+            return len(batch) - len(failed)
+
+    # -------------------- WORKER -------------------- #
+
+    def start(self):
+        if self.worker is None or not self.worker.is_alive():
+            with self.cond:
+                if self.worker is not None and self.worker.is_alive():
+                    return
+                self.stopping = False
+                self.worker = threading.Thread(
+                    target=self.run, name="jaseci-write-behind", daemon=True
+                )
+                self.worker.start()
+
+    def run(self):
+        try:
+            while not self.stopping:
+                pending = len(self.pending)
+                if self.write_batch():
+                    close_old_connections()
+                elif pending:
+                    # nothing landed, back off before retrying
+                    with self.cond:
+                        self.cond.wait_for(lambda: self.stopping, self.interval)
+        finally:
+            connection.close()
+
+    def stop(self):
+        """Stop the worker and flush whatever is still pending"""
+        with self.cond:
+            self.stopping = True
+            self.cond.notify_all()
+        if self.worker is not None:
+            self.worker.join()
+            self.worker = None
+        self.flush()
+
+    def wait_idle(self, timeout=None):
+        """Wait for the worker to drain the queue"""
+        end = None if timeout is None else time.monotonic() + timeout
+        with self.cond:
+            while self.pending or self.inflight:
+                self.cond.notify_all()
+                left = None if end is None else end - time.monotonic()
+                if left is not None and left <= 0:
+                    return False
+                self.cond.wait(left if left is not None else self.interval)
+        return True
+
+
+WRITE_BEHIND_QUEUE = None
+
+
+def write_behind_queue(write_fn, config):
+    """Process wide write-behind queue, created on first use"""
+    global WRITE_BEHIND_QUEUE
+    if WRITE_BEHIND_QUEUE is None:
+        WRITE_BEHIND_QUEUE = WriteBehindQueue(
+            write_fn,
+            max_pending=config.get("write_behind_max_pending", 10000),
+            batch_size=config.get("write_behind_batch_size", 500),
+            interval=config.get("write_behind_interval", 0.5),
+            put_timeout=config.get("write_behind_put_timeout", 5.0),
+        )
+    return WRITE_BEHIND_QUEUE
+
+
+def stop_write_behind_queue(**kwargs):
+    """Flushes the process wide queue, on exit and celery worker shutdown"""
+    if WRITE_BEHIND_QUEUE is not None:
+        WRITE_BEHIND_QUEUE.stop()
+
+
+def reset_write_behind_queue():
+    """
+    Forked children start their own queue, the parent's rows are its to
+    write and its lock and worker thread do not carry over
+    """
+    global WRITE_BEHIND_QUEUE
+    WRITE_BEHIND_QUEUE = None
+
+
+atexit.register(stop_write_behind_queue)
+worker_process_shutdown.connect(stop_write_behind_queue, weak=False)
+os.register_at_fork(after_in_child=reset_write_behind_queue)
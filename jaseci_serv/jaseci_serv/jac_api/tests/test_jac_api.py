@@ -1,5 +1,7 @@
 import base64
 import json
+from datetime import datetime
+from decimal import Decimal
 
 from django.contrib.auth import get_user_model
 from django.urls import reverse
@@ -9,6 +11,9 @@ from rest_framework.test import APIClient
 from rest_framework import status
 
 from jaseci.utils.utils import TestCaseHelper
+from jaseci.prim.node import Node
+from jaseci_serv.base.models import JaseciObject
+from jaseci_serv.jac_api.views import JStreamingResponse
 from django.test import TestCase
 
 import uuid
@@ -352,6 +357,64 @@ class PrivateJacApiTests(TestCaseHelper, TestCase):
         res = self.client.post(reverse(f'jac_api:{payload["op"]}'), payload)
         self.assertTrue("graph root" in res.json())
 
+    def test_jac_api_get_graph_ndjson_streams(self):
+        """Test API for streaming graph objects as ndjson"""
+        payload = {"op": "graph_create"}
+        res = self.client.post(reverse(f'jac_api:{payload["op"]}'), payload)
+        gph = self.master._h.get_obj(self.master.j_master, res.data["jid"])
+        gph.attach_outbound(Node(m_id=gph._m_id, h=gph._h))
+        payload = {"op": "graph_get", "mode": "ndjson", "nd": gph.jid}
+
+        res = self.client.post(reverse(f'jac_api:{payload["op"]}'), payload)
+        self.assertTrue(res.streaming)
+        self.assertEqual(res["Content-Type"], "application/x-ndjson")
+        lines = b"".join(res.streaming_content).decode().splitlines()
+        items = [json.loads(i) for i in lines]
+        self.assertEqual([i["j_type"] for i in items], ["graph", "node", "edge"])
+        self.assertEqual(items[0]["jid"], gph.jid)
+
+    def test_jac_api_ndjson_stream_encodes_like_responses(self):
+        """Test streamed items take non json types and end with errors"""
+
+        def items():
+            yield {"id": uuid.UUID(int=1), "at": datetime(2020, 1, 1)}
+            yield {"price": Decimal("1.5")}
+            raise ValueError("graph went away")
+
+        res = JStreamingResponse(self.master, items())
+        lines = b"".join(res.streaming_content).decode().splitlines()
+        self.assertEqual(
+            [json.loads(i) for i in lines],
+            [
+                {"id": str(uuid.UUID(int=1)), "at": "2020-01-01T00:00:00"},
+                {"price": 1.5},
+                {"error": "graph went away"},
+            ],
+        )
+
+    def test_jac_api_graph_bulk_load(self):
+        """Test API for loading a packed graph in one call"""
+        payload = {"op": "graph_create"}
+        res = self.client.post(reverse(f'jac_api:{payload["op"]}'), payload)
+        gph = self.master._h.get_obj(self.master.j_master, res.data["jid"])
+        payload = {
+            "op": "graph_bulk_load",
+            "nd": gph.jid,
+            "data": {
+                "nodes": {"name": ["bulk_a", "bulk_b"], "ctx": [{}, {"x": 1}]},
+                "edges": {"name": ["generic"] * 2, "connect": [[None, 0], [0, 1]]},
+            },
+        }
+
+        res = self.client.post(
+            reverse(f'jac_api:{payload["op"]}'), payload, format="json"
+        )
+        self.assertEqual((res.data["nodes"], res.data["edges"]), (2, 2))
+        self.assertEqual(
+            JaseciObject.objects.filter(name__startswith="bulk_").count(), 2
+        )
+        self.assertEqual([i.name for i in gph.outbound_nodes()], ["bulk_a"])
+
     def test_jac_api_delete_sentinel(self):
         """Test API for deleting a sentinel"""
         payload = {"op": "graph_create"}
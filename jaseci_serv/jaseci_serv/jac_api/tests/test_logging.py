@@ -102,6 +102,12 @@ class LoggingTests(TestCaseHelper, TestCase):
                         "db_touches",
                         "objects_touched_size",
                         "objects_saved",
+                        "redis_bytes_saved",
+                        "db_bytes_saved",
+                        "l1_objects",
+                        "l1_hits",
+                        "l1_misses",
+                        "l1_evictions",
                         "caller_name",
                         "caller_jid",
                         "api_response",
@@ -3,10 +3,13 @@ from base64 import b64encode
 from io import BytesIO
 from tempfile import _TemporaryFileWrapper
 from time import time
+from types import GeneratorType
 
+from django.http import StreamingHttpResponse
 from knox.auth import TokenAuthentication
 from rest_framework.permissions import AllowAny, IsAdminUser, IsAuthenticated
 from rest_framework.response import Response
+from rest_framework.utils.encoders import JSONEncoder
 from rest_framework.views import APIView
 
 from jaseci.jsorc.jsorc import JsOrc
@@ -33,6 +36,39 @@ class JResponse(Response):
         self.hook.commit(True)
 
 
+class JStreamingResponse(StreamingHttpResponse):
+    """Streams api results yielded by a generator as newline delimited json"""
+
+    def __init__(self, master, items, *args, **kwargs):
+        super().__init__(
+            self.ndjson_lines(items),
+            *args,
+            content_type="application/x-ndjson",
+            **kwargs,
+        )
+        self.hook = master._h
+
+    @staticmethod
+    def ndjson_lines(items):
+        """
+        Items encoded the way JResponse encodes them, one per line. Status and
+        headers are already sent when an item fails, so the failure is sent as
+        a last {"error": ...} line instead of cutting the body short
+        """
+        try:
+            for i in items:
+                yield json.dumps(i, cls=JSONEncoder) + "\n"
+        except Exception as e:
+            logger.error(f"Streaming response failed due to {e}")
+            yield json.dumps({"error": str(e)}) + "\n"
+
+    def close(self):
+        super(JStreamingResponse, self).close()
+        # Items are loaded as they are streamed, commit once all are sent
+        self.hook.commit_all_cache_sync()
+        self.hook.commit(True)
+
+
 class AbstractJacAPIView(APIView):
     """
     The builder set of Jaseci APIs
@@ -71,12 +107,18 @@ class AbstractJacAPIView(APIView):
         touch_count = 0
         db_touches = 0
         touch_kb = 0
+        red_bytes_saved = 0
+        db_bytes_saved = 0
+        mem_stats = {}
         if isinstance(self.caller, Element):
             save_count = len(self.caller._h.save_obj_list)
             touch_count = len(self.caller._h.mem.keys())
             db_touches = self.caller._h.db_touch_count
             red_touches = self.caller._h.red_touch_count
             touch_kb = self.caller._h.mem_size()
+            red_bytes_saved = self.caller._h.red_bytes_saved
+            db_bytes_saved = self.caller._h.db_bytes_saved
+            mem_stats = self.caller._h.mem_stats()
 
         res_peek = str(api_result)[:256]
         log_str = str(
@@ -99,6 +141,9 @@ class AbstractJacAPIView(APIView):
             "db_touches": db_touches,
             "objects_touched_size": touch_kb,
             "objects_saved": save_count,
+            "redis_bytes_saved": red_bytes_saved,
+            "db_bytes_saved": db_bytes_saved,
+            **mem_stats,
             "caller_name": self.caller.name,
             "caller_jid": self.caller.jid,
         }
@@ -231,6 +276,8 @@ class AbstractJacAPIView(APIView):
             and api_result["report_custom"] is not None
         ):
             api_result = api_result["report_custom"]
+        if isinstance(api_result, GeneratorType):
+            return JStreamingResponse(self.caller, api_result, status=status)
         return JResponse(self.caller, api_result, status=status)
 
 
@@ -29,9 +29,10 @@ class JaseciObjectSerializer(slzrs.HyperlinkedModelSerializer):
             "name",
             "kind",
             "j_timestamp",
+            "j_version",
             "jsci_obj",
         )
-        read_only_fields = ("id", "j_type", "timestamp")
+        read_only_fields = ("id", "j_type", "timestamp", "j_version")
 
     def to_representation(self, instance):
         """Convert jsci_obj to dictionary so entire payload is one JSON"""